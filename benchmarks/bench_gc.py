@@ -0,0 +1,100 @@
+"""Garbage collector pauses during a login storm, with and without
+``Client.freeze_gc()``.
+
+A warm heap of long lived objects stands for the caches of a running
+application, then every login exchanges a code and builds the application
+info. The token endpoint is replaced by a coroutine returning a canned
+payload so only the library's own allocations are measured.
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import time
+
+from benchmarks.bench_lazy_models import APP
+from oauth2 import Client
+from oauth2.appinfo import AppInfo
+from oauth2.scopes import OAuthScopes
+
+WARM_OBJECTS = 1_000_000
+LOGINS = 30_000
+TOKEN = {
+    "access_token": "token",
+    "token_type": "Bearer",
+    "expires_in": 604800,
+    "scope": "identify",
+}
+
+
+class Pauses:
+    def __init__(self) -> None:
+        self.started = 0.0
+        self.total = 0.0
+        self.longest = 0.0
+        self.count = [0, 0, 0]
+        self.full = 0.0
+
+    def __call__(self, phase: str, info: dict) -> None:
+        if phase == "start":
+            self.started = time.perf_counter()
+            return
+        pause = time.perf_counter() - self.started
+        self.total += pause
+        self.longest = max(self.longest, pause)
+        self.count[info["generation"]] += 1
+
+
+async def exchange_token(**kwargs) -> dict:
+    return TOKEN
+
+
+async def storm(freeze: bool) -> Pauses:
+    warm = [{"id": i, "payload": [i]} for i in range(WARM_OBJECTS)]
+    client = Client(
+        1,
+        scopes=OAuthScopes.identify,
+        client_secret="secret",
+        redirect_uri="http://localhost/callback",
+    )
+    client.http._exchange_token = exchange_token  # type: ignore
+    data = json.loads(APP)
+    if freeze:
+        client.freeze_gc()
+
+    pauses = Pauses()
+    gc.callbacks.append(pauses)
+    try:
+        for _ in range(LOGINS):
+            await client.exchange_code("code")
+            AppInfo.from_data(data, client.http)
+    finally:
+        gc.callbacks.remove(pauses)
+
+    # the collection the interpreter eventually runs on the whole heap
+    started = time.perf_counter()
+    gc.collect()
+    pauses.full = time.perf_counter() - started
+
+    await client.close()
+    gc.unfreeze()
+    del warm
+    return pauses
+
+
+def main() -> None:
+    for freeze in (False, True):
+        pauses = asyncio.run(storm(freeze))
+        label = "freeze_gc()" if freeze else "no freeze"
+        gen0, gen1, gen2 = pauses.count
+        print(
+            f"{label:<12} {gen0:>4} gen0 {gen1:>3} gen1 {gen2:>2} gen2 collections, "
+            f"{pauses.total * 1e3:>7.1f} ms total, {pauses.longest * 1e3:>6.1f} ms longest pause, "
+            f"full collection {pauses.full * 1e3:.1f} ms"
+        )
+        gc.collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Memory held by the guild lists of many users, with and without the
+guild identity map (``Client(guild_identity_map=True)``).
+
+Every user gets a freshly decoded payload of 20 guilds picked from 50
+distinct ones, like ``User.guilds()`` would receive. The payloads are
+dropped and only the built objects are kept.
+"""
+from __future__ import annotations
+
+import asyncio
+import gc
+import json
+import random
+import tracemalloc
+
+from oauth2._http import HTTPClient
+from oauth2.guild import GuildIdentityMap, PartialGuild
+
+USERS = 5000
+GUILDS_PER_USER = 20
+DISTINCT_GUILDS = 50
+
+GUILDS = [
+    {
+        "id": str(197038439483310086 + i),
+        "name": f"A fairly popular guild #{i}",
+        "icon": "f64c482b807da4f539cff778d174971c",
+        "owner": False,
+        "permissions": "246997699",
+        "features": [
+            "COMMUNITY",
+            "NEWS",
+            "VERIFIED",
+            "VANITY_URL",
+            "BANNER",
+            "INVITE_SPLASH",
+        ],
+    }
+    for i in range(DISTINCT_GUILDS)
+]
+
+
+def user_payloads(rng: random.Random) -> list:
+    return [json.dumps(rng.sample(GUILDS, GUILDS_PER_USER)) for _ in range(USERS)]
+
+
+def measure(label: str, build) -> None:
+    payloads = user_payloads(random.Random(0))
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [build(json.loads(payload)) for payload in payloads]
+    gc.collect()
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print(f"{label:<24} {held / 1e6:>8.1f} MB for {len(kept)} users")
+
+
+def main() -> None:
+    loop = asyncio.new_event_loop()
+    http = HTTPClient(None, loop, client_id=1, client_secret="s", bot_token=None)
+    guild_map = GuildIdentityMap()
+
+    measure(
+        "PartialGuild per user",
+        lambda data: [PartialGuild.from_data(g, http) for g in data],
+    )
+    measure("identity map", lambda data: [guild_map.membership(g, http) for g in data])
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Eager vs lazy models (``Client(lazy_models=True)``).
+
+Builds an AppInfo and lists of 200 PartialGuilds from decoded JSON payloads
+and reads either a few fields or all of them.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import timeit
+
+from oauth2._http import HTTPClient
+from oauth2.appinfo import AppInfo
+from oauth2.guild import PartialGuild
+
+USER = {
+    "id": "80351110224678912",
+    "username": "nelly",
+    "discriminator": "0",
+    "global_name": "Nelly",
+    "avatar": "8342729096ea3675442027381ff50dfe",
+    "verified": True,
+    "email": "nelly@discord.com",
+    "premium_type": 1,
+    "public_flags": 64,
+    "locale": "en-US",
+    "mfa_enabled": True,
+}
+APP = json.dumps(
+    {
+        "id": "172150183260323840",
+        "name": "Baba O-Riley",
+        "icon": None,
+        "description": "Test",
+        "bot_public": True,
+        "bot_require_code_grant": False,
+        "verify_key": "1e0a356058d627ca38a5c8c9648818061d49e49bd9da9e3ab17d98ad4d6bg2u8",
+        "guild_id": "290926798626357260",
+        "install_params": {
+            "scopes": ["bot", "applications.commands"],
+            "permissions": "8",
+        },
+        "owner": USER,
+        "team": {
+            "id": "531992624043786253",
+            "name": "Team",
+            "icon": None,
+            "owner_user_id": "80351110224678912",
+            "members": [
+                {
+                    "membership_state": 2,
+                    "permissions": ["*"],
+                    "team_id": "531992624043786253",
+                    "user": USER,
+                }
+                for _ in range(5)
+            ],
+        },
+    }
+)
+GUILDS = json.dumps(
+    [
+        {
+            "id": str(197038439483310086 + i),
+            "name": f"Guild {i}",
+            "icon": "f64c482b807da4f539cff778d174971c",
+            "owner": False,
+            "permissions": "246997699",
+            "features": ["COMMUNITY", "NEWS", "VERIFIED", "VANITY_URL", "BANNER"],
+        }
+        for i in range(200)
+    ]
+)
+GUILD_FIELDS = (
+    "id",
+    "name",
+    "features",
+    "owner",
+    "permissions",
+    "approximate_member_count",
+)
+
+
+def run(label: str, func, number: int) -> None:
+    best = min(timeit.repeat(func, number=number, repeat=5)) / number
+    print(f"{label:<50} {best * 1e6:>9.1f} us")
+
+
+def main() -> None:
+    loop = asyncio.new_event_loop()
+    for lazy in (False, True):
+        http = HTTPClient(
+            None, loop, client_id=1, client_secret="s", bot_token=None, lazy_models=lazy
+        )
+        mode = "lazy " if lazy else "eager"
+        app = json.loads(APP)
+        guilds = json.loads(GUILDS)
+
+        def app_id_name(http=http, app=app):
+            info = AppInfo.from_data(app, http)
+            return info.id, info.name
+
+        def guilds_few(http=http, guilds=guilds):
+            for data in guilds:
+                guild = PartialGuild.from_data(data, http)
+                guild.id, guild.name, guild.permissions  # noqa: B018
+
+        def guilds_all(http=http, guilds=guilds):
+            for data in guilds:
+                guild = PartialGuild.from_data(data, http)
+                for field in GUILD_FIELDS:
+                    getattr(guild, field)
+
+        run(f"{mode} AppInfo, read id/name", app_id_name, 2000)
+        run(f"{mode} 200 PartialGuilds, read id/name/permissions", guilds_few, 50)
+        run(f"{mode} 200 PartialGuilds, read every field", guilds_all, 50)
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Per call cost of serializing, iterating and parsing OAuthScopes.
+
+The ``previous`` rows reproduce the implementation before the lookup tables,
+which recomputed the api name of every member and walked the bits of the flag
+on each call.
+"""
+from __future__ import annotations
+
+import timeit
+from typing import Callable, Iterator, List
+
+from oauth2.scopes import OAuthScopes
+
+N = 100_000
+SCOPES = (
+    OAuthScopes.identify
+    | OAuthScopes.email
+    | OAuthScopes.guilds
+    | OAuthScopes.guilds_join
+    | OAuthScopes.connections
+    | OAuthScopes.role_connections_write
+)
+SCOPE_STRING = SCOPES.as_client_credentials()
+
+
+def previous_iter(scopes: OAuthScopes) -> Iterator[OAuthScopes]:
+    n = scopes.value
+    while n:
+        b = n & -n
+        yield OAuthScopes(b)
+        n ^= b
+
+
+def previous_api_name(scope: OAuthScopes) -> str:
+    name = scope.name
+    if name.startswith(("role_connections", "dm_channels")):
+        chars = list(name)
+        chars[name.rfind("_")] = "."
+        return "".join(chars)
+    return name.replace("_", ".")
+
+
+def previous_url_param(scopes: OAuthScopes) -> str:
+    return "%20".join(previous_api_name(scope) for scope in previous_iter(scopes))
+
+
+def previous_parse(names: List[str]) -> OAuthScopes:
+    # without the role_connections.write mapping bug, which made it raise
+    members = iter(name.replace(".", "_") for name in names)
+    scopes = OAuthScopes[next(members)]
+    for name in members:
+        scopes |= OAuthScopes[name]
+    return scopes
+
+
+def bench(name: str, func: Callable[[], object]) -> None:
+    elapsed = timeit.timeit(func, number=N)
+    print(f"{name:<32} {elapsed / N * 1e6:>8.2f} us/call")
+
+
+def main() -> None:
+    names = SCOPE_STRING.split()
+    bench("as_url_param (previous)", lambda: previous_url_param(SCOPES))
+    bench("as_url_param", SCOPES.as_url_param)
+    bench("iteration (previous)", lambda: list(previous_iter(SCOPES)))
+    bench("iteration", lambda: list(SCOPES))
+    bench(
+        "api_name (previous)",
+        lambda: previous_api_name(OAuthScopes.role_connections_write),
+    )
+    bench("api_name", lambda: OAuthScopes.role_connections_write.api_name)
+    bench("parse (previous)", lambda: previous_parse(names))
+    bench("parse", lambda: OAuthScopes.parse(SCOPE_STRING))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Links per second of Client.generate_state_link.
+
+The ``executor`` row reproduces the implementation before the state pool,
+which sent ``secrets.token_urlsafe(32)`` to the default executor for each link.
+"""
+from __future__ import annotations
+
+import asyncio
+import secrets
+import time
+
+from oauth2 import Client
+from oauth2.scopes import OAuthScopes
+from oauth2.utils import PromptType, ResponseType
+
+N = 20_000
+
+
+def make_client() -> Client:
+    return Client(
+        1,
+        scopes=OAuthScopes.identify | OAuthScopes.guilds,
+        client_secret="secret",
+        redirect_uri="http://localhost/callback",
+        max_states_cache=N,
+    )
+
+
+async def executor_link(client: Client) -> str:
+    loop = asyncio.get_running_loop()
+    state = await loop.run_in_executor(None, secrets.token_urlsafe, 32)
+    await client.state_store.add(state, client.state_ttl)
+    return client._state_link(
+        state, None, None, False, ResponseType.code, PromptType.consent
+    )
+
+
+async def bench(name: str, make_link) -> None:
+    client = make_client()
+    start = time.perf_counter()
+    for _ in range(N):
+        link = make_link(client)
+        if asyncio.iscoroutine(link):
+            await link
+    elapsed = time.perf_counter() - start
+    print(f"{name:<28} {N / elapsed:>10,.0f} links/s")
+    await client.close()
+
+
+async def main() -> None:
+    await bench("executor (previous)", executor_link)
+    await bench("generate_state_link", lambda client: client.generate_state_link())
+    await bench(
+        "generate_state_link_nowait", lambda client: client.generate_state_link_nowait()
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
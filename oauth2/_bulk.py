@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
+
+__all__: Tuple[str, ...] = ("RateLimiter", "bulk_map", "iter_source", "retry_after")
+
+T = TypeVar("T")
+R = TypeVar("R")
+Source = Union[Iterable[T], AsyncIterable[T]]
+
+_DONE: Any = object()
+
+
+class _Failure:
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+def _float(value: Optional[str]) -> Optional[float]:
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def retry_after(headers: Optional[Mapping[str, str]]) -> float:
+    """How many seconds to wait after a 429, from its headers."""
+    headers = headers or {}
+    for key in ("Retry-After", "X-RateLimit-Reset-After"):
+        value = _float(headers.get(key))
+        if value is not None:
+            return value
+    return 1.0
+
+
+class _Bucket:
+    __slots__ = ("remaining", "reset_at")
+
+    def __init__(self, remaining: int, reset_at: float) -> None:
+        self.remaining = remaining
+        self.reset_at = reset_at
+
+
+class RateLimiter:
+    """Throttles requests per rate limit bucket from Discord's ``X-RateLimit-*``
+    headers, so that bulk runs stay under the limits instead of collecting 429s.
+
+    A bucket is any string chosen by the caller, e.g. the route and its major
+    parameter. While a bucket's limit is unknown, at the start of each window,
+    a single request is sent and the others wait for its headers. Buckets are
+    dropped once their window resets.
+    """
+
+    __slots__ = ("_buckets", "_probes", "_global_until")
+
+    def __init__(self) -> None:
+        self._buckets: Dict[str, _Bucket] = {}
+        self._probes: Dict[str, asyncio.Event] = {}
+        self._global_until = 0.0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def acquire(self, key: str) -> bool:
+        """Wait until a request can be sent to the ``key`` bucket and count it.
+
+        Returns whether the request discovers the limit of the bucket, in which
+        case :meth:`release` must be called once it completes.
+        """
+        while True:
+            now = time.monotonic()
+            if now < self._global_until:
+                await asyncio.sleep(self._global_until - now)
+                continue
+            bucket = self._buckets.get(key)
+            if bucket is not None and now >= bucket.reset_at:
+                del self._buckets[key]
+                bucket = None
+            if bucket is None:
+                probe = self._probes.get(key)
+                if probe is None:
+                    self._probes[key] = asyncio.Event()
+                    return True
+                await probe.wait()
+                continue
+            if bucket.remaining > 0:
+                bucket.remaining -= 1
+                return False
+            await asyncio.sleep(bucket.reset_at - now)
+
+    def release(self, key: str) -> None:
+        """Let the requests waiting for the limit of the ``key`` bucket through."""
+        probe = self._probes.pop(key, None)
+        if probe is not None:
+            probe.set()
+
+    def update(self, key: str, status: int, headers: Mapping[str, str]) -> None:
+        """Record the rate limit headers of a response sent to the ``key`` bucket."""
+        now = time.monotonic()
+        if status == 429:
+            delay = retry_after(headers)
+            if (
+                headers.get("X-RateLimit-Global") == "true"
+                or headers.get("X-RateLimit-Scope") == "global"
+            ):
+                self._global_until = max(self._global_until, now + delay)
+            else:
+                self._set(key, 0, now + delay)
+            return
+
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = _float(headers.get("X-RateLimit-Reset-After"))
+        if remaining is None or reset_after is None:
+            return
+        self._set(key, int(remaining), now + reset_after)
+
+    def _set(self, key: str, remaining: int, reset_at: float) -> None:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket(remaining, reset_at)
+        else:
+            # requests still in flight aren't counted by the server yet
+            bucket.remaining = min(bucket.remaining, remaining)
+            bucket.reset_at = max(bucket.reset_at, reset_at)
+        delay = bucket.reset_at - time.monotonic()
+        asyncio.get_running_loop().call_later(max(delay, 0), self._expire, key, bucket)
+
+    def _expire(self, key: str, bucket: _Bucket) -> None:
+        # buckets that aren't used anymore, e.g. per user token ones, don't pile up
+        if self._buckets.get(key) is bucket and time.monotonic() >= bucket.reset_at:
+            del self._buckets[key]
+
+
+async def iter_source(source: Source[T]) -> AsyncIterator[T]:
+    if isinstance(source, AsyncIterable):
+        async for item in source:
+            yield item
+    else:
+        for item in source:
+            yield item
+
+
+async def bulk_map(
+    source: Source[T], func: Callable[[T], Awaitable[R]], concurrency: int
+) -> AsyncIterator[R]:
+    """Run ``func`` over every item of ``source`` with at most ``concurrency``
+    calls in flight, yielding the results as they complete.
+
+    The source is consumed lazily and both queues are bounded, a slow consumer
+    pauses the workers instead of buffering results. Errors raised by the
+    source or by ``func`` stop every worker and are raised to the caller.
+    """
+    work: asyncio.Queue[T] = asyncio.Queue(maxsize=concurrency * 2)
+    results: asyncio.Queue[Any] = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def produce() -> None:
+        error: Optional[Exception] = None
+        try:
+            async for item in iter_source(source):
+                await work.put(item)
+        except Exception as e:
+            error = e
+        # not in a finally, a cancelled producer must not wait on a full queue
+        for _ in range(concurrency):
+            await work.put(_DONE)
+        if error is not None:
+            raise error
+
+    async def consume() -> None:
+        try:
+            while (item := await work.get()) is not _DONE:
+                await results.put(await func(item))
+        except Exception as e:
+            await results.put(_Failure(e))
+        await results.put(_DONE)
+
+    tasks = [asyncio.ensure_future(produce())]
+    tasks.extend(asyncio.ensure_future(consume()) for _ in range(concurrency))
+    running = concurrency
+    try:
+        while running:
+            result = await results.get()
+            if result is _DONE:
+                running -= 1
+                continue
+            if isinstance(result, _Failure):
+                raise result.error
+            yield result
+        await tasks[0]  # surface errors raised by the source
+    finally:
+        for task in tasks:
+            task.cancel()
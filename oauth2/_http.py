@@ -1,17 +1,32 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
 import sys
-from typing import TYPE_CHECKING, Any, ClassVar, Dict, List, Optional, Tuple
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    ClassVar,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 from urllib.parse import quote as _uriquote
 
 import aiohttp
 
 from oauth2 import __version__
+from oauth2.cache import MemoryAssetCache
+from oauth2.cdn import AssetPrefetcher, CDNDownloader, CDNResponse
 from oauth2.utils import _to_json
 
 if TYPE_CHECKING:
+    from oauth2._bulk import RateLimiter
+    from oauth2.cache import DiskAssetCache
+    from oauth2.guild import GuildIdentityMap
     from oauth2.scopes import OAuthScopes
     from oauth2.types import (
         AccessExchangeTokenPayload,
@@ -37,6 +52,10 @@ __all__: Tuple[str, ...] = ("HTTPClient", "Route")
 _log = logging.getLogger(__name__)
 
 
+def _token_key(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()[:16]
+
+
 class Route:
     BASE: ClassVar[str] = "https://discord.com/api/v10"
 
@@ -63,8 +82,21 @@ class HTTPClient:
         client_id: int,
         client_secret: str,
         bot_token: Optional[str],
+        lazy_models: bool = False,
+        guild_map: Optional[GuildIdentityMap] = None,
+        asset_cache: Optional[DiskAssetCache] = None,
+        asset_memory_cache: Optional[MemoryAssetCache] = None,
+        cdn: Optional[CDNDownloader] = None,
+        prefetcher: Optional[AssetPrefetcher] = None,
     ) -> None:
         self._connector = connector
+        self.lazy_models = lazy_models
+        self.guild_map = guild_map
+        self.asset_cache = asset_cache
+        self.asset_memory_cache = asset_memory_cache
+        # assets are downloaded with their own session and connection pool
+        self.cdn = cdn or CDNDownloader()
+        self.prefetcher = prefetcher
         self.loop = loop
         self.__session = None
         self._client_id = client_id
@@ -73,17 +105,60 @@ class HTTPClient:
 
         self.user_agent = f"DiscordApp (https://github.com/Snipy7374/disnake-ext-oauth2 {__version__}) Python/{(py_ver:=sys.version_info)[0]}.{py_ver[1]} aiohttp/{aiohttp.__version__}"
 
+    @property
+    def has_bot_token(self) -> bool:
+        return self.__bot_token is not None
+
     async def create_session(self) -> None:
         self.__session = aiohttp.ClientSession(connector=self._connector)
         _log.debug("Session object created")
 
-    async def get_from_cdn(self, url: str) -> bytes:
-        if self.__session is None:
-            await self.create_session()
+    async def close(self) -> None:
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+        if self.prefetcher is not None:
+            await self.prefetcher.close()
+        await self.cdn.close()
 
-        async with self.__session.get(url) as resp:  # type: ignore
-            resp.raise_for_status()
-            return await resp.read()
+    async def get_from_cdn(self, url: str) -> bytes:
+        if self.asset_memory_cache is not None:
+            return await self.asset_memory_cache.fetch(url, self._fetch_from_cdn)
+        return await self._get_from_cdn(url)
+
+    async def _get_from_cdn(self, url: str) -> bytes:
+        if self.asset_cache is not None:
+            return await self.asset_cache.fetch(url, self._download_from_cdn)
+        return await self._download_from_cdn(url)
+
+    async def _fetch_from_cdn(
+        self, url: str, etag: Optional[str], last_modified: Optional[str]
+    ) -> CDNResponse:
+        # immutable assets go through the disk cache, mutable ones are always
+        # requested to the CDN so they can be revalidated
+        if MemoryAssetCache.is_mutable(url) or etag or last_modified:
+            return await self._conditional_download_from_cdn(url, etag, last_modified)
+        return CDNResponse(await self._get_from_cdn(url))
+
+    async def stream_from_cdn(
+        self, url: str, *, chunk_size: int = 65536, max_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Yield the body of ``url`` in chunks of at most ``chunk_size`` bytes,
+        without caching it. Raises :exc:`AssetTooLarge` as soon as the body
+        is known to exceed ``max_size``.
+        """
+        async for chunk in self.cdn.stream(
+            url, chunk_size=chunk_size, max_size=max_size
+        ):
+            yield chunk
+
+    async def _conditional_download_from_cdn(
+        self, url: str, etag: Optional[str], last_modified: Optional[str]
+    ) -> CDNResponse:
+        return await self.cdn.conditional_download(url, etag, last_modified)
+
+    async def _download_from_cdn(self, url: str) -> bytes:
+        return await self.cdn.download(url)
 
     async def request(self, route: Route, bearer: bool = True, **kwargs: Any) -> Any:
         method = route.method
@@ -92,6 +167,9 @@ class HTTPClient:
         payload: Dict[str, Any] = kwargs.get("payload") or {}  # type: ignore # guess what, idc
         params: Dict[str, Any] = kwargs.get("params") or {}
 
+        ratelimiter: Optional[RateLimiter] = kwargs.get("ratelimiter")
+        bucket: str = kwargs.get("bucket") or f"{method} {route.path}"
+
         if self.__session is None:
             await self.create_session()
 
@@ -118,9 +196,18 @@ class HTTPClient:
             headers["Content-Type"] = "application/json"
             payload: str = _to_json(payload)
 
-        async with self.__session.request(method, url, data=payload, headers=headers, auth=auth, params=params) as response:  # type: ignore
-            response.raise_for_status()
-            return await response.json()
+        probe = ratelimiter is not None and await ratelimiter.acquire(bucket)
+        try:
+            async with self.__session.request(method, url, data=payload, headers=headers, auth=auth, params=params) as response:  # type: ignore
+                if ratelimiter is not None:
+                    ratelimiter.update(bucket, response.status, response.headers)
+                response.raise_for_status()
+                if response.status == 204:
+                    return None
+                return await response.json()
+        finally:
+            if probe:
+                ratelimiter.release(bucket)  # type: ignore
 
     async def _exchange_token(
         self, *, code: str, redirect_uri: str
@@ -149,7 +236,9 @@ class HTTPClient:
             Route("POST", "/oauth2/token"), payload=payload, bearer=False
         )
 
-    async def _revoke_token(self, *, token: str, token_type: str) -> None:
+    async def _revoke_token(
+        self, *, token: str, token_type: str, ratelimiter: Optional[RateLimiter] = None
+    ) -> None:
         payload: RevokeTokenPayload = {
             "client_id": self._client_id,
             "client_secret": self.__client_secret,
@@ -158,7 +247,10 @@ class HTTPClient:
         }
 
         return await self.request(
-            Route("POST", "/oauth2/token/revoke"), payload=payload, bearer=False
+            Route("POST", "/oauth2/token/revoke"),
+            payload=payload,
+            bearer=False,
+            ratelimiter=ratelimiter,
         )
 
     async def _get_client_credentials_token(
@@ -185,10 +277,16 @@ class HTTPClient:
             Route("GET", "/oauth2/@me"), access_token=access_token
         )
 
-    async def _get_current_user(self, access_token: str) -> User:
+    async def _get_current_user(
+        self, access_token: str, *, ratelimiter: Optional[RateLimiter] = None
+    ) -> User:
         return await self.request(
             Route("GET", "/users/@me"),
             access_token=access_token,
+            ratelimiter=ratelimiter,
+            # limited per token, one user's 429 doesn't hold back the others.
+            # keyed on a digest so the token itself isn't kept by the limiter
+            bucket=f"GET /users/@me {_token_key(access_token)}",
         )
 
     async def _edit_user(
@@ -280,7 +378,10 @@ class HTTPClient:
         mute: Optional[bool],
         deaf: Optional[bool],
         access_token: str,
-    ) -> None:
+        *,
+        ratelimiter: Optional[RateLimiter] = None,
+    ) -> Optional[Dict[str, Any]]:
+        # the member payload, or None if the user was already a member
         payload: AddGuildMemberPayload = {"access_token": access_token}
 
         if nick:
@@ -298,6 +399,9 @@ class HTTPClient:
             headers={"Authorization": f"Bot {self.__bot_token}"},
             payload=payload,
             json=True,
+            ratelimiter=ratelimiter,
+            # shared by every member added to the guild
+            bucket=f"PUT /guilds/{guild_id}/members",
         )
 
     async def _create_group_dm(
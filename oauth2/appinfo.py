@@ -5,17 +5,21 @@ from typing import TYPE_CHECKING, List, Optional
 
 import attrs
 
-from oauth2.asset import Asset
+from oauth2.asset import Asset, AssetOwner, cached_asset
+from oauth2.lazy import LazyField, LazyModel
+from oauth2.mixins import Hashable
 from oauth2.scopes import OAuthScopes
+from oauth2.snowflake import snowflake_time
 from oauth2.team import Team
 from oauth2.user import User
-from oauth2.utils import _to_install_params, _to_oauth2_scopes
+from oauth2.utils import _to_oauth2_scopes, to_int
 
 if TYPE_CHECKING:
     from oauth2._http import HTTPClient
     from oauth2.types import (
         AppInfo as AppInfoData,
         AuthInfo as AuthInfoData,
+        InstallParams as InstallParamsData,
         PartialAppInfo as PartialAppInfoData,
     )
     from oauth2.session import OAuth2Session
@@ -27,8 +31,14 @@ class InstallParams:
     permissions: int
 
 
-@attrs.define(slots=True, repr=True)
-class AppInfo:
+def _to_install_params(_v: Optional[InstallParamsData]) -> Optional[InstallParams]:
+    if _v is None:
+        return
+    return InstallParams(_to_oauth2_scopes(_v["scopes"]), int(_v["permissions"]))
+
+
+@attrs.define(slots=True, repr=True, eq=False)
+class AppInfo(Hashable, AssetOwner):
     _http: HTTPClient
     id: int
     name: str
@@ -56,13 +66,16 @@ class AppInfo:
 
     @classmethod
     def from_data(cls, data: AppInfoData, http: HTTPClient) -> AppInfo:
+        if cls is AppInfo and http.lazy_models:
+            return LazyAppInfo.from_data(data, http)
+
         team_data = data.get("team")
         owner_data = data.get("owner")
         install_params_data = data.get("install_params")
 
         return cls(
-            _http=http,
-            id=data["id"],  # type: ignore
+            http=http,  # type: ignore
+            id=int(data["id"]),
             name=data["name"],
             description=data["description"],
             terms_of_service_url=data.get("terms_of_service_url"),
@@ -73,8 +86,8 @@ class AppInfo:
             bot_require_code_grant=data["bot_require_code_grant"],
             owner=User.from_data(owner_data, http),
             team=(Team.from_data(team_data) if team_data else None),
-            guild_id=data.get("guild_id"),  # type: ignore
-            primary_sku_id=data.get("primary_sku_id"),  # type: ignore
+            guild_id=to_int(data.get("guild_id")),  # type: ignore
+            primary_sku_id=to_int(data.get("primary_sku_id")),  # type: ignore
             slug=data.get("slug"),
             tags=data.get("tags"),
             install_params=install_params_data,
@@ -82,21 +95,62 @@ class AppInfo:
             role_connections_verification_url=data.get(
                 "role_connections_verification_url"
             ),
+            cover_image=data.get("cover_image"),  # type: ignore
+            icon=data.get("icon"),  # type: ignore
         )
 
     @property
-    def icon(self) -> Optional[Asset]:
-        if self._icon:
-            return Asset._from_icon(self._http, self.id, self._icon, path="app")
+    def created_at(self) -> datetime.datetime:
+        """:class:`datetime.datetime`: When this application was created, in UTC."""
+        return snowflake_time(self.id)
+
+    @cached_asset("_icon")
+    def icon(self, icon: str) -> Asset:
+        return Asset._from_icon(self._http, self.id, icon, path="app")
+
+    @cached_asset("_cover_image")
+    def cover_image(self, cover_image: str) -> Asset:
+        return Asset._from_cover_image(self._http, self.id, cover_image)
+
+
+class LazyAppInfo(LazyModel, AppInfo):
+    """An :class:`AppInfo` that decodes its fields, including the nested
+    :attr:`owner` and :attr:`team`, from the payload on first access.
+    """
+
+    __slots__ = ("_data", "__dict__")
+
+    id = LazyField("id", int)
+    name = LazyField("name")
+    description = LazyField("description")
+    bot_public = LazyField("bot_public")
+    bot_require_code_grant = LazyField("bot_require_code_grant")
+    owner = LazyField("owner", factory=lambda self, v: User.from_data(v, self._http))
+    verify_key = LazyField("verify_key")
+    rpc_origins = LazyField("rpc_origins", default=None)
+    _cover_image = LazyField("cover_image", default=None)
+    terms_of_service_url = LazyField("terms_of_service_url", default=None)
+    privacy_policy_url = LazyField("privacy_policy_url", default=None)
+    flags = LazyField("flags", default=None)
+    team = LazyField("team", Team.from_data, default=None)
+    guild_id = LazyField("guild_id", int, default=None)
+    primary_sku_id = LazyField("primary_sku_id", int, default=None)
+    slug = LazyField("slug", default=None)
+    tags = LazyField("tags", default=None)
+    install_params = LazyField("install_params", _to_install_params, default=None)
+    custom_install_url = LazyField("custom_install_url", default=None)
+    role_connections_verification_url = LazyField(
+        "role_connections_verification_url", default=None
+    )
+    _icon = LazyField("icon", default=None)
 
-    @property
-    def cover_image(self) -> Optional[Asset]:
-        if self._cover_image:
-            return Asset._from_cover_image(self._http, self.id, self._cover_image)
+    @classmethod
+    def from_data(cls, data: AppInfoData, http: HTTPClient) -> LazyAppInfo:
+        return cls._from_raw(data, _http=http)
 
 
-@attrs.define(slots=True, repr=True, kw_only=True)
-class PartialAppInfo:
+@attrs.define(slots=True, repr=True, eq=False, kw_only=True)
+class PartialAppInfo(Hashable, AssetOwner):
     id: int
     name: str
     description: str
@@ -108,14 +162,18 @@ class PartialAppInfo:
     privacy_policy_url: Optional[str] = None
 
     @property
-    def icon(self) -> Optional[Asset]:
-        if self._icon:
-            return Asset._from_icon(self._http, self.id, self._icon, path="app")
+    def created_at(self) -> datetime.datetime:
+        """:class:`datetime.datetime`: When this application was created, in UTC."""
+        return snowflake_time(self.id)
+
+    @cached_asset("_icon")
+    def icon(self, icon: str) -> Asset:
+        return Asset._from_icon(self._http, self.id, icon, path="app")
 
     @classmethod
     def from_data(cls, data: PartialAppInfoData, http: HTTPClient) -> PartialAppInfo:
         return cls(
-            id=data["id"],  # type: ignore
+            id=int(data["id"]),
             name=data["name"],
             description=data["description"],
             verify_key=data["verify_key"],
@@ -1,21 +1,225 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import io
+import mmap
 import os
-from typing import TYPE_CHECKING, ClassVar, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    overload,
+)
 
 import attrs
 from typing_extensions import TypeAlias
 
+from oauth2.cdn import CDNResponse
+from oauth2.errors import AssetTooLarge
+
 if TYPE_CHECKING:
+    import aiohttp
+
     from oauth2._http import HTTPClient
 
 FileLike: TypeAlias = Union[str, bytes, os.PathLike, io.BufferedIOBase]
+AssetBuilder: TypeAlias = Callable[[Any, str], "Asset"]
+ByteRange: TypeAlias = Union[str, Tuple[int, Optional[int]]]
+Chunk: TypeAlias = Union[bytes, memoryview]
+
+_BASE = "https://cdn.discordapp.com"
+
+VALID_STATIC_FORMATS: FrozenSet[str] = frozenset(("jpeg", "jpg", "webp", "png"))
+VALID_ASSET_FORMATS: FrozenSet[str] = VALID_STATIC_FORMATS | {"gif"}
+VALID_ASSET_SIZES: FrozenSet[int] = frozenset(1 << i for i in range(4, 13))
+
+
+_CONTENT_TYPES: Dict[str, str] = {
+    "png": "image/png",
+    "gif": "image/gif",
+    "webp": "image/webp",
+    "jpeg": "image/jpeg",
+    "jpg": "image/jpeg",
+}
+
+
+def _range_header(byte_range: ByteRange) -> str:
+    if isinstance(byte_range, str):
+        return byte_range
+    start, end = byte_range
+    return f"bytes={start}-{'' if end is None else end}"
+
+
+def _resolve_range(header: str, length: int) -> Optional[Tuple[int, int]]:
+    # the [start, end) slice of a single "bytes=" range, None if it can't be
+    # satisfied. Raises ValueError for ranges that aren't supported
+    unit, _, spec = header.partition("=")
+    if unit.strip() != "bytes" or "," in spec:
+        raise ValueError(f"Unsupported range: {header}")
+    first, _, last = spec.strip().partition("-")
+    if not first:
+        suffix = int(last)
+        if suffix <= 0:
+            return None
+        return max(length - suffix, 0), length
+    start = int(first)
+    end = length if not last else min(int(last) + 1, length)
+    if start >= end:
+        return None
+    return start, end
+
+
+@functools.lru_cache(maxsize=4096)
+def _variant_url(url: str, format: Optional[str], size: Optional[int]) -> str:
+    # cached so rendering the same variant in a loop returns the same string
+    path, _, query = url.partition("?")
+    if format is not None:
+        path = f"{path.rpartition('.')[0]}.{format}"
+    if size is not None:
+        params = [p for p in query.split("&") if p and not p.startswith("size=")]
+        params.append(f"size={size}")
+        query = "&".join(params)
+    return f"{path}?{query}" if query else path
+
+
+class AssetStream:
+    """The content of an :class:`Asset` as an async iterator of bytes-like
+    chunks, returned by :meth:`Asset.stream`.
+
+    Assets cached in memory are yielded as :class:`memoryview` slices of the
+    cached :class:`bytes`, without copying them. Anything else is yielded as
+    :class:`bytes`. Chunks stay valid after the stream is closed.
+
+    It can be passed directly to a streaming HTTP response, e.g. with Starlette:
+
+    .. code-block:: python
+
+        stream = await asset.stream(byte_range=request.headers.get("range"))
+        return StreamingResponse(stream, status_code=stream.status, headers=stream.headers)
+
+    A stream can be iterated only once. Call :meth:`aclose` if it isn't
+    iterated to the end.
+
+    Attributes
+    ----------
+    status: :class:`int`
+        The HTTP status matching the content: ``200``, ``206`` for a range
+        or ``416`` if the range can't be satisfied.
+    content_type: Optional[:class:`str`]
+        The MIME type of the asset.
+    content_length: Optional[:class:`int`]
+        The number of bytes that will be yielded, if known.
+    content_range: Optional[:class:`str`]
+        The ``Content-Range`` header value for ``206`` and ``416`` responses.
+    etag: Optional[:class:`str`]
+        The ``ETag`` of the asset, if known.
+    """
+
+    __slots__ = (
+        "status",
+        "content_type",
+        "content_length",
+        "content_range",
+        "etag",
+        "_chunks",
+        "_close",
+    )
+
+    def __init__(
+        self,
+        chunks: AsyncIterator[Chunk],
+        *,
+        close: Optional[Callable[[], Any]] = None,
+        status: int,
+        content_type: Optional[str],
+        content_length: Optional[int],
+        content_range: Optional[str] = None,
+        etag: Optional[str] = None,
+    ) -> None:
+        self.status = status
+        self.content_type = content_type
+        self.content_length = content_length
+        self.content_range = content_range
+        self.etag = etag
+        self._chunks = chunks
+        # the generator can't release anything if it was never started
+        self._close = close
+
+    def __repr__(self) -> str:
+        return (
+            f"<AssetStream status={self.status} content_type={self.content_type!r} "
+            f"content_length={self.content_length}>"
+        )
+
+    def __aiter__(self) -> AsyncIterator[Chunk]:
+        return self._chunks
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        """Dict[:class:`str`, :class:`str`]: The response headers describing the content."""
+        headers = {"Accept-Ranges": "bytes"}
+        if self.content_type is not None:
+            headers["Content-Type"] = self.content_type
+        if self.content_length is not None:
+            headers["Content-Length"] = str(self.content_length)
+        if self.content_range is not None:
+            headers["Content-Range"] = self.content_range
+        if self.etag is not None:
+            headers["ETag"] = self.etag
+        return headers
+
+    async def aclose(self) -> None:
+        """Stop the stream early, releasing the connection or the file."""
+        try:
+            await self._chunks.aclose()  # type: ignore
+        finally:
+            if self._close is not None:
+                self._close()
+
+
+def _slices(
+    data: Union[bytes, mmap.mmap], start: int, end: int, chunk_size: int
+) -> Iterator[Chunk]:
+    # views of immutable bytes are zero-copy and keep the bytes alive, an mmap
+    # is sliced into bytes instead so the chunks stay valid once it's closed
+    view = memoryview(data) if isinstance(data, bytes) else data
+    for i in range(start, end, chunk_size):
+        yield view[i : min(i + chunk_size, end)]
+
+
+async def _local_chunks(
+    data: Union[bytes, mmap.mmap], start: int, end: int, chunk_size: int
+) -> AsyncIterator[Chunk]:
+    try:
+        for chunk in _slices(data, start, end, chunk_size):
+            yield chunk
+    finally:
+        if isinstance(data, mmap.mmap):
+            data.close()
 
 
 @attrs.define(slots=True, repr=True)
 class Asset:
-    BASE: ClassVar[str] = "https://cdn.discordapp.com"
+    BASE: ClassVar[str] = _BASE
+    # the URL prefix of each asset type, so building an asset is a single format
+    _DEFAULT_AVATARS: ClassVar[str] = f"{_BASE}/embed/avatars/"
+    _AVATARS: ClassVar[str] = f"{_BASE}/avatars/"
+    _GUILDS: ClassVar[str] = f"{_BASE}/guilds/"
+    _APP_ASSETS: ClassVar[str] = f"{_BASE}/app-assets/"
+    _ICONS: ClassVar[str] = f"{_BASE}/icons/"
+    _BANNERS: ClassVar[str] = f"{_BASE}/banners/"
+    _AVATAR_DECORATIONS: ClassVar[str] = f"{_BASE}/avatar-decorations/"
+
     url: str
     key: str
     animated: bool
@@ -24,24 +228,314 @@ class Asset:
     async def read(self) -> bytes:
         return await self._http.get_from_cdn(self.url)
 
-    async def save(self, fp: FileLike, *, seek_begin: bool) -> int:
-        data = await self.read()
+    def _variant(self, format: Optional[str], size: Optional[int]) -> Asset:
+        url = _variant_url(self.url, format, size)
+        if url == self.url:
+            return self
+        animated = self.animated if format is None else format == "gif"
+        return Asset(url=url, key=self.key, animated=animated, http=self._http)  # type: ignore
+
+    def with_size(self, size: int) -> Asset:
+        """Return a variant of this asset with a different size. This doesn't
+        make any request.
+
+        Parameters
+        ----------
+        size: :class:`int`
+            The new size, a power of 2 between 16 and 4096.
+
+        Raises
+        ------
+        ValueError
+            The size is invalid.
+        """
+        if size not in VALID_ASSET_SIZES:
+            raise ValueError("size must be a power of 2 between 16 and 4096")
+        return self._variant(None, size)
+
+    def with_format(self, format: str) -> Asset:
+        """Return a variant of this asset in a different format. This doesn't
+        make any request.
+
+        Requesting a static format of an animated asset returns its first frame.
+
+        Parameters
+        ----------
+        format: :class:`str`
+            The new format, one of ``webp``, ``png``, ``jpg``/``jpeg`` and, for
+            animated assets, ``gif``.
+
+        Raises
+        ------
+        ValueError
+            The format is invalid.
+        """
+        format = format.lower()
+        if format == "jpg":
+            # one URL per variant, so both spellings share cache entries
+            format = "jpeg"
+        if self.key.startswith("a_"):
+            if format not in VALID_ASSET_FORMATS:
+                raise ValueError(f"format must be one of {sorted(VALID_ASSET_FORMATS)}")
+        elif format not in VALID_STATIC_FORMATS:
+            raise ValueError(f"format must be one of {sorted(VALID_STATIC_FORMATS)}")
+        return self._variant(format, None)
+
+    def with_static_format(self, format: str) -> Asset:
+        """Same as :meth:`with_format` but only static formats are accepted, so
+        the variant is never animated.
+
+        Raises
+        ------
+        ValueError
+            The format is invalid.
+        """
+        if format.lower() not in VALID_STATIC_FORMATS:
+            raise ValueError(f"format must be one of {sorted(VALID_STATIC_FORMATS)}")
+        return self.with_format(format)
+
+    async def save(
+        self,
+        fp: FileLike,
+        *,
+        seek_begin: bool = True,
+        chunk_size: int = 65536,
+        max_size: Optional[int] = None,
+        checksum: Optional[Any] = None,
+    ) -> int:
+        """Save this asset into a file-like object or a path.
+
+        The asset is streamed in chunks and written from a thread pool, so
+        memory use stays at ``chunk_size`` and the event loop never waits for
+        the disk. Paths are written to a temporary ``.part`` file that is
+        renamed once complete. Assets already in the client caches are
+        written from there.
+
+        Parameters
+        ----------
+        fp: Union[:class:`str`, :class:`bytes`, :class:`os.PathLike`, :class:`io.BufferedIOBase`]
+            The file-like object or the path to save the asset to.
+        seek_begin: :class:`bool`
+            Whether to seek to the beginning of ``fp`` after saving, only used
+            with file-like objects. Defaults to ``True``.
+        chunk_size: :class:`int`
+            The maximum size of each chunk, in bytes.
+        max_size: Optional[:class:`int`]
+            Raise :exc:`AssetTooLarge` if the asset is larger than this many
+            bytes. A partially saved path is removed.
+        checksum: Optional[:class:`hashlib._Hash`]
+            A hash object, e.g. ``hashlib.sha256()``, updated with every chunk.
+
+        Returns
+        -------
+        :class:`int`
+            The number of bytes written.
+        """
+        loop = asyncio.get_running_loop()
         if isinstance(fp, io.BufferedIOBase):
-            written = fp.write(data)
+            # in-memory buffers don't need a thread
+            threaded = not isinstance(fp, io.BytesIO)
+            written = await self._write_chunks(
+                fp.write, threaded, chunk_size, max_size, checksum
+            )
             if seek_begin:
                 fp.seek(0)
             return written
-        else:
-            with open(fp, "wb") as f:
-                return f.write(data)
+
+        path = os.fsdecode(fp)
+        tmp = path + ".part"
+        f = await loop.run_in_executor(None, open, tmp, "wb")
+        try:
+            written = await self._write_chunks(
+                f.write, True, chunk_size, max_size, checksum
+            )
+            await loop.run_in_executor(None, f.close)
+            await loop.run_in_executor(None, os.replace, tmp, path)
+        except BaseException:
+            f.close()
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        return written
+
+    async def stream(
+        self,
+        *,
+        chunk_size: int = 65536,
+        byte_range: Optional[ByteRange] = None,
+        cache: bool = False,
+    ) -> AssetStream:
+        """Open this asset as an :class:`AssetStream` without buffering it.
+
+        Assets in the client caches are streamed from there, files on disk are
+        mapped rather than read whole, otherwise they are streamed from the
+        CDN as they arrive.
+
+        Parameters
+        ----------
+        chunk_size: :class:`int`
+            The maximum size of each chunk, in bytes.
+        byte_range: Optional[Union[:class:`str`, Tuple[:class:`int`, Optional[:class:`int`]]]]
+            Only stream part of the asset. Either a ``Range`` header value like
+            ``bytes=0-1023`` or an inclusive ``(start, end)`` tuple, ``end`` can
+            be ``None``. Multiple ranges aren't supported.
+        cache: :class:`bool`
+            Whether to store the asset in the client caches once it has been
+            streamed completely. This keeps a copy of the whole asset in memory
+            while streaming, and is ignored for ranges.
+
+        Raises
+        ------
+        ValueError
+            The range isn't supported.
+        """
+        header = None if byte_range is None else _range_header(byte_range)
+        local = await self._cached()
+        if local is not None:
+            return self._stream_local(local, chunk_size, header)
+
+        headers = None if header is None else {"Range": header}
+        resp = await self._http.cdn.request(self.url, headers=headers)
+        if resp.status >= 400 and resp.status != 416:
+            resp.release()
+            resp.raise_for_status()
+
+        tee = [] if cache and resp.status == 200 else None
+        return AssetStream(
+            self._network_chunks(resp, chunk_size, tee),
+            close=resp.release,
+            status=resp.status,
+            content_type=resp.content_type,
+            content_length=resp.content_length,
+            content_range=resp.headers.get("Content-Range"),
+            etag=resp.headers.get("ETag"),
+        )
+
+    def _stream_local(
+        self, data: Union[bytes, mmap.mmap], chunk_size: int, header: Optional[str]
+    ) -> AssetStream:
+        length = len(data)
+        close = data.close if isinstance(data, mmap.mmap) else None
+        content_type = _CONTENT_TYPES.get(self.url.partition("?")[0].rpartition(".")[2])
+        if header is None:
+            return AssetStream(
+                _local_chunks(data, 0, length, chunk_size),
+                close=close,
+                status=200,
+                content_type=content_type,
+                content_length=length,
+            )
+
+        try:
+            bounds = _resolve_range(header, length)
+        except ValueError:
+            if isinstance(data, mmap.mmap):
+                data.close()
+            raise
+        if bounds is None:
+            return AssetStream(
+                _local_chunks(data, 0, 0, chunk_size),
+                close=close,
+                status=416,
+                content_type=content_type,
+                content_length=0,
+                content_range=f"bytes */{length}",
+            )
+        start, end = bounds
+        return AssetStream(
+            _local_chunks(data, start, end, chunk_size),
+            close=close,
+            status=206,
+            content_type=content_type,
+            content_length=end - start,
+            content_range=f"bytes {start}-{end - 1}/{length}",
+        )
+
+    async def _network_chunks(
+        self, resp: aiohttp.ClientResponse, chunk_size: int, tee: Optional[List[bytes]]
+    ) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self._http.cdn.iter_chunks(resp, chunk_size):
+                if tee is not None:
+                    tee.append(chunk)
+                yield chunk
+        finally:
+            resp.release()
+
+        # only reached when the whole body was streamed
+        if tee is not None:
+            await self._store(b"".join(tee), resp)
+
+    async def _store(self, data: bytes, resp: aiohttp.ClientResponse) -> None:
+        http = self._http
+        if http.asset_memory_cache is not None:
+            http.asset_memory_cache.put(
+                self.url,
+                CDNResponse(
+                    data, resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+                ),
+            )
+        if http.asset_cache is not None:
+            await http.asset_cache.store(self.url, data)
+
+    async def _write_chunks(
+        self,
+        write: Callable[[Chunk], Any],
+        threaded: bool,
+        chunk_size: int,
+        max_size: Optional[int],
+        checksum: Optional[Any],
+    ) -> int:
+        loop = asyncio.get_running_loop()
+        written = 0
+        async for chunk in self._iter_chunks(chunk_size, max_size):
+            if checksum is not None:
+                checksum.update(chunk)
+            if threaded:
+                await loop.run_in_executor(None, write, chunk)
+            else:
+                write(chunk)
+            written += len(chunk)
+        return written
+
+    async def _cached(self) -> Optional[Union[bytes, mmap.mmap]]:
+        memory = self._http.asset_memory_cache
+        if memory is not None and (data := memory.get(self.url)) is not None:
+            return data
+        disk = self._http.asset_cache
+        if disk is not None:
+            return await disk.map(self.url)
+        return None
+
+    async def _iter_chunks(
+        self, chunk_size: int, max_size: Optional[int]
+    ) -> AsyncIterator[Chunk]:
+        cached = await self._cached()
+        if cached is None:
+            async for chunk in self._http.stream_from_cdn(
+                self.url, chunk_size=chunk_size, max_size=max_size
+            ):
+                yield chunk
+            return
+
+        try:
+            if max_size is not None and len(cached) > max_size:
+                raise AssetTooLarge(self.url, max_size)
+            for chunk in _slices(cached, 0, len(cached), chunk_size):
+                yield chunk
+        finally:
+            if isinstance(cached, mmap.mmap):
+                cached.close()
 
     @classmethod
     def _from_default_avatar(cls, http: HTTPClient, index: int) -> Asset:
         return cls(
-            url=f"{cls.BASE}/embed/avatars/{index}.png",
+            url=f"{cls._DEFAULT_AVATARS}{index}.png",
             key=str(index),
             animated=False,
-            _http=http,
+            http=http,  # type: ignore
         )
 
     @classmethod
@@ -49,10 +543,10 @@ class Asset:
         animated = avatar.startswith("a_")
         format = "gif" if animated else "png"
         return cls(
-            url=f"{cls.BASE}/avatars/{user_id}/{avatar}.{format}?size=1024",
+            url=f"{cls._AVATARS}{user_id}/{avatar}.{format}?size=1024",
             key=avatar,
             animated=animated,
-            _http=http,
+            http=http,  # type: ignore
         )
 
     @classmethod
@@ -62,10 +556,10 @@ class Asset:
         animated = avatar.startswith("a_")
         format = "gif" if animated else "png"
         return cls(
-            url=f"{cls.BASE}/guilds/{guild_id}/users/{member_id}/avatars/{avatar}.{format}?size=1024",
+            url=f"{cls._GUILDS}{guild_id}/users/{member_id}/avatars/{avatar}.{format}?size=1024",
             key=avatar,
             animated=animated,
-            _http=http,
+            http=http,  # type: ignore
         )
 
     @classmethod
@@ -76,7 +570,7 @@ class Asset:
             url=f"{cls.BASE}/{path}-icons/{object_id}/{icon_hash}.png?size=1024",
             key=icon_hash,
             animated=False,
-            _http=http,
+            http=http,  # type: ignore
         )
 
     @classmethod
@@ -84,10 +578,10 @@ class Asset:
         cls, http: HTTPClient, object_id: int, cover_image_hash: str
     ) -> Asset:
         return cls(
-            url=f"{cls.BASE}/app-assets/{object_id}/store/{cover_image_hash}.png?size=1024",
+            url=f"{cls._APP_ASSETS}{object_id}/store/{cover_image_hash}.png?size=1024",
             key=cover_image_hash,
             animated=False,
-            _http=http,
+            http=http,  # type: ignore
         )
 
     @classmethod
@@ -98,7 +592,7 @@ class Asset:
             url=f"{cls.BASE}/{path}/{guild_id}/{image}.png?size=1024",
             key=image,
             animated=False,
-            _http=http,
+            http=http,  # type: ignore
         )
 
     @classmethod
@@ -106,10 +600,10 @@ class Asset:
         animated = icon_hash.startswith("a_")
         format = "gif" if animated else "png"
         return cls(
-            url=f"{cls.BASE}/icons/{guild_id}/{icon_hash}.{format}?size=1024",
+            url=f"{cls._ICONS}{guild_id}/{icon_hash}.{format}?size=1024",
             key=icon_hash,
             animated=animated,
-            _http=http,
+            http=http,  # type: ignore
         )
 
     @classmethod
@@ -117,10 +611,10 @@ class Asset:
         animated = banner_hash.startswith("a_")
         format = "gif" if animated else "png"
         return cls(
-            url=f"{cls.BASE}/banners/{id}/{banner_hash}.{format}?size=1024",
+            url=f"{cls._BANNERS}{id}/{banner_hash}.{format}?size=1024",
             key=banner_hash,
             animated=animated,
-            _http=http,
+            http=http,  # type: ignore
         )
 
     @classmethod
@@ -128,8 +622,91 @@ class Asset:
         cls, http: HTTPClient, id: int, avatar_decoration_hash: str
     ) -> Asset:
         return cls(
-            url=f"{cls.BASE}/avatar-decorations/{id}/{avatar_decoration_hash}.png?size=1024",
+            url=f"{cls._AVATAR_DECORATIONS}{id}/{avatar_decoration_hash}.png?size=1024",
             key=avatar_decoration_hash,
             animated=False,
-            _http=http,
+            http=http,  # type: ignore
         )
+
+
+class AssetOwner:
+    """Mixin for the models that expose assets through :class:`CachedAsset`.
+
+    It only adds the slot where the built assets are kept.
+    """
+
+    __slots__ = ("_assets",)
+
+    _assets: Dict[str, Tuple[Optional[str], Optional[Asset]]]
+
+
+class CachedAsset:
+    """A read-only descriptor that builds an :class:`Asset` from a hash field of
+    an :class:`AssetOwner` the first time it's accessed.
+
+    The asset is cached on the instance and rebuilt only when the hash field
+    changes, e.g. after :meth:`User.update_from`. ``None`` is returned when the
+    hash is empty.
+
+    Parameters
+    ----------
+    field: :class:`str`
+        The name of the attribute holding the asset hash.
+    build: Callable[[Any, :class:`str`], :class:`Asset`]
+        Called with the model and the hash to build the asset.
+    """
+
+    __slots__ = ("field", "build", "name")
+
+    def __init__(self, field: str, build: AssetBuilder) -> None:
+        self.field = field
+        self.build = build
+        self.name = build.__name__
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    @overload
+    def __get__(self, obj: None, objtype: Optional[type] = None) -> CachedAsset:
+        ...
+
+    @overload
+    def __get__(
+        self, obj: AssetOwner, objtype: Optional[type] = None
+    ) -> Optional[Asset]:
+        ...
+
+    def __get__(
+        self, obj: Optional[AssetOwner], objtype: Optional[type] = None
+    ) -> Union[CachedAsset, Optional[Asset]]:
+        if obj is None:
+            return self
+
+        key = getattr(obj, self.field)
+        try:
+            cache = obj._assets
+        except AttributeError:
+            # lazy models skip __init__, the cache is created on first use
+            cache = obj._assets = {}
+
+        entry = cache.get(self.name)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+
+        asset = self.build(obj, key) if key else None
+        cache[self.name] = (key, asset)
+        return asset
+
+    def __set__(self, obj: Any, value: Any) -> None:
+        raise AttributeError(f"can't set attribute '{self.name}'")
+
+
+def cached_asset(field: str) -> Callable[[AssetBuilder], CachedAsset]:
+    """Decorator turning an asset builder into a :class:`CachedAsset` reading
+    the hash from ``field``.
+    """
+
+    def decorator(build: AssetBuilder) -> CachedAsset:
+        return CachedAsset(field, build)
+
+    return decorator
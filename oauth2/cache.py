@@ -0,0 +1,514 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple, Union
+
+import attrs
+
+from oauth2.asset import Asset
+from oauth2.cdn import CDNResponse
+
+__all__: Tuple[str, ...] = (
+    "CDNResponse",
+    "DiskAssetCache",
+    "DiskAssetCacheStats",
+    "MemoryAssetCache",
+    "MemoryAssetCacheStats",
+)
+_log = logging.getLogger(__name__)
+
+
+@attrs.define(slots=True, repr=True)
+class DiskAssetCacheStats:
+    """Counters collected by a :class:`DiskAssetCache`.
+
+    Attributes
+    ----------
+    hits: :class:`int`
+        The number of reads served from disk.
+    misses: :class:`int`
+        The number of reads that had to download the asset.
+    coalesced: :class:`int`
+        The number of misses that waited for a download already in progress
+        instead of starting another one.
+    evicted: :class:`int`
+        The number of files removed to stay under the size cap.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evicted: int = 0
+
+
+class DiskAssetCache:
+    """A cache of CDN assets stored on disk.
+
+    Discord asset URLs contain the asset hash, so the content behind a URL never
+    changes and cached files never need to be revalidated. Files are named
+    after the SHA-256 digest of the URL, written atomically and read back from
+    a thread pool, or mapped with :mod:`mmap` by :meth:`open`. When the total
+    size exceeds ``max_size`` the least recently used files are removed.
+
+    Pass it to :class:`Client` with ``asset_cache=``, :meth:`Asset.read` will
+    then use it transparently.
+
+    .. note::
+        Several processes can share the same directory, but each process only
+        accounts the files it knows about when enforcing ``max_size``.
+
+    Parameters
+    ----------
+    path: Union[:class:`str`, :class:`os.PathLike`]
+        The directory where the files are stored. It's created if missing and
+        the files already in it are reused.
+    max_size: :class:`int`
+        The maximum total size of the cached files, in bytes. Defaults to 512 MiB.
+
+    Attributes
+    ----------
+    stats: :class:`DiskAssetCacheStats`
+        The hit/miss counters of this cache.
+    """
+
+    def __init__(
+        self, path: Union[str, os.PathLike], *, max_size: int = 512 * 1024 * 1024
+    ) -> None:
+        self.path = os.fspath(path)
+        self.max_size = max_size
+        self.stats = DiskAssetCacheStats()
+        # file name -> size, least recently used first
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Future[bytes]] = {}
+        os.makedirs(self.path, exist_ok=True)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def size(self) -> int:
+        """:class:`int`: The total size of the cached files, in bytes."""
+        return self._size
+
+    def _load(self) -> None:
+        found = []
+        for entry in os.scandir(self.path):
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            stat = entry.stat()
+            found.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._size += size
+        self._evict()
+
+    @staticmethod
+    def key(url: str) -> str:
+        """The name of the file caching ``url``."""
+        return hashlib.sha256(url.encode()).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key)
+
+    def open(self, url: str) -> Optional[mmap.mmap]:
+        """Memory-map the cached file of ``url`` without copying it.
+
+        Returns
+        -------
+        Optional[:class:`mmap.mmap`]
+            The read-only mapping, or ``None`` if ``url`` isn't cached. Close
+            it when done.
+        """
+        key = self.key(url)
+        return self._mapped(key, self._map(key))
+
+    async def map(self, url: str) -> Optional[mmap.mmap]:
+        """Same as :meth:`open` but the file is opened and mapped from a thread pool."""
+        key = self.key(url)
+        loop = asyncio.get_running_loop()
+        return self._mapped(key, await loop.run_in_executor(None, self._map, key))
+
+    def _map(self, key: str) -> Optional[mmap.mmap]:
+        # only touches the file system, safe to run in an executor
+        try:
+            with open(self._file(key), "rb") as f:
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, ValueError):
+            # ValueError is raised by mmap for empty files
+            return None
+
+    def _mapped(self, key: str, mapped: Optional[mmap.mmap]) -> Optional[mmap.mmap]:
+        if mapped is None:
+            self._forget(key)
+        else:
+            self._touch(key, len(mapped))
+        return mapped
+
+    def _touch(self, key: str, size: int) -> None:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+        else:
+            # written by another process
+            self._entries[key] = size
+            self._size += size
+
+    def _read(self, key: str) -> Optional[bytes]:
+        # only touches the file system, safe to run in an executor
+        try:
+            with open(self._file(key), "rb") as f:
+                return f.read() or None
+        except FileNotFoundError:
+            return None
+
+    def _found(self, key: str, data: Optional[bytes]) -> Optional[bytes]:
+        if data is None:
+            self._forget(key)
+        else:
+            self._touch(key, len(data))
+        return data
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Read the cached content of ``url``, if present.
+
+        This blocks on the file system, prefer :meth:`read` in a coroutine.
+        """
+        key = self.key(url)
+        return self._found(key, self._read(key))
+
+    async def read(self, url: str) -> Optional[bytes]:
+        """Same as :meth:`get` but the file is read from a thread pool."""
+        key = self.key(url)
+        loop = asyncio.get_running_loop()
+        return self._found(key, await loop.run_in_executor(None, self._read, key))
+
+    def put(self, url: str, data: bytes) -> None:
+        """Store ``data`` as the content of ``url``.
+
+        The file is written to a temporary name and renamed, so readers never
+        see a partial file. Data larger than ``max_size`` isn't stored.
+        """
+        if not data or len(data) > self.max_size:
+            return
+        key = self.key(url)
+        self._write(key, data)
+        self._add(key, len(data))
+
+    def _write(self, key: str, data: bytes) -> None:
+        # only touches the file system, safe to run in an executor
+        fd, tmp = tempfile.mkstemp(dir=self.path, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._file(key))
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def _add(self, key: str, size: int) -> None:
+        self._forget(key)
+        self._entries[key] = size
+        self._size += size
+        self._evict()
+
+    def _forget(self, key: str) -> None:
+        size = self._entries.pop(key, None)
+        if size is not None:
+            self._size -= size
+
+    def _evict(self) -> None:
+        while self._size > self.max_size and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            self.stats.evicted += 1
+            try:
+                os.unlink(self._file(key))
+            except OSError as e:
+                _log.debug("Couldn't remove cached asset %s: %r", key, e)
+
+    def clear(self) -> None:
+        """Remove every cached file."""
+        while self._entries:
+            key, _ = self._entries.popitem()
+            try:
+                os.unlink(self._file(key))
+            except OSError:
+                pass
+        self._size = 0
+
+    async def fetch(
+        self, url: str, download: Callable[[str], Awaitable[bytes]]
+    ) -> bytes:
+        """Get the content of ``url`` from the cache, calling ``download`` on a miss.
+
+        Concurrent misses for the same URL share a single download.
+        """
+        data = await self.read(url)
+        if data is not None:
+            self.stats.hits += 1
+            return data
+
+        future = self._inflight.get(url)
+        if future is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(future)
+
+        self.stats.misses += 1
+        future = asyncio.ensure_future(self._download(url, download))
+        self._inflight[url] = future
+        return await asyncio.shield(future)
+
+    async def _download(
+        self, url: str, download: Callable[[str], Awaitable[bytes]]
+    ) -> bytes:
+        # stays in _inflight until the file is written, so nobody downloads
+        # the same asset in the meantime
+        try:
+            data = await download(url)
+            await self.store(url, data)
+        finally:
+            self._inflight.pop(url, None)
+        return data
+
+    async def store(self, url: str, data: bytes) -> None:
+        """Same as :meth:`put` but the file is written from a thread pool.
+        Errors are logged instead of raised.
+        """
+        if not data or len(data) > self.max_size:
+            return
+        key = self.key(url)
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write, key, data)
+        except OSError as e:
+            _log.warning("Couldn't cache asset %s: %r", url, e)
+        else:
+            self._add(key, len(data))
+
+
+ConditionalDownload = Callable[
+    [str, Optional[str], Optional[str]], Awaitable[CDNResponse]
+]
+
+
+@attrs.define(slots=True, repr=True)
+class MemoryAssetCacheStats:
+    """Counters collected by a :class:`MemoryAssetCache`.
+
+    Attributes
+    ----------
+    hits: :class:`int`
+        The number of reads served from memory, including revalidated ones.
+    misses: :class:`int`
+        The number of reads that had to fetch the asset.
+    coalesced: :class:`int`
+        The number of misses that waited for a fetch already in progress.
+    not_modified: :class:`int`
+        The number of revalidations answered with ``304 Not Modified``.
+    refreshed: :class:`int`
+        The number of revalidations that returned new content.
+    evicted: :class:`int`
+        The number of assets dropped to stay under the size cap.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    not_modified: int = 0
+    refreshed: int = 0
+    evicted: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """:class:`float`: The fraction of reads served from memory, coalesced
+        reads are not counted.
+        """
+        total = self.hits + self.misses
+        if not total:
+            return 0.0
+        return self.hits / total
+
+
+class _Entry:
+    __slots__ = ("data", "etag", "last_modified", "checked_at")
+
+    def __init__(self, response: CDNResponse) -> None:
+        self.data: bytes = response.data  # type: ignore
+        self.etag = response.etag
+        self.last_modified = response.last_modified
+        self.checked_at = time.monotonic()
+
+
+class MemoryAssetCache:
+    """An in-process LRU cache of CDN assets bounded by their total size.
+
+    URLs containing an asset hash are immutable and never revalidated. Default
+    avatars (see :attr:`User.default_avatar`) have no hash in their URL: there
+    are only a few of them, so they are pinned in memory outside of the size
+    cap and revalidated with ``If-None-Match``/``If-Modified-Since`` every
+    ``revalidate_after`` seconds, a ``304`` response transfers no body.
+
+    Pass it to :class:`Client` with ``asset_memory_cache=``. It's checked before
+    the :class:`DiskAssetCache`, if any.
+
+    Parameters
+    ----------
+    max_size: :class:`int`
+        The maximum total size of the cached assets, in bytes. Defaults to 64 MiB.
+    revalidate_after: :class:`float`
+        How many seconds a mutable asset is served without asking the CDN.
+        Defaults to ``3600``.
+
+    Attributes
+    ----------
+    stats: :class:`MemoryAssetCacheStats`
+        The hit/miss counters of this cache.
+    """
+
+    def __init__(
+        self, max_size: int = 64 * 1024 * 1024, *, revalidate_after: float = 3600.0
+    ) -> None:
+        self.max_size = max_size
+        self.revalidate_after = revalidate_after
+        self.stats = MemoryAssetCacheStats()
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._pinned: Dict[str, _Entry] = {}
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Future[bytes]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._pinned)
+
+    def __contains__(self, url: object) -> bool:
+        return url in self._entries or url in self._pinned
+
+    @property
+    def size(self) -> int:
+        """:class:`int`: The total size of the cached assets, in bytes, pinned ones excluded."""
+        return self._size
+
+    @staticmethod
+    def is_mutable(url: str) -> bool:
+        """Whether the content of ``url`` can change, i.e. it has no asset hash."""
+        return url.startswith(Asset._DEFAULT_AVATARS)
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Get the cached content of ``url`` without revalidating it."""
+        entry = self._pinned.get(url)
+        if entry is None:
+            entry = self._entries.get(url)
+            if entry is None:
+                return None
+            self._entries.move_to_end(url)
+        return entry.data
+
+    def _store(self, url: str, entry: _Entry) -> None:
+        if self.is_mutable(url):
+            self._pinned[url] = entry
+            return
+        size = len(entry.data)
+        if size > self.max_size:
+            return
+        old = self._entries.pop(url, None)
+        if old is not None:
+            self._size -= len(old.data)
+        self._entries[url] = entry
+        self._size += size
+        while self._size > self.max_size:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.data)
+            self.stats.evicted += 1
+
+    def put(self, url: str, response: CDNResponse) -> None:
+        """Store the content of ``url`` with its validators."""
+        if response.data is not None:
+            self._store(url, _Entry(response))
+
+    def discard(self, url: str) -> None:
+        """Remove ``url`` from the cache, pinned or not."""
+        self._pinned.pop(url, None)
+        entry = self._entries.pop(url, None)
+        if entry is not None:
+            self._size -= len(entry.data)
+
+    def clear(self) -> None:
+        """Remove every asset, including the pinned ones."""
+        self._entries.clear()
+        self._pinned.clear()
+        self._size = 0
+
+    async def fetch(self, url: str, download: ConditionalDownload) -> bytes:
+        """Get the content of ``url`` from the cache, calling ``download`` on a
+        miss or when a mutable asset is due for revalidation.
+
+        ``download`` is called with the URL and the ``ETag`` and ``Last-Modified``
+        values of the cached copy, if any. Concurrent fetches of the same URL
+        share a single request.
+        """
+        entry = self._pinned.get(url) or self._entries.get(url)
+        if entry is not None:
+            if url in self._entries:
+                self._entries.move_to_end(url)
+            elif time.monotonic() - entry.checked_at > self.revalidate_after:
+                return await self._join(url, download, entry)
+            self.stats.hits += 1
+            return entry.data
+
+        return await self._join(url, download, None)
+
+    async def _join(
+        self, url: str, download: ConditionalDownload, entry: Optional[_Entry]
+    ) -> bytes:
+        future = self._inflight.get(url)
+        if future is not None:
+            self.stats.coalesced += 1
+            return await asyncio.shield(future)
+
+        if entry is None:
+            self.stats.misses += 1
+        future = asyncio.ensure_future(self._fetch(url, download, entry))
+        self._inflight[url] = future
+        return await asyncio.shield(future)
+
+    async def _fetch(
+        self, url: str, download: ConditionalDownload, entry: Optional[_Entry]
+    ) -> bytes:
+        try:
+            if entry is None:
+                response = await download(url, None, None)
+            else:
+                try:
+                    response = await download(url, entry.etag, entry.last_modified)
+                except Exception as e:
+                    # serve the stale copy rather than failing the read
+                    _log.warning("Couldn't revalidate asset %s: %r", url, e)
+                    self.stats.hits += 1
+                    return entry.data
+
+                if response.data is None:
+                    entry.checked_at = time.monotonic()
+                    self.stats.not_modified += 1
+                    self.stats.hits += 1
+                    return entry.data
+                self.stats.refreshed += 1
+                self.stats.misses += 1
+
+            if response.data is None:
+                raise RuntimeError(
+                    f"The CDN answered 304 to an unconditional request for {url}"
+                )
+            self._store(url, _Entry(response))
+            return response.data
+        finally:
+            self._inflight.pop(url, None)
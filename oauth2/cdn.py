@@ -0,0 +1,438 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+import attrs
+
+from oauth2._bulk import bulk_map
+from oauth2.errors import AssetTooLarge
+
+if TYPE_CHECKING:
+    from oauth2.asset import Asset
+    from oauth2.guild import GuildMembership, PartialGuild
+    from oauth2.user import User
+
+__all__: Tuple[str, ...] = (
+    "AssetDownload",
+    "AssetPrefetcher",
+    "AssetPrefetcherStats",
+    "CDNDownloader",
+    "CDNResponse",
+)
+_log = logging.getLogger(__name__)
+
+
+@attrs.define(slots=True, repr=True)
+class CDNResponse:
+    """The result of a possibly conditional request to the CDN.
+
+    Attributes
+    ----------
+    data: Optional[:class:`bytes`]
+        The body, or ``None`` if the CDN answered ``304 Not Modified``.
+    etag: Optional[:class:`str`]
+        The ``ETag`` header of the response.
+    last_modified: Optional[:class:`str`]
+        The ``Last-Modified`` header of the response.
+    """
+
+    data: Optional[bytes]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+@attrs.define(slots=True, repr=True)
+class AssetDownload:
+    """The outcome of downloading a single asset with :meth:`CDNDownloader.fetch_many`.
+
+    Attributes
+    ----------
+    asset: :class:`Asset`
+        The asset.
+    data: Optional[:class:`bytes`]
+        The content of the asset, ``None`` if the download failed.
+    error: Optional[:class:`Exception`]
+        The error that made the download fail, if any.
+    """
+
+    asset: Asset
+    data: Optional[bytes] = None
+    error: Optional[Exception] = None
+
+    @property
+    def success(self) -> bool:
+        """:class:`bool`: Whether the asset was downloaded."""
+        return self.error is None
+
+
+class _Bandwidth:
+    # a token bucket holding up to one second worth of bytes, downloads that
+    # overdraw it sleep until it's refilled
+    def __init__(self, rate: int) -> None:
+        self.rate = rate
+        self._tokens = float(rate)
+        self._last = time.monotonic()
+
+    async def consume(self, size: int) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+        self._tokens -= size
+        if self._tokens < 0:
+            await asyncio.sleep(-self._tokens / self.rate)
+
+
+class CDNDownloader:
+    """Downloads assets from the Discord CDN with a session and a connection
+    pool separate from the API ones, so bursts of downloads never delay
+    requests like ``/oauth2/token``.
+
+    Pass it to :class:`Client` with ``cdn_downloader=``, by default one is
+    created with the default parameters.
+
+    Parameters
+    ----------
+    max_connections: :class:`int`
+        The maximum number of connections open at the same time.
+    max_connections_per_host: :class:`int`
+        The maximum number of connections open to the same host at the same time.
+    bandwidth_limit: Optional[:class:`int`]
+        The maximum download rate, in bytes per second, shared by all the
+        downloads. Defaults to ``None``, no limit.
+    timeout: :class:`float`
+        The timeout of each download, in seconds. Streams aren't limited in
+        total, only connecting and each read of the body are.
+    chunk_size: :class:`int`
+        The size of the chunks read when ``bandwidth_limit`` is set.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_connections: int = 32,
+        max_connections_per_host: int = 16,
+        bandwidth_limit: Optional[int] = None,
+        timeout: float = 30.0,
+        chunk_size: int = 65536,
+    ) -> None:
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.chunk_size = chunk_size
+        self._bandwidth = _Bandwidth(bandwidth_limit) if bandwidth_limit else None
+        self._session: Optional[aiohttp.ClientSession] = None
+        # a stream can legitimately last longer than any total timeout
+        self._stream_timeout = aiohttp.ClientTimeout(
+            total=None, connect=timeout, sock_read=timeout
+        )
+
+    @property
+    def bandwidth_limit(self) -> Optional[int]:
+        """Optional[:class:`int`]: The maximum download rate, in bytes per second."""
+        if self._bandwidth is not None:
+            return self._bandwidth.rate
+        return None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+            )
+            _log.debug("CDN session object created")
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session and its connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def _read(self, resp: aiohttp.ClientResponse) -> bytes:
+        if self._bandwidth is None:
+            return await resp.read()
+        chunks: List[bytes] = []
+        async for chunk in self.iter_chunks(resp, self.chunk_size):
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    async def iter_chunks(
+        self, resp: aiohttp.ClientResponse, chunk_size: int
+    ) -> AsyncIterator[bytes]:
+        """Yield the body of ``resp`` in chunks, respecting the bandwidth limit."""
+        async for chunk in resp.content.iter_chunked(chunk_size):
+            if self._bandwidth is not None:
+                await self._bandwidth.consume(len(chunk))
+            yield chunk
+
+    async def request(
+        self, url: str, *, headers: Optional[Dict[str, str]] = None
+    ) -> aiohttp.ClientResponse:
+        """Send a GET request to ``url`` and return the response as soon as the
+        headers are received. The caller must call ``release()`` on it.
+        """
+        return await self._get_session().get(
+            url, headers=headers, timeout=self._stream_timeout
+        )
+
+    async def download(self, url: str) -> bytes:
+        """Download the content of ``url``."""
+        async with self._get_session().get(url) as resp:
+            resp.raise_for_status()
+            return await self._read(resp)
+
+    async def conditional_download(
+        self, url: str, etag: Optional[str], last_modified: Optional[str]
+    ) -> CDNResponse:
+        """Download ``url`` unless it still matches ``etag`` or ``last_modified``."""
+        headers: Dict[str, str] = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+
+        async with self._get_session().get(url, headers=headers) as resp:
+            if resp.status == 304:
+                return CDNResponse(None, etag, last_modified)
+            resp.raise_for_status()
+            return CDNResponse(
+                await self._read(resp),
+                resp.headers.get("ETag"),
+                resp.headers.get("Last-Modified"),
+            )
+
+    async def stream(
+        self, url: str, *, chunk_size: int = 65536, max_size: Optional[int] = None
+    ) -> AsyncIterator[bytes]:
+        """Yield the content of ``url`` in chunks of at most ``chunk_size`` bytes.
+
+        Raises :exc:`AssetTooLarge` as soon as the content is known to exceed
+        ``max_size``.
+        """
+        async with self._get_session().get(url, timeout=self._stream_timeout) as resp:
+            resp.raise_for_status()
+            if max_size is not None and (resp.content_length or 0) > max_size:
+                raise AssetTooLarge(url, max_size)
+            received = 0
+            async for chunk in self.iter_chunks(resp, chunk_size):
+                received += len(chunk)
+                if max_size is not None and received > max_size:
+                    raise AssetTooLarge(url, max_size)
+                yield chunk
+
+    async def fetch_many(
+        self, assets: Iterable[Asset], *, concurrency: int = 8
+    ) -> AsyncIterator[AssetDownload]:
+        """Download many assets in parallel, yielding an :class:`AssetDownload`
+        for each one as soon as it finishes.
+
+        The assets are read with :meth:`Asset.read`, so the client caches are used.
+        Only a few results are buffered, a slow consumer pauses the downloads.
+
+        Parameters
+        ----------
+        assets: Iterable[:class:`Asset`]
+            The assets to download. The iterable is consumed lazily.
+        concurrency: :class:`int`
+            How many assets are downloaded at the same time.
+        """
+
+        async def fetch(asset: Asset) -> AssetDownload:
+            try:
+                return AssetDownload(asset, await asset.read())
+            except Exception as e:
+                return AssetDownload(asset, None, e)
+
+        async for result in bulk_map(assets, fetch, concurrency):
+            yield result
+
+
+@attrs.define(slots=True, repr=True)
+class AssetPrefetcherStats:
+    """Counters collected by an :class:`AssetPrefetcher`.
+
+    Attributes
+    ----------
+    scheduled: :class:`int`
+        The number of assets queued.
+    completed: :class:`int`
+        The number of assets downloaded into the cache.
+    failed: :class:`int`
+        The number of assets that couldn't be downloaded.
+    dropped: :class:`int`
+        The number of assets not queued because the queue was full or the
+        user was over the cap.
+    """
+
+    scheduled: int = 0
+    completed: int = 0
+    failed: int = 0
+    dropped: int = 0
+
+
+class AssetPrefetcher:
+    """Downloads the assets of the users who just logged in into the asset
+    caches in the background, so they are already local when a page asks
+    for them.
+
+    When passed to :class:`Client` with ``asset_prefetcher=``, the avatar and
+    banner are queued by :meth:`OAuth2Session.fetch_current_user` and the guild
+    icons by :meth:`User.guilds`. Nothing is prefetched if the client has
+    neither a :class:`MemoryAssetCache` nor a :class:`DiskAssetCache`.
+
+    Prefetching is low priority: a few workers handle the queue, and when it's
+    full new assets are dropped rather than waited for.
+
+    Parameters
+    ----------
+    max_per_user: :class:`int`
+        The maximum number of assets prefetched for each user per ``budget_window``.
+    budget_window: :class:`float`
+        How long a user's budget lasts, in seconds. A login after it gets a new
+        one, a burst of calls within it (avatar, then guild icons) shares it.
+    workers: :class:`int`
+        How many assets are downloaded at the same time.
+    max_pending: :class:`int`
+        The maximum number of queued assets.
+    size: Optional[:class:`int`]
+        Prefetch this size of the assets (see :meth:`Asset.with_size`) instead
+        of the default one, use the size your pages render.
+
+    Attributes
+    ----------
+    stats: :class:`AssetPrefetcherStats`
+        The counters of this prefetcher.
+    """
+
+    # how many users' budgets are remembered
+    _MAX_TRACKED_USERS = 4096
+
+    def __init__(
+        self,
+        *,
+        max_per_user: int = 16,
+        budget_window: float = 60.0,
+        workers: int = 2,
+        max_pending: int = 1024,
+        size: Optional[int] = None,
+    ) -> None:
+        self.max_per_user = max_per_user
+        self.budget_window = budget_window
+        self.workers = workers
+        self.max_pending = max_pending
+        self.size = size
+        self.stats = AssetPrefetcherStats()
+        self._queue: Optional[asyncio.Queue[Asset]] = None
+        self._tasks: List[asyncio.Task[None]] = []
+        self._pending: set[str] = set()
+        # user id -> (start of the budget window, assets queued in it)
+        self._budgets: OrderedDict[int, Tuple[float, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def _start(self) -> asyncio.Queue[Asset]:
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            self._tasks = [
+                asyncio.ensure_future(self._worker(self._queue))
+                for _ in range(self.workers)
+            ]
+        return self._queue
+
+    def _budget(self, user_id: int) -> Tuple[float, int]:
+        budgets = self._budgets
+        now = time.monotonic()
+        started, used = budgets.pop(user_id, (now, 0))
+        if now - started >= self.budget_window:
+            started, used = now, 0
+        budgets[user_id] = (started, used)
+        if len(budgets) > self._MAX_TRACKED_USERS:
+            budgets.popitem(last=False)
+        return started, used
+
+    def prefetch(self, user_id: int, assets: Iterable[Optional[Asset]]) -> int:
+        """Queue ``assets`` on behalf of a user. ``None`` values are skipped.
+
+        Returns
+        -------
+        :class:`int`
+            How many assets were queued.
+        """
+        started, used = self._budget(user_id)
+        budget = self.max_per_user - used
+        queued = 0
+        for asset in assets:
+            if asset is None:
+                continue
+            http = asset._http
+            if http.asset_memory_cache is None and http.asset_cache is None:
+                _log.debug(
+                    "Not prefetching %s, the client has no asset cache", asset.url
+                )
+                continue
+            if self.size is not None:
+                asset = asset.with_size(self.size)
+            if asset.url in self._pending or (
+                http.asset_memory_cache is not None
+                and asset.url in http.asset_memory_cache
+            ):
+                continue
+            if queued >= budget:
+                self.stats.dropped += 1
+                continue
+
+            queue = self._start()
+            try:
+                queue.put_nowait(asset)
+            except asyncio.QueueFull:
+                self.stats.dropped += 1
+                continue
+            self._pending.add(asset.url)
+            self.stats.scheduled += 1
+            queued += 1
+
+        self._budgets[user_id] = (started, used + queued)
+        return queued
+
+    def prefetch_user(self, user: User) -> int:
+        """Queue the avatar, or default avatar, and the banner of ``user``."""
+        return self.prefetch(user.id, (user.avatar or user.default_avatar, user.banner))
+
+    def prefetch_guilds(
+        self, user_id: int, guilds: Iterable[PartialGuild | GuildMembership]
+    ) -> int:
+        """Queue the icons of the guilds of a user."""
+        return self.prefetch(user_id, (guild.icon for guild in guilds))
+
+    async def _worker(self, queue: asyncio.Queue[Asset]) -> None:
+        while True:
+            asset = await queue.get()
+            try:
+                await asset.read()
+            except Exception as e:
+                self.stats.failed += 1
+                _log.debug("Couldn't prefetch %s: %r", asset.url, e)
+            else:
+                self.stats.completed += 1
+            finally:
+                self._pending.discard(asset.url)
+
+    async def close(self) -> None:
+        """Stop the workers, dropping the queued assets."""
+        for task in self._tasks:
+            task.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
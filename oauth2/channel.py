@@ -4,6 +4,7 @@ from typing import Optional, List, TYPE_CHECKING
 
 import attrs
 
+from oauth2.mixins import Hashable
 from oauth2.user import User
 
 if TYPE_CHECKING:
@@ -11,8 +12,8 @@ if TYPE_CHECKING:
     from oauth2.types import GroupDMChannel as GroupDMChannelPayload
 
 
-@attrs.define(slots=True, repr=True)
-class GroupDMChannel:
+@attrs.define(slots=True, repr=True, eq=False)
+class GroupDMChannel(Hashable):
     id: int
     recipients: List[User]
     owner_id: int
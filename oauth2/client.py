@@ -1,18 +1,27 @@
 from __future__ import annotations
 
 import asyncio
-import collections
+import gc
+import itertools
 import logging
-import secrets
-from typing import Optional, Tuple, List, Dict
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
 
 import aiohttp
 
 from oauth2._http import HTTPClient
 from oauth2.appinfo import AppInfo
+from oauth2.asset import Asset
+from oauth2.cache import DiskAssetCache, MemoryAssetCache
+from oauth2.cdn import AssetDownload, AssetPrefetcher, CDNDownloader
+from oauth2.credentials import ManagedCredentials
+from oauth2.errors import InvalidState
+from oauth2.guild import GuildIdentityMap
+from oauth2.onboarding import BulkMemberAdd, JoinableSource
+from oauth2.revocation import BulkRevocation, RevocableSource, RevocationCheckpoint
 from oauth2.scopes import OAuthScopes
 from oauth2.session import OAuth2Session
-from oauth2.utils import PromptType, ResponseType, get_oauth2_url
+from oauth2.state import MemoryStateStore, SignedStateStore, StatePool, StateStore
+from oauth2.utils import PromptType, ResponseType, _oauth2_url_prefix
 
 __all__: Tuple[str, ...] = ("Client",)
 _log = logging.getLogger(__name__)
@@ -30,6 +39,16 @@ class Client:
         connector: Optional[aiohttp.BaseConnector] = None,
         loop: Optional[asyncio.AbstractEventLoop] = None,
         max_states_cache: int = 1000,
+        state_store: Optional[StateStore] = None,
+        state_ttl: float = 600.0,
+        credentials_renewal_margin: float = 60.0,
+        lazy_models: bool = False,
+        guild_identity_map: bool = False,
+        freeze_gc_after: Optional[int] = None,
+        asset_cache: Optional[DiskAssetCache] = None,
+        asset_memory_cache: Optional[MemoryAssetCache] = None,
+        cdn_downloader: Optional[CDNDownloader] = None,
+        asset_prefetcher: Optional[AssetPrefetcher] = None,
     ) -> None:
         """Represets a client connection that connects to Discord.
         This class is used to interact with the Discord OAuth2 API endpoints.
@@ -51,6 +70,44 @@ class Client:
             :func:`asyncio.get_event_loop()`.
         max_states_cache: :class:`int`
             The maximum number of security states strings to cache.
+            Ignored if ``state_store`` is passed.
+        state_store: Optional[:class:`StateStore`]
+            Where to keep the generated security states. Defaults to a
+            :class:`MemoryStateStore` holding up to ``max_states_cache`` states.
+            Pass a custom store to share states between multiple processes, or a
+            :class:`SignedStateStore` to verify states on any process without
+            shared storage.
+        state_ttl: :class:`float`
+            How many seconds a generated state stays valid. Defaults to ``600``.
+        credentials_renewal_margin: :class:`float`
+            How many seconds before its expiration the client credentials token
+            is renewed in the background. Defaults to ``60``.
+        lazy_models: :class:`bool`
+            Whether to build :class:`User`, :class:`PartialGuild` and :class:`AppInfo`
+            objects lazily. Lazy models keep the raw payload and decode each field
+            the first time it's accessed, which is faster when only a few fields are read.
+        guild_identity_map: :class:`bool`
+            Whether :meth:`User.guilds` should yield :class:`GuildMembership` objects
+            sharing a single :class:`SharedGuild` per guild id instead of a new
+            :class:`PartialGuild` per user. This saves memory when many users are in
+            the same guilds.
+        freeze_gc_after: Optional[:class:`int`]
+            After how many successful :meth:`exchange_code` calls :meth:`freeze_gc`
+            is called automatically, considering the application warmed up.
+            Defaults to ``None``, in which case it's never called automatically.
+        asset_cache: Optional[:class:`DiskAssetCache`]
+            Where :meth:`Asset.read` keeps the downloaded CDN assets. Defaults to
+            ``None``, in which case assets are downloaded on every read.
+        asset_memory_cache: Optional[:class:`MemoryAssetCache`]
+            An in-process cache checked by :meth:`Asset.read` before ``asset_cache``.
+            Defaults to ``None``.
+        cdn_downloader: Optional[:class:`CDNDownloader`]
+            Downloads the assets with a connection pool separate from the API one.
+            Pass one to change its limits, defaults to a :class:`CDNDownloader`
+            with the default parameters.
+        asset_prefetcher: Optional[:class:`AssetPrefetcher`]
+            Prefetches the avatar, banner and guild icons of the users who log in
+            into the asset caches. Defaults to ``None``, no prefetching.
 
         Attributes
         ----------
@@ -60,16 +117,20 @@ class Client:
             The url link to use when redirecting the user after a successful login with discord.
         scopes: :class:`OAuthScopes`
             The scopes that the client uses.
+        state_store: :class:`StateStore`
+            The store that keeps track of the generated security states.
+        state_ttl: :class:`float`
+            How many seconds a generated state stays valid by default.
         loop: :class:`asyncio.AbstractEventLoop`
             The event loop that the client uses for asynchronous operations.
         """
         self.client_id = client_id
         self.redirect_uri = redirect_uri
         self.scopes = scopes
-        self.__oauth2_sessions: List[OAuth2Session] = []
-        self.__states: collections.deque[str] = collections.deque(
-            maxlen=max_states_cache
-        )
+        self.__oauth2_sessions: Dict[int, OAuth2Session] = {}
+        self.state_store = state_store or MemoryStateStore(max_states_cache)
+        self.state_ttl = state_ttl
+        self._state_pool = StatePool()
 
         # should raise a deprecation warning
         self.loop = loop or asyncio.get_event_loop()
@@ -79,7 +140,16 @@ class Client:
             client_id=client_id,
             client_secret=client_secret,
             bot_token=bot_token,
+            lazy_models=lazy_models,
+            guild_map=GuildIdentityMap() if guild_identity_map else None,
+            asset_cache=asset_cache,
+            asset_memory_cache=asset_memory_cache,
+            cdn=cdn_downloader,
+            prefetcher=asset_prefetcher,
         )
+        self._credentials = ManagedCredentials(self, margin=credentials_renewal_margin)
+        self._freeze_gc_after = freeze_gc_after
+        self._logins = 0
 
     @property
     def oauth2_sessions(self) -> Tuple[OAuth2Session, ...]:
@@ -89,20 +159,40 @@ class Client:
             This is populated only if you use the :attr:`ResponseType.code` authorization flow. Otherwise you should handle its population when receiving the ``access_token``.
             You can handle its population subclassig the :class:`Client` class and creating your custom methods.
         """
-        return tuple(self.__oauth2_sessions)
+        return tuple(self.__oauth2_sessions.values())
+
+    def _add_oauth2_session(self, _session: OAuth2Session) -> None:
+        self.__oauth2_sessions[id(_session)] = _session
 
     def _remove_oauth2_session(self, _session: OAuth2Session) -> None:
-        self.__oauth2_sessions.remove(_session)
+        if _session is self._credentials.session:
+            self._credentials.invalidate()
+            return
+        self.__oauth2_sessions.pop(id(_session), None)
+
+    @property
+    def client_credentials(self) -> Optional[OAuth2Session]:
+        """Optional[:class:`OAuth2Session`]: Returns the cached client credentials session, if any.
+
+        This never waits for a request, the token is kept fresh in the background
+        after the first call to :meth:`fetch_client_credentials_token`.
+        """
+        return self._credentials.session
 
     @property
     def states(self) -> Tuple[str, ...]:
-        """Tuple[:class:`str`]: Returns the generated string states.
+        """Tuple[:class:`str`]: Returns the generated string states that weren't consumed yet.
         These are the security strings passed when logging-in users.
 
+        This is always empty if a custom :attr:`state_store` that isn't a
+        :class:`MemoryStateStore` is used.
+
         For more information about this read https://discord.com/developers/docs/topics/oauth2#state-and-security
         """
         # find a way to create an hyperlink
-        return tuple(self.__states)
+        if isinstance(self.state_store, MemoryStateStore):
+            return tuple(self.state_store)
+        return ()
 
     async def generate_state_link(
         self,
@@ -111,6 +201,8 @@ class Client:
         disable_guild_select: bool = False,
         response_type: ResponseType = ResponseType.code,
         prompt: PromptType = PromptType.consent,
+        state_ttl: Optional[float] = None,
+        state_payload: Optional[str] = None,
     ) -> str:
         """Generate an invite link for a user to log-in.
         This function is useful to create invite links dynamically.
@@ -145,31 +237,138 @@ class Client:
             .. note::
                 For passthrough scopes, like :attr:`OAuthScopes.bot` and :attr:`OAuthScopes.webhook_incoming`, authorization is always required.
 
+        state_ttl: Optional[:class:`float`]
+            How many seconds the state of this link stays valid.
+            Defaults to :attr:`state_ttl`.
+        state_payload: Optional[:class:`str`]
+            Data to embed in the state, e.g. the URL to return to after logging-in.
+            Read it back with :meth:`SignedStateStore.unpack`.
+
+            .. note::
+                This is supported only when :attr:`state_store` is a :class:`SignedStateStore`.
+
         Returns
         -------
         :class:`str`
             The authorization link that the user should use
             to authorize your application.
         """
+        ttl = self.state_ttl if state_ttl is None else state_ttl
+        state = self._new_state(ttl, state_payload)
+        await self.state_store.add(state, ttl)
+        return self._state_link(
+            state, permissions, guild_id, disable_guild_select, response_type, prompt
+        )
+
+    def generate_state_link_nowait(
+        self,
+        permissions: Optional[int] = None,
+        guild_id: Optional[int] = None,
+        disable_guild_select: bool = False,
+        response_type: ResponseType = ResponseType.code,
+        prompt: PromptType = PromptType.consent,
+        state_ttl: Optional[float] = None,
+        state_payload: Optional[str] = None,
+    ) -> str:
+        """The synchronous version of :meth:`generate_state_link`, it takes the same parameters.
+
+        This requires a :attr:`state_store` that implements :meth:`StateStore.add_nowait`,
+        like :class:`MemoryStateStore` and :class:`SignedStateStore`.
+        """
+        ttl = self.state_ttl if state_ttl is None else state_ttl
+        state = self._new_state(ttl, state_payload)
+        self.state_store.add_nowait(state, ttl)
+        return self._state_link(
+            state, permissions, guild_id, disable_guild_select, response_type, prompt
+        )
+
+    def _new_state(self, ttl: float, payload: Optional[str]) -> str:
         # implementation of state for security reasons
         # https://discord.com/developers/docs/topics/oauth2#state-and-security
-        state_future = self.loop.run_in_executor(None, secrets.token_urlsafe, 32)
-        await state_future
-
-        state = state_future.result()
-        self.__states.append(state)
-
-        return get_oauth2_url(
-            client_id=self.client_id,
-            scopes=self.scopes,
-            redirect_uri=self.redirect_uri,
-            response_type=response_type,
-            state=state,
-            prompt=prompt,
-            permissions=permissions,
-            guild_id=guild_id,
-            disable_guild_select=disable_guild_select,
+        if isinstance(self.state_store, SignedStateStore):
+            return self.state_store.create(ttl, payload)
+        if payload is not None:
+            raise ValueError("state_payload requires a SignedStateStore")
+        return self._state_pool.pop()
+
+    def _state_link(
+        self,
+        state: str,
+        permissions: Optional[int],
+        guild_id: Optional[int],
+        disable_guild_select: bool,
+        response_type: ResponseType,
+        prompt: PromptType,
+    ) -> str:
+        prefix, tail = _oauth2_url_prefix(
+            self.client_id,
+            self.scopes,
+            self.redirect_uri,
+            permissions,
+            guild_id,
+            disable_guild_select,
+            response_type,
+            prompt,
+        )
+        return f"{prefix}&state={state}{tail}"
+
+    def generate_state_links(
+        self,
+        n: int,
+        permissions: Optional[int] = None,
+        guild_id: Optional[int] = None,
+        disable_guild_select: bool = False,
+        response_type: ResponseType = ResponseType.code,
+        prompt: PromptType = PromptType.consent,
+        state_ttl: Optional[float] = None,
+        state_payloads: Optional[Iterable[str]] = None,
+    ) -> Iterator[str]:
+        """Lazily generate ``n`` links, each one with its own state.
+        This takes the same parameters as :meth:`generate_state_link`.
+
+        The url is built once and only the state changes between links, so this
+        is meant for generating links in bulk, e.g. for email campaigns.
+
+        .. note::
+            Every state is added to :attr:`state_store`, so with a :class:`MemoryStateStore`
+            only the last ``max_states_cache`` links stay valid. Use a :class:`SignedStateStore`
+            for big batches.
+
+        Parameters
+        ----------
+        n: :class:`int`
+            The number of links to generate.
+        state_payloads: Optional[Iterable[:class:`str`]]
+            A payload to embed in each state, generation stops when this is exhausted.
+            This requires a :class:`SignedStateStore`.
+
+        Yields
+        ------
+        :class:`str`
+            The authorization links.
+        """
+        ttl = self.state_ttl if state_ttl is None else state_ttl
+        prefix, tail = _oauth2_url_prefix(
+            self.client_id,
+            self.scopes,
+            self.redirect_uri,
+            permissions,
+            guild_id,
+            disable_guild_select,
+            response_type,
+            prompt,
+        )
+        prefix += "&state="
+        add = self.state_store.add_nowait
+        payloads: Iterator[Optional[str]] = (
+            iter(state_payloads)
+            if state_payloads is not None
+            else itertools.repeat(None)
         )
+        for payload in itertools.islice(payloads, n):
+            state = self._new_state(ttl, payload)
+            add(state, ttl)
+            yield prefix + state + tail
 
     async def exchange_code(
         self, code: str, state: Optional[str] = None
@@ -184,31 +383,190 @@ class Client:
         code: :class:`str`
             The security code that discord sent to you.
         state: Optional[:class:`str`]
-            The security ``state`` string, if any.
+            The security ``state`` string, if any. Each state can be used only once.
+
+        Raises
+        ------
+        :class:`InvalidState`
+            The state wasn't generated by this client, expired or was already used.
         """
         # validate the state
         if state:
             # this state wasn't generated by us!
-            if state not in self.__states:
-                raise
+            if not await self.state_store.consume(state):
+                raise InvalidState(state)
 
         data = await self.http._exchange_token(
             code=code, redirect_uri=self.redirect_uri
         )
         session = OAuth2Session.from_data(data, state, self)
-        self.oauth2_sessions.append(session)
+        self._add_oauth2_session(session)
+
+        self._logins += 1
+        if self._logins == self._freeze_gc_after:
+            self.freeze_gc()
         return session
 
-    async def fetch_client_credentials_token(self) -> OAuth2Session:
+    def freeze_gc(self) -> None:
+        """Move every object currently tracked by the garbage collector to the
+        permanent generation, see :func:`gc.freeze`.
+
+        Call this once the application is warmed up (imports done, caches filled),
+        so that the full collections triggered by the churn of short lived objects
+        (sessions, users, guilds...) don't have to traverse the long lived ones
+        again, which shortens their pauses.
+        """
+        gc.collect()
+        gc.freeze()
+        _log.debug(
+            "Froze %d objects in the permanent generation", gc.get_freeze_count()
+        )
+
+    async def fetch_client_credentials_token(
+        self, *, force: bool = False
+    ) -> OAuth2Session:
         """Get the access token of the application owner using the client id and the client secret.
 
+        The token is cached and renewed in the background shortly before it expires,
+        so calling this multiple times doesn't hit the Discord API again. Use
+        :attr:`client_credentials` to get the cached session without awaiting.
+
         .. warning::
             Meant to be used only for testing purpouses. Be careful with your ``client_id`` and ``client_secret`` because **anyone** could be able to fetch your access token through them.
+
+        Parameters
+        ----------
+        force: :class:`bool`
+            Whether to ignore the cached token and fetch a new one.
         """
-        data = await self.http._get_client_credentials_token(self.scopes)
-        session = OAuth2Session.from_data(data, None, self)
-        self.oauth2_sessions.append(session)
-        return session
+        return await self._credentials.get(force=force)
+
+    def revoke_many(
+        self,
+        sessions: RevocableSource,
+        *,
+        concurrency: int = 10,
+        include_refresh_tokens: bool = True,
+        checkpoint: Optional[RevocationCheckpoint] = None,
+        max_retries: int = 5,
+    ) -> BulkRevocation:
+        """Revoke many tokens at once, for example after a data breach.
+
+        Tokens are streamed from ``sessions`` so the source doesn't need to fit in
+        memory. Requests are throttled from Discord's rate limit headers so the
+        run stays under the limit instead of collecting 429s, if one still
+        happens the bucket pauses for the ``Retry-After`` duration before
+        retrying. Revoked sessions are removed from :attr:`oauth2_sessions`.
+
+        .. code-block:: python
+
+            run = client.revoke_many(client.oauth2_sessions, checkpoint=RevocationCheckpoint("revoked.log"))
+            async for result in run:
+                if not result.success:
+                    print(result.error)
+            print(run.stats.throughput)
+
+        Parameters
+        ----------
+        sessions: Union[Iterable, AsyncIterable]
+            The :class:`OAuth2Session` objects or raw access tokens to revoke.
+            This can be an async iterable, e.g. a query over your token store.
+        concurrency: :class:`int`
+            The maximum number of revocation requests in flight.
+        include_refresh_tokens: :class:`bool`
+            Whether to also revoke the ``refresh_token`` of each session.
+        checkpoint: Optional[:class:`RevocationCheckpoint`]
+            Where to record revoked tokens. Tokens already in the checkpoint are
+            skipped, allowing an interrupted run to be resumed.
+        max_retries: :class:`int`
+            How many times a rate limited token is retried before giving up.
+
+        Returns
+        -------
+        :class:`BulkRevocation`
+            An async iterable yielding a :class:`RevocationResult` per token.
+        """
+        return BulkRevocation(
+            self,
+            sessions,
+            concurrency=concurrency,
+            include_refresh_tokens=include_refresh_tokens,
+            checkpoint=checkpoint,
+            max_retries=max_retries,
+        )
+
+    def add_guild_members(
+        self,
+        guild_id: int,
+        sessions: JoinableSource,
+        *,
+        roles: Optional[Iterable[int]] = None,
+        mute: Optional[bool] = None,
+        deaf: Optional[bool] = None,
+        concurrency: int = 10,
+        max_retries: int = 5,
+    ) -> BulkMemberAdd:
+        """Add many users to a guild at once, for example to onboard the users
+        who just authorized the application. Requires a ``bot_token``, the bot
+        must be in the guild with the ``CREATE_INSTANT_INVITE`` permission.
+
+        Users are streamed from ``sessions`` so the source doesn't need to fit in
+        memory. Users that are already members of the guild aren't modified and
+        are reported with :attr:`MemberAddResult.already_member`. When Discord
+        answers with a 429 every worker pauses for the ``Retry-After`` duration
+        before retrying. A session without the ``guilds.join`` scope fails
+        before any request is sent.
+
+        .. code-block:: python
+
+            run = client.add_guild_members(guild_id, users, roles=[verified_role_id])
+            async for result in run:
+                if not result.success:
+                    print(result.user_id, result.error)
+            print(run.stats.added, run.stats.throughput)
+
+        Parameters
+        ----------
+        guild_id: :class:`int`
+            The id of the guild to add the users to.
+        sessions: Union[Iterable, AsyncIterable]
+            The :class:`User` objects or :class:`OAuth2Session` objects of the users
+            to add. This can be an async iterable, e.g. a query over your token store.
+            For a bare session the user id is fetched first, which also requires
+            the ``identify`` scope.
+        roles: Optional[Iterable[:class:`int`]]
+            The ids of the roles given to the new members.
+        mute: Optional[:class:`bool`]
+            Whether the new members are muted in voice channels.
+        deaf: Optional[:class:`bool`]
+            Whether the new members are deafened in voice channels.
+        concurrency: :class:`int`
+            The maximum number of requests in flight.
+        max_retries: :class:`int`
+            How many times a rate limited user is retried before giving up.
+
+        Raises
+        ------
+        ValueError
+            The client has no ``bot_token``.
+
+        Returns
+        -------
+        :class:`BulkMemberAdd`
+            An async iterable yielding a :class:`MemberAddResult` per user.
+        """
+        if not self.http.has_bot_token:
+            raise ValueError("A bot_token is required to add members to a guild")
+        return BulkMemberAdd(
+            self,
+            guild_id,
+            sessions,
+            roles=list(roles or ()),
+            mute=mute,
+            deaf=deaf,
+            concurrency=concurrency,
+            max_retries=max_retries,
+        )
 
     async def fetch_application_info(self) -> AppInfo:
         """Fetch the application information from the Discord API.
@@ -221,5 +579,31 @@ class Client:
         data = await self.http._get_app_info()
         return AppInfo.from_data(data, self.http)
 
+    def fetch_assets(
+        self, assets: Iterable[Asset], *, concurrency: int = 8
+    ) -> AsyncIterator[AssetDownload]:
+        """Download many assets in parallel with the client :class:`CDNDownloader`,
+        yielding an :class:`AssetDownload` for each one as soon as it finishes.
+
+        .. code-block:: python
+
+            async for download in client.fetch_assets(user.avatar for user in users):
+                if download.success:
+                    ...
+
+        Parameters
+        ----------
+        assets: Iterable[:class:`Asset`]
+            The assets to download. The iterable is consumed lazily.
+        concurrency: :class:`int`
+            How many assets are downloaded at the same time. Defaults to ``8``.
+        """
+        return self.http.cdn.fetch_many(assets, concurrency=concurrency)
+
+    async def close(self) -> None:
+        """Stop the background tasks and close the HTTP session."""
+        self._credentials.close()
+        await self.http.close()
+
     async def create_group_dm(self, access_tokens: List[str], nicks: Dict[int, str]):
         data = await self.http._create_group_dm(access_tokens, nicks)
@@ -1,10 +1,11 @@
 from __future__ import annotations
-from typing import Optional, TYPE_CHECKING, Tuple, List
+from typing import Any, Optional, TYPE_CHECKING, Set, Tuple, List
 
 import enum
 import attrs
 
 from oauth2.integration import PartialIntegration
+from oauth2.mixins import Updatable
 
 if TYPE_CHECKING:
     from oauth2.types import (
@@ -53,7 +54,7 @@ class VisibilityType(enum.IntEnum):
 
 
 @attrs.define(repr=True, slots=True)
-class Connection:
+class Connection(Updatable):
     id: int
     name: str
     type: ConnectionType
@@ -64,6 +65,9 @@ class Connection:
     visibility: VisibilityType
     integrations: Optional[List[PartialIntegration]]
     revoked: Optional[bool] = False
+    _payload: Optional[Any] = attrs.field(
+        default=None, init=False, repr=False, eq=False
+    )
 
     @classmethod
     def from_data(cls, data: ConnectionData) -> Connection:
@@ -72,7 +76,7 @@ class Connection:
         else:
             integrations = None
 
-        return cls(
+        connection = cls(
             id=data["id"],  # type: ignore
             name=data["name"],
             type=ConnectionType.from_api(data["type"]),
@@ -84,6 +88,21 @@ class Connection:
             integrations=integrations,
             revoked=data.get("revoked"),
         )
+        connection._payload = data
+        return connection
+
+    def update_from(self, data: ConnectionData) -> Set[str]:
+        """Update this object in place from a new payload.
+
+        If the payload is exactly the same as the one this object was built or
+        last updated from, nothing is built or compared.
+
+        Returns
+        -------
+        Set[:class:`str`]
+            The names of the fields that changed, empty if nothing changed.
+        """
+        return self._update_from(data, lambda: Connection.from_data(data))
 
 
 class MetadataType(enum.IntEnum):
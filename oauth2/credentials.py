@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import asyncio
+import datetime
+import logging
+from typing import TYPE_CHECKING, Optional, Tuple
+
+from oauth2.session import OAuth2Session
+
+if TYPE_CHECKING:
+    from oauth2.client import Client
+
+__all__: Tuple[str, ...] = ("ManagedCredentials",)
+_log = logging.getLogger(__name__)
+
+
+class ManagedCredentials:
+    """Holds the client credentials token of the application owner and
+    keeps it fresh in the background.
+
+    The token is cached until ``margin`` seconds before it expires, then it's
+    renewed by a background task. Concurrent renewals are collapsed into a
+    single request to ``/oauth2/token``.
+
+    Parameters
+    ----------
+    client: :class:`Client`
+        The client that owns these credentials.
+    margin: :class:`float`
+        How many seconds before the expiration the token should be renewed.
+    """
+
+    def __init__(self, client: Client, *, margin: float = 60.0) -> None:
+        self._client = client
+        self.margin = margin
+        self._session: Optional[OAuth2Session] = None
+        self._inflight: Optional[asyncio.Task[OAuth2Session]] = None
+        self._renew_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def session(self) -> Optional[OAuth2Session]:
+        """Optional[:class:`OAuth2Session`]: The cached session, if any.
+
+        This never performs I/O, so it's safe to call on hot paths.
+        """
+        return self._session
+
+    @property
+    def access_token(self) -> Optional[str]:
+        """Optional[:class:`str`]: The cached ``access_token``, if any."""
+        if self._session is not None:
+            return self._session.access_token
+
+    def _seconds_left(self, session: OAuth2Session) -> float:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        return (session.expires_in - now).total_seconds()
+
+    @property
+    def is_fresh(self) -> bool:
+        """:class:`bool`: Whether the cached token is outside the renewal margin."""
+        if self._session is None:
+            return False
+        return self._seconds_left(self._session) > self.margin
+
+    async def get(self, *, force: bool = False) -> OAuth2Session:
+        """Return the cached session, fetching a new one if it's missing or stale.
+
+        Parameters
+        ----------
+        force: :class:`bool`
+            Whether to ignore the cached token and fetch a new one.
+        """
+        if not force and self.is_fresh:
+            return self._session  # type: ignore
+        return await self.renew()
+
+    async def renew(self) -> OAuth2Session:
+        """Fetch a new token. If a renewal is already running this waits for it
+        instead of starting another request.
+        """
+        if self._inflight is None:
+            self._inflight = self._client.loop.create_task(self._renew())
+        return await asyncio.shield(self._inflight)
+
+    async def _renew(self) -> OAuth2Session:
+        try:
+            data = await self._client.http._get_client_credentials_token(
+                self._client.scopes
+            )
+            self._session = OAuth2Session.from_data(data, None, self._client)
+            _log.debug("Client credentials token renewed")
+        finally:
+            self._inflight = None
+        self._schedule(self._session)
+        return self._session
+
+    def _schedule(self, session: OAuth2Session) -> None:
+        if self._renew_handle is not None:
+            self._renew_handle.cancel()
+        delay = max(self._seconds_left(session) - self.margin, 0.0)
+        self._renew_handle = self._client.loop.call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._renew_handle = None
+        task = self._client.loop.create_task(self.renew())
+        task.add_done_callback(self._log_failure)
+
+    def _log_failure(self, task: asyncio.Task[OAuth2Session]) -> None:
+        if task.cancelled():
+            return
+        if exc := task.exception():
+            _log.warning("Couldn't renew the client credentials token: %r", exc)
+            # retry later instead of leaving the token to expire silently
+            self._renew_handle = self._client.loop.call_later(
+                min(self.margin, 30.0) or 1.0, self._on_timer
+            )
+
+    def invalidate(self) -> None:
+        """Drop the cached token and stop the background renewal."""
+        self._session = None
+        if self._renew_handle is not None:
+            self._renew_handle.cancel()
+            self._renew_handle = None
+
+    def close(self) -> None:
+        """Stop any pending or running renewal."""
+        self.invalidate()
+        if self._inflight is not None:
+            self._inflight.cancel()
+            self._inflight = None
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Tuple
+
+if TYPE_CHECKING:
+    from oauth2.scopes import OAuthScopes
+
+__all__: Tuple[str, ...] = (
+    "OAuth2Exception",
+    "MissingScopes",
+    "InvalidState",
+    "AssetTooLarge",
+)
+
+
+class OAuth2Exception(Exception):
+    """Base exception class for the errors raised by this library."""
+
+
+class MissingScopes(OAuth2Exception):
+    """Raised when a session tries to call an endpoint that requires
+    scopes the user didn't authorize. The request is never sent.
+
+    Attributes
+    ----------
+    missing: :class:`OAuthScopes`
+        The scopes that are required but not granted.
+    """
+
+    def __init__(self, missing: OAuthScopes) -> None:
+        self.missing = missing
+        names = ", ".join(scope.api_name for scope in missing)
+        super().__init__(f"This session is missing the required scopes: {names}")
+
+
+class InvalidState(OAuth2Exception):
+    """Raised when the security ``state`` of a login wasn't generated by the
+    client, expired or was already used.
+
+    Attributes
+    ----------
+    state: :class:`str`
+        The rejected state.
+    """
+
+    def __init__(self, state: str) -> None:
+        self.state = state
+        super().__init__("The state is unknown, expired or was already used")
+
+
+class AssetTooLarge(OAuth2Exception):
+    """Raised when an asset being downloaded exceeds the allowed size.
+
+    Attributes
+    ----------
+    url: :class:`str`
+        The URL of the asset.
+    max_size: :class:`int`
+        The allowed size in bytes.
+    """
+
+    def __init__(self, url: str, max_size: int) -> None:
+        self.url = url
+        self.max_size = max_size
+        super().__init__(f"The asset at {url} is larger than {max_size} bytes")
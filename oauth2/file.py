@@ -1,14 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import binascii
 import enum
 import io
+import mmap
 import os
-from typing import Union
+from typing import Optional, Tuple, Union
 
 from typing_extensions import TypeAlias
 
+__all__: Tuple[str, ...] = ("File", "FileType", "MAX_AVATAR_SIZE", "is_data_uri")
+
 FileLike: TypeAlias = Union[str, bytes, os.PathLike, io.BufferedIOBase]
 
+MAX_AVATAR_SIZE = 10 * 1024 * 1024
+"""The maximum size of an avatar accepted by Discord, in bytes."""
+
 
 class FileType(enum.Enum):
     png = "image/png"
@@ -16,6 +24,49 @@ class FileType(enum.Enum):
     gif = "image/gif"
 
 
+_MAGIC: Tuple[Tuple[bytes, FileType], ...] = (
+    (b"\x89PNG\r\n\x1a\n", FileType.png),
+    (b"\xff\xd8\xff", FileType.jpeg),
+    (b"GIF87a", FileType.gif),
+    (b"GIF89a", FileType.gif),
+)
+_DATA_URI_PREFIXES: Tuple[str, ...] = tuple(f"data:{t.value};base64," for t in FileType)
+# a multiple of 3, so every chunk encodes without padding
+_ENCODE_CHUNK = 3 * 256 * 1024
+
+
+def _detect_file_type(header: bytes) -> Optional[FileType]:
+    for magic, file_type in _MAGIC:
+        if header.startswith(magic):
+            return file_type
+    return None
+
+
+def is_data_uri(value: str) -> bool:
+    """Whether ``value`` is a base64 data URI of an image type Discord accepts."""
+    return value.startswith(_DATA_URI_PREFIXES)
+
+
+def _encode_data_uri(
+    data: Union[bytes, memoryview, mmap.mmap], file_type: FileType
+) -> str:
+    prefix = f"data:{file_type.value};base64,".encode()
+    size = len(data)
+    # the whole URI is encoded in a single pre-sized buffer
+    out = bytearray(len(prefix) + (size + 2) // 3 * 4)
+    out[: len(prefix)] = prefix
+    pos = len(prefix)
+    view = memoryview(data)
+    try:
+        for i in range(0, size, _ENCODE_CHUNK):
+            encoded = binascii.b2a_base64(view[i : i + _ENCODE_CHUNK], newline=False)
+            out[pos : pos + len(encoded)] = encoded
+            pos += len(encoded)
+    finally:
+        view.release()
+    return out.decode("ascii")
+
+
 class File:
     def __init__(self, fp: FileLike, file_type: FileType = FileType.png) -> None:
         if isinstance(fp, io.IOBase):
@@ -28,3 +79,67 @@ class File:
             self._original_pos = 0
 
         self.file_type = file_type
+
+    def _check(self, header: bytes, size: int, max_size: int) -> FileType:
+        if size > max_size:
+            raise ValueError(f"The file is {size} bytes, the maximum is {max_size}")
+        file_type = _detect_file_type(header)
+        if file_type is None:
+            raise ValueError("The file is not a PNG, JPEG or GIF image")
+        self.file_type = file_type
+        return file_type
+
+    def _encode(self, max_size: int) -> str:
+        fp = self.fp
+        if isinstance(fp, io.BytesIO):
+            with fp.getbuffer() as buffer:
+                data = buffer[self._original_pos :]
+                try:
+                    file_type = self._check(bytes(data[:16]), len(data), max_size)
+                    return _encode_data_uri(data, file_type)
+                finally:
+                    data.release()
+
+        try:
+            fileno = fp.fileno()
+        except (AttributeError, io.UnsupportedOperation):
+            fileno = None
+
+        if fileno is not None and self._original_pos == 0:
+            # real files are memory mapped instead of read
+            size = os.fstat(fileno).st_size
+            if size:
+                with mmap.mmap(fileno, 0, access=mmap.ACCESS_READ) as mapped:
+                    file_type = self._check(mapped[:16], size, max_size)
+                    return _encode_data_uri(mapped, file_type)
+
+        fp.seek(0, io.SEEK_END)
+        size = fp.tell() - self._original_pos
+        fp.seek(self._original_pos)
+        try:
+            file_type = self._check(fp.read(16), size, max_size)
+            fp.seek(self._original_pos)
+            return _encode_data_uri(fp.read(), file_type)
+        finally:
+            fp.seek(self._original_pos)
+
+    async def to_data_uri(self, *, max_size: int = MAX_AVATAR_SIZE) -> str:
+        """Encode the file as a base64 data URI, the format used to upload images.
+
+        The size and the format are checked from the file header before the
+        content is read, the actual format is detected from its magic bytes.
+        The encoding runs in the loop's default executor. The result can be
+        stored and passed to :meth:`User.edit` later to skip encoding again.
+
+        Parameters
+        ----------
+        max_size: :class:`int`
+            The maximum size of the file, in bytes.
+
+        Raises
+        ------
+        ValueError
+            The file is too large or not a PNG, JPEG or GIF image.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._encode, max_size)
@@ -1,56 +1,383 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List, Optional
+import datetime
+import weakref
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+    get_args,
+)
 
 import attrs
 
-from oauth2.asset import Asset
+from oauth2.asset import Asset, AssetOwner, cached_asset
+from oauth2.lazy import LazyField, LazyModel
+from oauth2.mixins import Hashable, Updatable
+from oauth2.snowflake import snowflake_time
+from oauth2.types.guild import GuildFeature
 
 if TYPE_CHECKING:
     from oauth2._http import HTTPClient
-    from oauth2.types import Emoji, GuildFeature, PartialGuild as PartialGuildData
+    from oauth2.types import Emoji, PartialGuild as PartialGuildData
 
 
-@attrs.define()
-class _BaseGuild:
+_GUILD_FEATURE_NAMES: Tuple[str, ...] = get_args(GuildFeature)
+_FEATURE_TO_BIT: Dict[str, int] = {
+    name: 1 << i for i, name in enumerate(_GUILD_FEATURE_NAMES)
+}
+
+
+class GuildFeatures:
+    """A compact set of guild features.
+
+    Known features are stored as bits of a single int, like an :class:`enum.IntFlag`,
+    features unknown to the library are kept in a small overflow set. Membership
+    tests are O(1) and every known feature is available as a class attribute:
+
+    .. code-block:: python
+
+        if "COMMUNITY" in guild.features:
+            ...
+        premium = GuildFeatures.COMMUNITY | GuildFeatures.VERIFIED
+        if premium in guild.features:  # has both
+            ...
+
+    Iterating yields the feature names as strings. Instances are immutable,
+    the same instance is shared by every guild with the same features.
+
+    Attributes
+    ----------
+    value: :class:`int`
+        The bitset of the known features.
+    unknown: FrozenSet[:class:`str`]
+        The features that the library doesn't know about.
+    """
+
+    __slots__ = ("value", "unknown")
+
+    value: int
+    unknown: FrozenSet[str]
+
+    def __init__(self, value: int = 0, unknown: FrozenSet[str] = frozenset()) -> None:
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "unknown", unknown)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{self.__class__.__name__} is immutable")
+
+    def __reduce__(self) -> Tuple[type, Tuple[int, FrozenSet[str]]]:
+        return (self.__class__, (self.value, self.unknown))
+
+    @classmethod
+    def from_list(cls, features: Iterable[str]) -> GuildFeatures:
+        """Build the features from the list sent by discord."""
+        value = 0
+        unknown = None
+        get = _FEATURE_TO_BIT.get
+        for name in features:
+            bit = get(name)
+            if bit is None:
+                if unknown is None:
+                    unknown = set()
+                unknown.add(name)
+            else:
+                value |= bit
+        if unknown is None:
+            # the same features are shared by many guilds, reuse the instances
+            cached = _FEATURES_CACHE.get(value)
+            if cached is None:
+                cached = _FEATURES_CACHE[value] = cls(value)
+            return cached
+        return cls(value, frozenset(unknown))
+
+    def _names(self) -> Iterator[str]:
+        value = self.value
+        while value:
+            bit = value & -value
+            yield _GUILD_FEATURE_NAMES[bit.bit_length() - 1]
+            value ^= bit
+        yield from self.unknown
+
+    def __iter__(self) -> Iterator[str]:
+        return self._names()
+
+    def __len__(self) -> int:
+        return bin(self.value).count("1") + len(self.unknown)
+
+    def __bool__(self) -> bool:
+        return bool(self.value or self.unknown)
+
+    def __contains__(self, item: object) -> bool:
+        if type(item) is GuildFeatures:
+            value = item.value
+            return self.value & value == value and (
+                not item.unknown or item.unknown <= self.unknown
+            )
+        bit = _FEATURE_TO_BIT.get(item)  # type: ignore
+        if bit is None:
+            return item in self.unknown
+        return self.value & bit == bit
+
+    def __or__(self, other: object) -> GuildFeatures:
+        if not isinstance(other, GuildFeatures):
+            return NotImplemented
+        return GuildFeatures(self.value | other.value, self.unknown | other.unknown)
+
+    def __and__(self, other: object) -> GuildFeatures:
+        if not isinstance(other, GuildFeatures):
+            return NotImplemented
+        return GuildFeatures(self.value & other.value, self.unknown & other.unknown)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, GuildFeatures):
+            return self.value == other.value and self.unknown == other.unknown
+        if isinstance(other, (list, tuple, set, frozenset)):
+            return self == GuildFeatures.from_list(other)  # type: ignore
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.value, self.unknown))
+
+    def __repr__(self) -> str:
+        return f"<GuildFeatures {' | '.join(self._names()) or 'none'}>"
+
+    def to_list(self) -> List[str]:
+        """The features as a list of strings, like discord sends them."""
+        return list(self._names())
+
+
+for _i, _name in enumerate(_GUILD_FEATURE_NAMES):
+    setattr(GuildFeatures, _name, GuildFeatures(1 << _i))
+del _i, _name
+
+_FEATURES_CACHE: Dict[int, GuildFeatures] = {}
+
+
+def _to_guild_features(_v: Union[GuildFeatures, Iterable[str]]) -> GuildFeatures:
+    if isinstance(_v, GuildFeatures):
+        return _v
+    return GuildFeatures.from_list(_v)
+
+
+@attrs.define(eq=False)
+class _BaseGuild(Hashable, AssetOwner):
     _http: HTTPClient
     id: int
     name: str
-    features: List[GuildFeature]
+    features: GuildFeatures = attrs.field(converter=_to_guild_features)
     _icon: Optional[str]
 
     @property
-    def icon(self) -> Optional[Asset]:
-        if self._icon:
-            return Asset._from_guild_icon(self._http, self.id, self._icon)
+    def created_at(self) -> datetime.datetime:
+        """:class:`datetime.datetime`: When this guild was created, in UTC."""
+        return snowflake_time(self.id)
 
-    def __eq__(self, __other: object) -> bool:
-        return issubclass(__other.__class__, self.__class__) and self.id == __other.id  # type: ignore
+    @cached_asset("_icon")
+    def icon(self, icon: str) -> Asset:
+        return Asset._from_guild_icon(self._http, self.id, icon)
 
 
-@attrs.define(slots=True, repr=True)
-class PartialGuild(_BaseGuild):
+@attrs.define(slots=True, repr=True, eq=False)
+class PartialGuild(_BaseGuild, Updatable):
     owner: bool
     permissions: int
     approximate_member_count: Optional[int]
     approximate_presence_count: Optional[int]
+    _payload: Optional[Any] = attrs.field(
+        default=None, init=False, repr=False, eq=False
+    )
 
     @classmethod
     def from_data(cls, data: PartialGuildData, http: HTTPClient) -> PartialGuild:
-        return cls(
-            _http=http,
-            id=data["id"],  # type: ignore
+        if cls is PartialGuild and http.lazy_models:
+            return LazyPartialGuild.from_data(data, http)
+        guild = cls(
+            http=http,  # type: ignore
+            id=int(data["id"]),
             name=data["name"],
             features=data["features"],
-            _icon=data["icon"],
+            icon=data["icon"],  # type: ignore
             owner=data["owner"],
-            permissions=data["permissions"],
+            permissions=int(data["permissions"]),
             approximate_member_count=data.get("approximate_member_count"),
             approximate_presence_count=data.get("approximate_presence_count"),
         )
+        guild._payload = data
+        return guild
+
+    def update_from(self, data: PartialGuildData) -> Set[str]:
+        """Update this object in place from a new payload.
+
+        If the payload is exactly the same as the one this object was built or
+        last updated from, nothing is built or compared.
+
+        Returns
+        -------
+        Set[:class:`str`]
+            The names of the fields that changed, empty if nothing changed.
+        """
+        return self._update_from(data, lambda: PartialGuild.from_data(data, self._http))
+
+
+class LazyPartialGuild(LazyModel, PartialGuild):
+    """A :class:`PartialGuild` that decodes its fields from the payload on first access."""
+
+    __slots__ = ("_data", "__dict__")
+
+    id = LazyField("id", int)
+    name = LazyField("name")
+    features = LazyField("features", GuildFeatures.from_list)
+    _icon = LazyField("icon")
+    owner = LazyField("owner")
+    permissions = LazyField("permissions", int)
+    approximate_member_count = LazyField("approximate_member_count", default=None)
+    approximate_presence_count = LazyField("approximate_presence_count", default=None)
+
+    @classmethod
+    def from_data(cls, data: PartialGuildData, http: HTTPClient) -> LazyPartialGuild:
+        return cls._from_raw(data, _http=http, _payload=None)
+
+
+@attrs.define(slots=True, repr=True, eq=False)
+class SharedGuild(_BaseGuild):
+    """The guild data shared by every :class:`GuildMembership` of the same guild.
+
+    Instances are kept in a :class:`GuildIdentityMap` and updated in place when a
+    newer payload for the same guild is received.
+    """
+
+    approximate_member_count: Optional[int] = None
+    approximate_presence_count: Optional[int] = None
+
+    def _update(self, data: PartialGuildData) -> None:
+        # keep the current objects when nothing changed, so they stay shared
+        if self.name != data["name"]:
+            self.name = data["name"]
+        features = GuildFeatures.from_list(data["features"])
+        if self.features != features:
+            self.features = features
+        if self._icon != data["icon"]:
+            self._icon = data["icon"]
+        if (count := data.get("approximate_member_count")) is not None:
+            self.approximate_member_count = count
+        if (count := data.get("approximate_presence_count")) is not None:
+            self.approximate_presence_count = count
+
+
+@attrs.define(slots=True, repr=True, eq=False, weakref_slot=False)
+class GuildMembership:
+    """A guild as seen by a single user, returned by :meth:`User.guilds` when
+    the client uses a :class:`GuildIdentityMap`.
+
+    Only the per-user fields are stored here, everything else is read from the
+    shared :attr:`guild`, so it can be used like a :class:`PartialGuild`.
+
+    Attributes
+    ----------
+    guild: :class:`SharedGuild`
+        The shared guild data.
+    owner: :class:`bool`
+        Whether the user owns the guild.
+    permissions: :class:`int`
+        The permissions of the user in the guild.
+    """
+
+    guild: SharedGuild
+    owner: bool
+    permissions: int
+
+    @property
+    def id(self) -> int:
+        return self.guild.id
+
+    @property
+    def name(self) -> str:
+        return self.guild.name
+
+    @property
+    def features(self) -> GuildFeatures:
+        return self.guild.features
+
+    @property
+    def created_at(self) -> datetime.datetime:
+        return self.guild.created_at
+
+    @property
+    def icon(self) -> Optional[Asset]:
+        return self.guild.icon
+
+    @property
+    def approximate_member_count(self) -> Optional[int]:
+        return self.guild.approximate_member_count
+
+    @property
+    def approximate_presence_count(self) -> Optional[int]:
+        return self.guild.approximate_presence_count
+
+    def __eq__(self, __other: object) -> bool:
+        return isinstance(__other, GuildMembership) and (
+            self.guild is __other.guild
+            and self.owner == __other.owner
+            and self.permissions == __other.permissions
+        )
+
+    def __hash__(self) -> int:
+        # equal memberships share their guild, owner and permissions can change
+        return hash(self.guild.id)
+
+
+class GuildIdentityMap:
+    """Keeps a single :class:`SharedGuild` per guild id for as long as something
+    references it, so users in the same guilds share the guild data.
+
+    Enable it with ``Client(guild_identity_map=True)``.
+    """
+
+    def __init__(self) -> None:
+        self._guilds: weakref.WeakValueDictionary[
+            int, SharedGuild
+        ] = weakref.WeakValueDictionary()
+
+    def __len__(self) -> int:
+        return len(self._guilds)
+
+    def get(self, guild_id: int) -> Optional[SharedGuild]:
+        """Get the shared guild with the given id, if it's still alive."""
+        return self._guilds.get(guild_id)
+
+    def membership(self, data: PartialGuildData, http: HTTPClient) -> GuildMembership:
+        """Build a :class:`GuildMembership`, reusing the shared guild if present."""
+        guild_id = int(data["id"])
+        guild = self._guilds.get(guild_id)
+        if guild is None:
+            guild = SharedGuild(
+                http=http,  # type: ignore
+                id=guild_id,
+                name=data["name"],
+                features=data["features"],
+                icon=data["icon"],  # type: ignore
+                approximate_member_count=data.get("approximate_member_count"),
+                approximate_presence_count=data.get("approximate_presence_count"),
+            )
+            self._guilds[guild_id] = guild
+        else:
+            guild._update(data)
+        return GuildMembership(guild, data["owner"], int(data["permissions"]))
 
 
-@attrs.define(slots=True, repr=True)
+@attrs.define(slots=True, repr=True, eq=False)
 class Guild(_BaseGuild):
     mfa_level: int
     emojis: List[str]
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Optional, Tuple, Type, TypeVar
+
+__all__: Tuple[str, ...] = ("LazyField", "LazyModel")
+
+T = TypeVar("T", bound="LazyModel")
+_MISSING: Any = object()
+
+
+class LazyField:
+    """A descriptor that decodes a field from the raw payload of a :class:`LazyModel`
+    on first access.
+
+    This is a non-data descriptor, the decoded value is stored in the instance
+    ``__dict__`` so every later access is a plain attribute lookup.
+
+    Parameters
+    ----------
+    key: :class:`str`
+        The key of the value in the payload.
+    converter: Optional[Callable[[Any], Any]]
+        Called with the raw value, unless it's ``None``.
+    factory: Optional[Callable[[Any, Any], Any]]
+        Like ``converter`` but called with the model too, useful for nested models
+        that need the model's ``_http``.
+    default: Any
+        The value to use when ``key`` is missing from the payload. If not passed,
+        the key is required.
+    """
+
+    __slots__ = ("key", "converter", "factory", "default", "name")
+
+    def __init__(
+        self,
+        key: str,
+        converter: Optional[Callable[[Any], Any]] = None,
+        *,
+        factory: Optional[Callable[[Any, Any], Any]] = None,
+        default: Any = _MISSING,
+    ) -> None:
+        self.key = key
+        self.converter = converter
+        self.factory = factory
+        self.default = default
+        self.name = key
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, obj: Any, objtype: Optional[type] = None) -> Any:
+        if obj is None:
+            return self
+
+        if self.default is _MISSING:
+            value = obj._data[self.key]
+        else:
+            value = obj._data.get(self.key, self.default)
+
+        if value is not None and value is not self.default:
+            if self.converter is not None:
+                value = self.converter(value)
+            elif self.factory is not None:
+                value = self.factory(obj, value)
+        obj.__dict__[self.name] = value
+        return value
+
+
+class LazyModel:
+    """Mixin for lazy variants of the models.
+
+    Lazy models keep a reference to the raw payload and build each field the
+    first time it's accessed. They subclass the eager model so every method and
+    property works the same. Enable them with ``Client(lazy_models=True)``.
+    """
+
+    # subclasses must define ``__slots__ = ("_data", "__dict__")``, the
+    # decoded fields live in the instance dict, shadowing the descriptors
+    __slots__ = ()
+
+    _data: Dict[str, Any]
+
+    @classmethod
+    def _from_raw(cls: Type[T], data: Any, **fields: Any) -> T:
+        # skip the attrs __init__, only the fields that don't come from the
+        # payload (http, session...) are set upfront
+        self = object.__new__(cls)
+        self._data = data
+        for name, value in fields.items():
+            object.__setattr__(self, name, value)
+        return self
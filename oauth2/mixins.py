@@ -1,8 +1,13 @@
 # thanks disnake
 
+from typing import Any, Callable, Optional, Set
+
+import attrs
+
 __all__ = (
     "EqualityComparable",
     "Hashable",
+    "Updatable",
 )
 
 
@@ -11,6 +16,9 @@ class EqualityComparable:
 
     id: int
 
+    # only hashable when opted in through Hashable
+    __hash__ = None  # type: ignore
+
     def __eq__(self, other: object) -> bool:
         return isinstance(other, self.__class__) and other.id == self.id
 
@@ -24,4 +32,44 @@ class Hashable(EqualityComparable):
     __slots__ = ()
 
     def __hash__(self) -> int:
-        return self.id >> 22
+        # the whole id, the timestamp bits alone collide for every object
+        # created in the same millisecond
+        return hash(self.id)
+
+
+# fields that link an object to the library, never part of a payload
+_NOT_UPDATABLE = frozenset(("_http", "_session", "_payload"))
+
+
+class Updatable:
+    """Mixin for attrs models that can be patched in place from a new payload."""
+
+    __slots__ = ()
+
+    _payload: Optional[Any]
+
+    def _update_from(self, data: Any, build: Callable[[], Any]) -> Set[str]:
+        # keeping a reference to the last payload costs nothing on construction
+        # and lets us skip building and comparing anything when discord returns
+        # exactly the same data as the object was built from
+        current = self._payload
+        if current is None:
+            # lazy models already keep their payload
+            current = getattr(self, "_data", None)
+        if current is not None and data == current:
+            self._payload = data
+            return set()
+
+        new = build()
+        changed: Set[str] = set()
+        for field in attrs.fields(type(new)):
+            name = field.name
+            if name in _NOT_UPDATABLE:
+                continue
+            value = getattr(new, name)
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed.add(name.lstrip("_"))
+
+        self._payload = data
+        return changed
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+import aiohttp
+import attrs
+
+from oauth2._bulk import RateLimiter, bulk_map
+from oauth2.errors import MissingScopes
+from oauth2.scopes import OAuthScopes
+from oauth2.session import OAuth2Session
+from oauth2.user import User
+
+if TYPE_CHECKING:
+    from oauth2.client import Client
+
+__all__: Tuple[str, ...] = (
+    "BulkMemberAdd",
+    "MemberAddResult",
+    "MemberAddStats",
+)
+_log = logging.getLogger(__name__)
+
+Joinable = Union[OAuth2Session, User]
+JoinableSource = Union[Iterable[Joinable], AsyncIterable[Joinable]]
+
+
+@attrs.define(slots=True, repr=True)
+class MemberAddResult:
+    """The outcome of adding a single user to a guild.
+
+    Attributes
+    ----------
+    user_id: Optional[:class:`int`]
+        The id of the user, ``None`` if it couldn't be resolved.
+    success: :class:`bool`
+        Whether the user is now a member of the guild.
+    added: :class:`bool`
+        Whether the user was added by this request. ``False`` when Discord
+        reported the user was already a member, or on failure.
+    session: Optional[:class:`OAuth2Session`]
+        The session used to add the user.
+    error: Optional[:class:`Exception`]
+        The error that made the request fail, if any.
+    attempts: :class:`int`
+        How many requests were made for this user.
+    """
+
+    user_id: Optional[int]
+    success: bool
+    added: bool
+    session: Optional[OAuth2Session] = None
+    error: Optional[Exception] = None
+    attempts: int = 1
+
+    @property
+    def already_member(self) -> bool:
+        """:class:`bool`: Whether the user was already a member of the guild."""
+        return self.success and not self.added
+
+
+@attrs.define(slots=True, repr=True)
+class MemberAddStats:
+    """Running counters of a bulk member add.
+
+    Attributes
+    ----------
+    added: :class:`int`
+        The number of users added to the guild.
+    already_members: :class:`int`
+        The number of users skipped because they were already members.
+    failed: :class:`int`
+        The number of users that couldn't be added.
+    rate_limited: :class:`int`
+        The number of 429 responses received.
+    started_at: :class:`float`
+        The :func:`time.monotonic` value when the run started.
+    """
+
+    added: int = 0
+    already_members: int = 0
+    failed: int = 0
+    rate_limited: int = 0
+    started_at: float = attrs.field(factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        """:class:`float`: Seconds elapsed since the run started."""
+        return time.monotonic() - self.started_at
+
+    @property
+    def processed(self) -> int:
+        """:class:`int`: The number of users processed so far."""
+        return self.added + self.already_members + self.failed
+
+    @property
+    def throughput(self) -> float:
+        """:class:`float`: Users processed per second."""
+        elapsed = self.elapsed
+        if not elapsed:
+            return 0.0
+        return self.processed / elapsed
+
+
+class BulkMemberAdd:
+    """An async iterable that adds every user from a source to a guild and
+    yields a :class:`MemberAddResult` for each one as soon as it completes.
+
+    This is returned by :meth:`Client.add_guild_members`, see it for the parameters.
+
+    Attributes
+    ----------
+    stats: :class:`MemberAddStats`
+        Counters and throughput of this run.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        guild_id: int,
+        source: JoinableSource,
+        *,
+        roles: List[int],
+        mute: Optional[bool],
+        deaf: Optional[bool],
+        concurrency: int,
+        max_retries: int,
+    ) -> None:
+        self.client = client
+        self.guild_id = guild_id
+        self.source = source
+        self.roles = roles
+        self.mute = mute
+        self.deaf = deaf
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self.stats = MemberAddStats()
+        # the member add bucket of the guild, and one /users/@me bucket per token
+        self._limiter = RateLimiter()
+
+    async def _add(self, item: Joinable) -> MemberAddResult:
+        if isinstance(item, User):
+            session, user_id = item._session, item.id
+        else:
+            session, user_id = item, None
+
+        if session is None:
+            error = ValueError(f"User {user_id} has no OAuth2 session to join with")
+            return MemberAddResult(user_id, False, False, None, error, 0)
+
+        required = OAuthScopes.guilds_join
+        if user_id is None:
+            required |= OAuthScopes.identify
+        try:
+            session._check_scopes(required)
+        except MissingScopes as e:
+            return MemberAddResult(user_id, False, False, session, e, 0)
+
+        http = self.client.http
+        token = session.access_token
+        attempts = retries = 0
+        while True:
+            try:
+                if user_id is None:
+                    attempts += 1
+                    user = await http._get_current_user(
+                        token, ratelimiter=self._limiter
+                    )
+                    user_id = int(user["id"])
+                attempts += 1
+                member = await http._add_guild_member(
+                    self.guild_id,
+                    user_id,
+                    None,
+                    self.roles,
+                    self.mute,
+                    self.deaf,
+                    token,
+                    ratelimiter=self._limiter,
+                )
+            except aiohttp.ClientResponseError as e:
+                # the limiter already holds the bucket back for Retry-After
+                if e.status == 429 and retries < self.max_retries:
+                    retries += 1
+                    self.stats.rate_limited += 1
+                    continue
+                return MemberAddResult(user_id, False, False, session, e, attempts)
+            except Exception as e:
+                return MemberAddResult(user_id, False, False, session, e, attempts)
+            # Discord answers 204 without a body when the user is already a member
+            return MemberAddResult(
+                user_id, True, member is not None, session, None, attempts
+            )
+
+    def __aiter__(self) -> AsyncIterator[MemberAddResult]:
+        return self._run(self.source)
+
+    async def _run(self, source: JoinableSource) -> AsyncIterator[MemberAddResult]:
+        self.stats.started_at = time.monotonic()
+        try:
+            async for result in bulk_map(source, self._add, self.concurrency):
+                self._record(result)
+                yield result
+        finally:
+            _log.debug(
+                "Bulk member add to guild %s finished: %r", self.guild_id, self.stats
+            )
+
+    def _record(self, result: MemberAddResult) -> None:
+        if not result.success:
+            self.stats.failed += 1
+        elif result.added:
+            self.stats.added += 1
+        else:
+            self.stats.already_members += 1
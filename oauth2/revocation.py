@@ -0,0 +1,252 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import aiohttp
+import attrs
+
+from oauth2._bulk import RateLimiter, bulk_map, iter_source
+from oauth2.session import OAuth2Session
+
+if TYPE_CHECKING:
+    from oauth2.client import Client
+
+__all__: Tuple[str, ...] = (
+    "BulkRevocation",
+    "RevocationCheckpoint",
+    "RevocationResult",
+    "RevocationStats",
+)
+_log = logging.getLogger(__name__)
+
+Revocable = Union[OAuth2Session, str]
+RevocableSource = Union[Iterable[Revocable], AsyncIterable[Revocable]]
+
+
+def _token_digest(token: str) -> str:
+    # never keep raw tokens around in checkpoints
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+@attrs.define(slots=True, repr=True)
+class RevocationResult:
+    """The outcome of revoking a single token.
+
+    Attributes
+    ----------
+    token_type: :class:`str`
+        Either ``access_token`` or ``refresh_token``.
+    digest: :class:`str`
+        The SHA-256 hex digest of the token.
+    success: :class:`bool`
+        Whether Discord accepted the revocation.
+    session: Optional[:class:`OAuth2Session`]
+        The session the token belonged to, if any.
+    error: Optional[:class:`Exception`]
+        The error that made the revocation fail, if any.
+    attempts: :class:`int`
+        How many requests were made for this token.
+    """
+
+    token_type: str
+    digest: str
+    success: bool
+    session: Optional[OAuth2Session] = None
+    error: Optional[Exception] = None
+    attempts: int = 1
+
+
+@attrs.define(slots=True, repr=True)
+class RevocationStats:
+    """Running counters of a bulk revocation.
+
+    Attributes
+    ----------
+    revoked: :class:`int`
+        The number of tokens revoked successfully.
+    failed: :class:`int`
+        The number of tokens that couldn't be revoked.
+    skipped: :class:`int`
+        The number of tokens skipped because they were in the checkpoint.
+    rate_limited: :class:`int`
+        The number of 429 responses received.
+    started_at: :class:`float`
+        The :func:`time.monotonic` value when the run started.
+    """
+
+    revoked: int = 0
+    failed: int = 0
+    skipped: int = 0
+    rate_limited: int = 0
+    started_at: float = attrs.field(factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        """:class:`float`: Seconds elapsed since the run started."""
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """:class:`float`: Tokens processed per second."""
+        elapsed = self.elapsed
+        if not elapsed:
+            return 0.0
+        return (self.revoked + self.failed) / elapsed
+
+
+class RevocationCheckpoint:
+    """Remembers which tokens were already revoked so that an interrupted run
+    can be resumed. Only SHA-256 digests of the tokens are stored.
+
+    Parameters
+    ----------
+    path: Optional[Union[:class:`str`, :class:`os.PathLike`]]
+        A file where the digests are appended, one per line. If it already
+        exists its content is loaded. If ``None`` the checkpoint lives only in memory.
+    """
+
+    def __init__(self, path: Optional[Union[str, os.PathLike]] = None) -> None:
+        self.path = path
+        self._done: Set[str] = set()
+        self._fp = None
+        if path is not None:
+            if os.path.exists(path):
+                with open(path, "r") as f:
+                    self._done.update(line.strip() for line in f if line.strip())
+            self._fp = open(path, "a")
+
+    def __contains__(self, digest: object) -> bool:
+        return digest in self._done
+
+    def __len__(self) -> int:
+        return len(self._done)
+
+    def add(self, digest: str) -> None:
+        self._done.add(digest)
+        if self._fp is not None:
+            self._fp.write(digest + "\n")
+
+    def flush(self) -> None:
+        if self._fp is not None:
+            self._fp.flush()
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+
+class BulkRevocation:
+    """An async iterable that revokes every token from a source and yields a
+    :class:`RevocationResult` for each one as soon as it completes.
+
+    This is returned by :meth:`Client.revoke_many`, see it for the parameters.
+
+    Attributes
+    ----------
+    stats: :class:`RevocationStats`
+        Counters and throughput of this run.
+    """
+
+    def __init__(
+        self,
+        client: Client,
+        source: RevocableSource,
+        *,
+        concurrency: int,
+        include_refresh_tokens: bool,
+        checkpoint: Optional[RevocationCheckpoint],
+        max_retries: int,
+    ) -> None:
+        self.client = client
+        self.source = source
+        self.concurrency = concurrency
+        self.include_refresh_tokens = include_refresh_tokens
+        self.checkpoint = checkpoint
+        self.max_retries = max_retries
+        self.stats = RevocationStats()
+        self._limiter = RateLimiter()
+
+    def _expand(
+        self, item: Revocable
+    ) -> Iterable[Tuple[str, str, Optional[OAuth2Session]]]:
+        if isinstance(item, str):
+            yield item, "access_token", None
+            return
+        yield item.access_token, "access_token", item
+        if self.include_refresh_tokens and item.refresh_token:
+            yield item.refresh_token, "refresh_token", item
+
+    async def _revoke(
+        self, entry: Tuple[str, str, Optional[OAuth2Session]]
+    ) -> RevocationResult:
+        token, token_type, session = entry
+        digest = _token_digest(token)
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                await self.client.http._revoke_token(
+                    token=token, token_type=token_type, ratelimiter=self._limiter
+                )
+            except aiohttp.ClientResponseError as e:
+                # the limiter already holds the bucket back for Retry-After
+                if e.status == 429 and attempts <= self.max_retries:
+                    self.stats.rate_limited += 1
+                    continue
+                return RevocationResult(token_type, digest, False, session, e, attempts)
+            except Exception as e:
+                return RevocationResult(token_type, digest, False, session, e, attempts)
+            return RevocationResult(token_type, digest, True, session, None, attempts)
+
+    def __aiter__(self) -> AsyncIterator[RevocationResult]:
+        return self._run(self.source)
+
+    async def _entries(
+        self, source: RevocableSource
+    ) -> AsyncIterator[Tuple[str, str, Optional[OAuth2Session]]]:
+        checkpoint = self.checkpoint
+        async for item in iter_source(source):
+            for entry in self._expand(item):
+                if checkpoint is not None and _token_digest(entry[0]) in checkpoint:
+                    self.stats.skipped += 1
+                    continue
+                yield entry
+
+    async def _run(self, source: RevocableSource) -> AsyncIterator[RevocationResult]:
+        self.stats.started_at = time.monotonic()
+        try:
+            async for result in bulk_map(
+                self._entries(source), self._revoke, self.concurrency
+            ):
+                self._record(result)
+                yield result
+        finally:
+            if self.checkpoint is not None:
+                self.checkpoint.flush()
+
+    def _record(self, result: RevocationResult) -> None:
+        if not result.success:
+            self.stats.failed += 1
+            return
+        self.stats.revoked += 1
+        if self.checkpoint is not None:
+            self.checkpoint.add(result.digest)
+        # a token type name, not a secret
+        if (
+            result.session is not None and result.token_type == "access_token"
+        ):  # noqa: S105
+            self.client._remove_oauth2_session(result.session)
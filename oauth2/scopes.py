@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import enum
-from typing import Any, Generator, Tuple
+import functools
+from typing import Dict, Iterable, Iterator, Tuple
 
 __all__: Tuple[str, ...] = ("OAuthScopes",)
 
@@ -36,29 +37,17 @@ class OAuthScopes(enum.IntFlag):
     voice = enum.auto()
     webhook_incoming = enum.auto()
 
-    def __iter__(self) -> Generator[OAuthScopes, Any, None]:
-        cls = type(self)
-        n = self.value
-
-        while n:
-            b = n & -n
-            yield cls(b)
-            n ^= b
+    def __iter__(self) -> Iterator[OAuthScopes]:
+        return iter(_split(self._value_))
 
     @property
     def api_name(self) -> str:
-        # i need to check for this since discord is inconsistent
-        # with scope names (sigh)
-        if self._name_.startswith(("role_connections", "dm_channels")):
-            _name_chars = list(self._name_)
-            under = self._name_.rfind("_")
-            _name_chars[under] = "."
-            return "".join(_name_chars)
-
-        if self._name_:
-            return self._name_.replace("_", ".")
-
-        raise RuntimeError("This is a library bug.")  # Should never happen
+        try:
+            return _BIT_TO_API_NAME[self._value_]
+        except KeyError:
+            raise ValueError(
+                f"{self!r} isn't a single scope, iterate over it to get the api names"
+            ) from None
 
     @classmethod
     def none(cls) -> OAuthScopes:
@@ -66,13 +55,61 @@ class OAuthScopes(enum.IntFlag):
 
     @classmethod
     def all(cls) -> OAuthScopes:
-        scopes = cls.activities_read
-        for scope in cls._member_map_.values():
-            scopes |= scope  # type: ignore
-        return scopes
+        return cls(_ALL_VALUE)
+
+    @classmethod
+    def from_api_names(cls, names: Iterable[str]) -> OAuthScopes:
+        """Build the scopes from their api names, e.g. ``["identify", "guilds.join"]``.
+        Unknown names are ignored.
+        """
+        value = 0
+        get = _API_NAME_TO_BIT.get
+        for name in names:
+            value |= get(name, 0)
+        return cls(value)
+
+    @classmethod
+    def parse(cls, value: str) -> OAuthScopes:
+        """Build the scopes from a space separated string, like the ``scope``
+        field sent by discord. Unknown names are ignored.
+        """
+        return cls.from_api_names(value.split())
 
     def as_url_param(self) -> str:
-        return "%20".join(scope.api_name for scope in self)
+        return _serialize(self._value_, "%20")
 
     def as_client_credentials(self) -> str:
-        return " ".join(scope.api_name for scope in self)
+        return _serialize(self._value_, " ")
+
+
+def _to_api_name(name: str) -> str:
+    # i need to check for this since discord is inconsistent
+    # with scope names (sigh)
+    if name.startswith(("role_connections", "dm_channels")):
+        head, _, tail = name.rpartition("_")
+        return f"{head}.{tail}"
+    return name.replace("_", ".")
+
+
+# lookup tables built once at import time
+_BIT_TO_API_NAME: Dict[int, str] = {
+    member._value_: _to_api_name(name)
+    for name, member in OAuthScopes.__members__.items()
+}
+_API_NAME_TO_BIT: Dict[str, int] = {v: k for k, v in _BIT_TO_API_NAME.items()}
+_ALL_VALUE = functools.reduce(int.__or__, _BIT_TO_API_NAME, 0)
+
+
+@functools.lru_cache(maxsize=256)
+def _split(value: int) -> Tuple[OAuthScopes, ...]:
+    members = []
+    while value:
+        bit = value & -value
+        members.append(OAuthScopes(bit))
+        value ^= bit
+    return tuple(members)
+
+
+@functools.lru_cache(maxsize=256)
+def _serialize(value: int, separator: str) -> str:
+    return separator.join(_BIT_TO_API_NAME[scope._value_] for scope in _split(value))
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import datetime
-from typing import TYPE_CHECKING, Optional, Union
+from typing import TYPE_CHECKING, Optional, Tuple, Union
 
 import attrs
 
 from oauth2.appinfo import AuthorizationInfo
+from oauth2.errors import MissingScopes
+from oauth2.scopes import OAuthScopes
 from oauth2.user import User
-from oauth2.utils import to_datetime, to_int
+from oauth2.utils import _parse_scopes, requires_scopes, to_datetime, to_int
 
 if TYPE_CHECKING:
     from oauth2.client import Client
@@ -28,7 +30,9 @@ class OAuth2Session:
         The type of the token. For example this can be ``bearer``...
     expires_in: :class:`datetime.datetime`
         The date when the user's ``access_token`` will expire.
-    scope
+    scope: :class:`str`
+        The raw space separated scopes granted by the user. See :attr:`scopes`
+        for the parsed version.
     state_code: Optional[:class:`str`]
         The security state string used when the user's
         authorized your application, if any.
@@ -60,6 +64,9 @@ class OAuth2Session:
     refresh_token: Optional[str] = None
     guild_id: Optional[int] = attrs.field(default=None, converter=to_int)
     permissions: Optional[int] = attrs.field(default=None, converter=to_int)
+    _scopes_cache: Optional[Tuple[str, OAuthScopes]] = attrs.field(
+        default=None, init=False, repr=False, eq=False
+    )
 
     def _update(self, data: AccessTokenResponse) -> None:
         for k, v in data.items():
@@ -108,6 +115,26 @@ class OAuth2Session:
         """:class:`Client`: returns the client object."""
         return self._client
 
+    @property
+    def scopes(self) -> OAuthScopes:
+        """:class:`OAuthScopes`: The scopes granted by the user.
+
+        The :attr:`scope` string is parsed only once, and again only if it changes
+        (e.g. after :meth:`refresh`).
+        """
+        cache = self._scopes_cache
+        if cache is None or cache[0] is not self.scope:
+            cache = self._scopes_cache = (self.scope, _parse_scopes(self.scope))
+        return cache[1]
+
+    def has_scopes(self, scopes: OAuthScopes) -> bool:
+        """Whether every scope in ``scopes`` was granted to this session."""
+        return self.scopes & scopes == scopes
+
+    def _check_scopes(self, scopes: OAuthScopes) -> None:
+        if missing := scopes & ~self.scopes:
+            raise MissingScopes(missing)
+
     @property
     def is_expired(self) -> bool:
         """:class:`bool`: whether the ``access_token`` expired or not."""
@@ -150,6 +177,7 @@ class OAuth2Session:
         data = await self._client.http._get_current_auth_info(self.access_token)
         return AuthorizationInfo.from_data(data, self._client.http, self)
 
+    @requires_scopes(OAuthScopes.identify)
     async def fetch_current_user(self) -> User:
         """Fetch the user associated to this OAuth2 session.
 
@@ -158,9 +186,14 @@ class OAuth2Session:
         :class:`User`
             The user associated to this OAuth2 session.
         """
-        data = await self._client.http._get_current_user(self.access_token)
-        return User.from_data(data, self._client.http, self)
-
+        http = self._client.http
+        data = await http._get_current_user(self.access_token)
+        user = User.from_data(data, http, self)
+        if http.prefetcher is not None:
+            http.prefetcher.prefetch_user(user)
+        return user
+
+    @requires_scopes(OAuthScopes.gdm_join)
     async def add_current_user_to_group_dm(
         self,
         channel_id: int,
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import datetime
+from array import array
+from bisect import bisect_left
+from typing import (
+    Any,
+    Generic,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+    TypeVar,
+    Union,
+    overload,
+)
+
+try:
+    import numpy
+except ImportError:  # only needed by the vectorized helpers
+    numpy = None  # type: ignore
+
+__all__: Tuple[str, ...] = (
+    "DISCORD_EPOCH",
+    "snowflake_time",
+    "time_snowflake",
+    "SnowflakeIndex",
+    "snowflakes_to_numpy",
+    "snowflake_times_numpy",
+)
+
+DISCORD_EPOCH = 1420070400000
+"""The first millisecond of 2015, the epoch of Discord snowflakes."""
+
+
+class _HasId(Protocol):
+    @property
+    def id(self) -> int:
+        ...
+
+
+T = TypeVar("T", bound=_HasId)
+
+
+def snowflake_time(id: int) -> datetime.datetime:
+    """Get the creation time of a snowflake.
+
+    Parameters
+    ----------
+    id: :class:`int`
+        The snowflake.
+
+    Returns
+    -------
+    :class:`datetime.datetime`
+        An aware datetime in UTC.
+    """
+    timestamp = ((id >> 22) + DISCORD_EPOCH) / 1000
+    return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc)
+
+
+def time_snowflake(dt: datetime.datetime, *, high: bool = False) -> int:
+    """Get the smallest (or largest, if ``high`` is ``True``) snowflake created
+    at the given time. Useful as bounds of a creation time range.
+
+    Naive datetimes are treated as local time.
+    """
+    ms = int(dt.timestamp() * 1000) - DISCORD_EPOCH
+    return (ms << 22) + (2**22 - 1 if high else 0)
+
+
+def _numpy() -> Any:
+    if numpy is None:
+        raise RuntimeError("numpy is required for the vectorized snowflake helpers")
+    return numpy
+
+
+def snowflakes_to_numpy(ids: Iterable[int]) -> numpy.ndarray:
+    """Convert snowflakes to a ``uint64`` NumPy array. Requires ``numpy``."""
+    np = _numpy()
+    if isinstance(ids, array) and ids.typecode == "Q":
+        # a copy, a view would stop the array from being resized
+        return np.frombuffer(ids, dtype=np.uint64).copy()
+    return np.fromiter(ids, dtype=np.uint64)
+
+
+def snowflake_times_numpy(ids: Union[Iterable[int], numpy.ndarray]) -> numpy.ndarray:
+    """Vectorized :func:`snowflake_time`, returns a ``datetime64[ms]`` NumPy
+    array (UTC). Requires ``numpy``.
+    """
+    np = _numpy()
+    if not isinstance(ids, np.ndarray):
+        ids = snowflakes_to_numpy(ids)
+    ms = (ids.astype(np.uint64) >> np.uint64(22)) + np.uint64(DISCORD_EPOCH)
+    return ms.astype("datetime64[ms]")
+
+
+class SnowflakeIndex(Generic[T]):
+    """A collection of objects with an ``id`` (users, guilds...) kept ordered
+    by id, which is also creation order.
+
+    The ids are stored in a sorted ``array('Q')`` alongside a list of the
+    objects, lookups and creation time range queries are binary searches.
+    Adding a single object is O(n), use :meth:`update` to add many at once.
+
+    Parameters
+    ----------
+    items: Iterable[Any]
+        The initial objects. Objects with the same id replace each other.
+    """
+
+    __slots__ = ("_ids", "_items")
+
+    def __init__(self, items: Iterable[T] = ()) -> None:
+        self._ids: array[int] = array("Q")
+        self._items: List[T] = []
+        self.update(items)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[T]:
+        return iter(self._items)
+
+    def __reversed__(self) -> Iterator[T]:
+        return reversed(self._items)
+
+    def __contains__(self, item: object) -> bool:
+        id = item if isinstance(item, int) else getattr(item, "id", None)
+        return id is not None and self._find(id) is not None
+
+    def __repr__(self) -> str:
+        return f"<SnowflakeIndex len={len(self)}>"
+
+    @overload
+    def __getitem__(self, index: int) -> T:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[T]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[T, List[T]]:
+        """Positional access, in creation order."""
+        return self._items[index]
+
+    def _bounds(
+        self, after: Optional[datetime.datetime], before: Optional[datetime.datetime]
+    ) -> Tuple[int, int]:
+        ids = self._ids
+        start = 0 if after is None else bisect_left(ids, time_snowflake(after))
+        end = len(ids) if before is None else bisect_left(ids, time_snowflake(before))
+        return start, max(start, end)
+
+    def _find(self, id: int) -> Optional[int]:
+        ids = self._ids
+        i = bisect_left(ids, id)
+        if i != len(ids) and ids[i] == id:
+            return i
+        return None
+
+    @property
+    def ids(self) -> array[int]:
+        """``array('Q')``: The sorted ids. This is the internal buffer, don't modify it."""
+        return self._ids
+
+    def get(self, id: int) -> Optional[T]:
+        """Get the object with the given id, if present."""
+        i = self._find(id)
+        if i is not None:
+            return self._items[i]
+        return None
+
+    def add(self, item: T) -> None:
+        """Add an object, replacing the one with the same id if present."""
+        ids = self._ids
+        id = item.id
+        i = bisect_left(ids, id)
+        if i != len(ids) and ids[i] == id:
+            self._items[i] = item
+            return
+        ids.insert(i, id)
+        self._items.insert(i, item)
+
+    def update(self, items: Iterable[T]) -> None:
+        """Add many objects at once with a single sort."""
+        new = {item.id: item for item in items}
+        if not new:
+            return
+        if self._items:
+            merged = dict(zip(self._ids, self._items))
+            merged.update(new)
+            new = merged
+        ordered = sorted(new)
+        self._ids = array("Q", ordered)
+        self._items = [new[id] for id in ordered]
+
+    def remove(self, id: int) -> T:
+        """Remove and return the object with the given id.
+
+        Raises
+        ------
+        KeyError
+            No object has this id.
+        """
+        i = self._find(id)
+        if i is None:
+            raise KeyError(id)
+        del self._ids[i]
+        return self._items.pop(i)
+
+    def discard(self, id: int) -> None:
+        """Remove the object with the given id if present."""
+        i = self._find(id)
+        if i is not None:
+            del self._ids[i]
+            del self._items[i]
+
+    def created_between(
+        self,
+        after: Optional[datetime.datetime] = None,
+        before: Optional[datetime.datetime] = None,
+    ) -> List[T]:
+        """Get the objects created in the given time range, oldest first.
+
+        Parameters
+        ----------
+        after: Optional[:class:`datetime.datetime`]
+            Only include objects created at or after this time.
+        before: Optional[:class:`datetime.datetime`]
+            Only include objects created before this time.
+        """
+        start, end = self._bounds(after, before)
+        return self._items[start:end]
+
+    def count_between(
+        self,
+        after: Optional[datetime.datetime] = None,
+        before: Optional[datetime.datetime] = None,
+    ) -> int:
+        """Same as :meth:`created_between` but only counts the objects."""
+        start, end = self._bounds(after, before)
+        return end - start
+
+    def to_numpy(self) -> numpy.ndarray:
+        """The sorted ids as a ``uint64`` NumPy array. Requires ``numpy``."""
+        return snowflakes_to_numpy(self._ids)
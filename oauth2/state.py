@@ -0,0 +1,386 @@
+from __future__ import annotations
+
+import abc
+import base64
+import binascii
+import hashlib
+import heapq
+import hmac
+import os
+import struct
+import time
+import weakref
+from typing import ClassVar, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+import attrs
+
+__all__: Tuple[str, ...] = (
+    "StateStore",
+    "MemoryStateStore",
+    "StateStoreStats",
+    "SignedState",
+    "SignedStateStore",
+    "StatePool",
+)
+
+
+@attrs.define(slots=True, repr=True)
+class StateStoreStats:
+    """Counters collected by a :class:`StateStore`.
+
+    Attributes
+    ----------
+    added: :class:`int`
+        The number of states stored.
+    hits: :class:`int`
+        The number of states consumed successfully.
+    misses: :class:`int`
+        The number of states that were unknown (never generated, already
+        consumed or evicted).
+    expired: :class:`int`
+        The number of states that were found but had already expired.
+    evicted: :class:`int`
+        The number of states dropped before expiring because the store was full.
+    """
+
+    added: int = 0
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evicted: int = 0
+
+
+class StateStore(abc.ABC):
+    """The interface used by :class:`Client` to keep track of the security
+    ``state`` strings it generated.
+
+    Subclass this to share states between processes, e.g. using Redis
+    ``SET NX EX`` for :meth:`add` and ``GETDEL`` for :meth:`consume`.
+
+    For more information about states read https://discord.com/developers/docs/topics/oauth2#state-and-security
+
+    Attributes
+    ----------
+    stats: :class:`StateStoreStats`
+        The hit/miss/expired counters of this store.
+    """
+
+    def __init__(self) -> None:
+        self.stats = StateStoreStats()
+
+    @abc.abstractmethod
+    async def add(self, state: str, ttl: float) -> None:
+        """Store ``state`` for ``ttl`` seconds."""
+        raise NotImplementedError
+
+    def add_nowait(self, state: str, ttl: float) -> None:
+        """Same as :meth:`add` but synchronous. Optional.
+
+        Stores backed by network services usually can't implement this, in
+        which case :meth:`Client.generate_state_link_nowait` can't be used.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def consume(self, state: str) -> bool:
+        """Atomically remove ``state`` from the store.
+
+        Returns
+        -------
+        :class:`bool`
+            ``True`` if the state was present and not expired, ``False`` otherwise.
+            A state can be consumed successfully only once.
+        """
+        raise NotImplementedError
+
+
+class MemoryStateStore(StateStore):
+    """An in-process :class:`StateStore` with O(1) lookups.
+
+    States live in a dict mapping them to their expiration time, a heap keeps
+    them ordered by expiration so expired states can be purged cheaply.
+
+    Parameters
+    ----------
+    max_size: :class:`int`
+        The maximum number of states to keep. When full, expired states are
+        purged first and then the states closest to expiring are evicted.
+    """
+
+    def __init__(self, max_size: int = 1000) -> None:
+        super().__init__()
+        self.max_size = max_size
+        self._states: Dict[str, float] = {}
+        self._expiry: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(tuple(self._states))
+
+    def __contains__(self, state: object) -> bool:
+        expires = self._states.get(state)  # type: ignore
+        return expires is not None and expires > time.monotonic()
+
+    def _pop_expiry(self) -> Optional[Tuple[float, str]]:
+        # skips heap entries whose state was consumed or re-added meanwhile
+        while self._expiry:
+            expires, state = heapq.heappop(self._expiry)
+            if self._states.get(state) == expires:
+                return expires, state
+        return None
+
+    def purge(self) -> int:
+        """Remove every expired state.
+
+        Returns
+        -------
+        :class:`int`
+            The number of states removed.
+        """
+        now = time.monotonic()
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires, state = heapq.heappop(self._expiry)
+            if self._states.get(state) == expires:
+                del self._states[state]
+                removed += 1
+        return removed
+
+    def _compact(self) -> None:
+        self._expiry = [(e, s) for s, e in self._states.items()]
+        heapq.heapify(self._expiry)
+
+    def add_nowait(self, state: str, ttl: float) -> None:
+        """Same as :meth:`add` but synchronous."""
+        if len(self._states) >= self.max_size and state not in self._states:
+            self.purge()
+            while len(self._states) >= self.max_size:
+                entry = self._pop_expiry()
+                if entry is None:
+                    break
+                del self._states[entry[1]]
+                self.stats.evicted += 1
+
+        expires = time.monotonic() + ttl
+        self._states[state] = expires
+        heapq.heappush(self._expiry, (expires, state))
+        self.stats.added += 1
+        if len(self._expiry) > 2 * self.max_size:
+            self._compact()
+
+    def consume_nowait(self, state: str) -> bool:
+        """Same as :meth:`consume` but synchronous."""
+        expires = self._states.pop(state, None)
+        if expires is None:
+            self.stats.misses += 1
+            return False
+        if expires <= time.monotonic():
+            self.stats.expired += 1
+            return False
+        self.stats.hits += 1
+        return True
+
+    async def add(self, state: str, ttl: float) -> None:
+        self.add_nowait(state, ttl)
+
+    async def consume(self, state: str) -> bool:
+        return self.consume_nowait(state)
+
+
+_pools: "weakref.WeakSet[StatePool]" = weakref.WeakSet()
+
+
+def _clear_pools() -> None:
+    for pool in _pools:
+        pool._pool.clear()
+
+
+# a forked child must not hand out the states its parent may also hand out
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_clear_pools)
+
+
+class StatePool:
+    """A pool of random, URL safe state strings generated in batches.
+
+    A whole batch is made from a single :func:`os.urandom` call which is then
+    base64 encoded at once and sliced, so taking a state from the pool is just
+    a list pop.
+
+    The pool is emptied in child processes after a fork so that the parent and
+    its children never share states.
+
+    Parameters
+    ----------
+    batch_size: :class:`int`
+        How many states to generate on each refill.
+    """
+
+    # 33 bytes encode to exactly 44 base64 chars, so the encoded batch can be
+    # sliced without padding and each state has 264 bits of entropy
+    STATE_BYTES: ClassVar[int] = 33
+    STATE_CHARS: ClassVar[int] = 44
+
+    def __init__(self, batch_size: int = 1024) -> None:
+        self.batch_size = batch_size
+        self._pool: List[str] = []
+        _pools.add(self)
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    def refill(self) -> None:
+        """Generate a new batch of states and add it to the pool."""
+        encoded = base64.urlsafe_b64encode(
+            os.urandom(self.STATE_BYTES * self.batch_size)
+        ).decode()
+        size = self.STATE_CHARS
+        self._pool.extend(encoded[i : i + size] for i in range(0, len(encoded), size))
+
+    def pop(self) -> str:
+        """Take a state from the pool, refilling it if it's empty."""
+        if not self._pool:
+            self.refill()
+        return self._pool.pop()
+
+
+_SIGNED_HEADER = struct.Struct(">Q12s")
+_SIGNATURE_SIZE = 16
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+@attrs.define(slots=True, repr=True, frozen=True)
+class SignedState:
+    """The content of a state generated by :class:`SignedStateStore`.
+
+    Attributes
+    ----------
+    expires: :class:`int`
+        The UNIX timestamp after which the state is no longer valid.
+    nonce: :class:`bytes`
+        The random part of the state.
+    payload: Optional[:class:`str`]
+        The data attached to the state when it was created, e.g. a return URL.
+    """
+
+    expires: int
+    nonce: bytes
+    payload: Optional[str] = None
+
+
+class SignedStateStore(StateStore):
+    """A stateless :class:`StateStore`. States carry their own expiration, a
+    nonce and an optional payload and are signed with HMAC-SHA256, so any
+    process knowing the key can verify them without shared storage.
+
+    Replays are rejected by a per-process filter of the nonces already consumed,
+    grouped in time buckets that are dropped once every state in them expired.
+
+    .. note::
+        The replay filter is local to the process. A state can still be used
+        once on each process of your deployment.
+
+    Parameters
+    ----------
+    keys: Union[:class:`bytes`, Sequence[:class:`bytes`]]
+        The HMAC key(s). The first key signs new states, all of them are accepted
+        when verifying, which allows rotating keys without breaking in-flight logins.
+    bucket_width: :class:`int`
+        The width in seconds of each replay filter bucket.
+    """
+
+    def __init__(
+        self, keys: Union[bytes, Sequence[bytes]], *, bucket_width: int = 60
+    ) -> None:
+        super().__init__()
+        if isinstance(keys, (bytes, bytearray)):
+            keys = [bytes(keys)]
+        if not keys:
+            raise ValueError("At least one key is required")
+        self._keys: List[bytes] = list(keys)
+        self.bucket_width = bucket_width
+        self._seen: Dict[int, Set[int]] = {}
+
+    def _sign(self, key: bytes, body: bytes) -> bytes:
+        return hmac.new(key, body, hashlib.sha256).digest()[:_SIGNATURE_SIZE]
+
+    def create(self, ttl: float, payload: Optional[str] = None) -> str:
+        """Create a new signed state valid for ``ttl`` seconds."""
+        body = _SIGNED_HEADER.pack(int(time.time() + ttl), os.urandom(12))
+        if payload is not None:
+            body += payload.encode()
+        return f"{_b64encode(body)}.{_b64encode(self._sign(self._keys[0], body))}"
+
+    def unpack(self, state: str) -> Optional[SignedState]:
+        """Verify the signature and the expiration of ``state`` without consuming it.
+
+        Returns
+        -------
+        Optional[:class:`SignedState`]
+            The content of the state or ``None`` if it's invalid or expired.
+        """
+        signed = self._verify(state)
+        if signed is None or signed.expires <= time.time():
+            return None
+        return signed
+
+    def _verify(self, state: str) -> Optional[SignedState]:
+        # the signature only, expired states are still returned
+        body_part, _, signature_part = state.partition(".")
+        try:
+            body = _b64decode(body_part)
+            signature = _b64decode(signature_part)
+        except (binascii.Error, ValueError):
+            return None
+        if len(body) < _SIGNED_HEADER.size:
+            return None
+        if not any(
+            hmac.compare_digest(signature, self._sign(key, body)) for key in self._keys
+        ):
+            return None
+
+        expires, nonce = _SIGNED_HEADER.unpack_from(body)
+        payload = body[_SIGNED_HEADER.size :]
+        return SignedState(expires, nonce, payload.decode() if payload else None)
+
+    def _mark_seen(self, signed: SignedState) -> bool:
+        current = int(time.time()) // self.bucket_width
+        for bucket in [b for b in self._seen if b < current]:
+            del self._seen[bucket]
+
+        seen = self._seen.setdefault(signed.expires // self.bucket_width, set())
+        key = int.from_bytes(signed.nonce[:8], "big")
+        if key in seen:
+            return False
+        seen.add(key)
+        return True
+
+    def add_nowait(self, state: str, ttl: float) -> None:
+        # the state already carries everything needed to verify it
+        self.stats.added += 1
+
+    async def add(self, state: str, ttl: float) -> None:
+        self.add_nowait(state, ttl)
+
+    async def consume(self, state: str) -> bool:
+        signed = self._verify(state)
+        if signed is None:
+            self.stats.misses += 1
+            return False
+        if signed.expires <= time.time():
+            self.stats.expired += 1
+            return False
+        if not self._mark_seen(signed):
+            self.stats.misses += 1
+            return False
+        self.stats.hits += 1
+        return True
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
 import enum
+import weakref
 from typing import TYPE_CHECKING, List, Optional
 
 import attrs
 
+from oauth2.mixins import Hashable
+
 if TYPE_CHECKING:
     from oauth2.types import Team as TeamData, TeamMember as TeamMemberData
 
@@ -25,21 +28,29 @@ class TeamMember:
     id: int
     permissions: List[str]
     membership_state: TeamMembershipState = attrs.field(converter=_to_enum)
-    team: Team
+    team_id: int
+    # a weak reference so the team and its members don't form a reference cycle
+    _team: weakref.ReferenceType[Team] = attrs.field(repr=False, eq=False)
 
     @classmethod
     def from_data(cls, data: TeamMemberData, team: Team) -> TeamMember:
         return cls(
             name=data["user"]["username"],
-            id=data["user"]["id"],  # type: ignore
+            id=int(data["user"]["id"]),
             permissions=data["permissions"],
             membership_state=data["membership_state"],
-            team=team,
+            team_id=team.id,
+            team=weakref.ref(team),  # type: ignore
         )
 
+    @property
+    def team(self) -> Optional[Team]:
+        """Optional[:class:`Team`]: The team of this member, if it's still alive."""
+        return self._team()
 
-@attrs.define(slots=True, repr=True)
-class Team:
+
+@attrs.define(slots=True, repr=True, eq=False)
+class Team(Hashable):
     id: int
     name: str
     members: List[TeamMember]
@@ -49,10 +60,10 @@ class Team:
     @classmethod
     def from_data(cls, data: TeamData) -> Team:
         team = cls(
-            id=data["id"],  # type: ignore
+            id=int(data["id"]),
             name=data["name"],
             members=[],
-            _icon=data.get("icon"),
+            icon=data.get("icon"),  # type: ignore
             owner_id=data.get("owner_user_id"),  # type: ignore
         )
         team.members = [TeamMember.from_data(i, team) for i in data["members"]]
@@ -1,19 +1,18 @@
-from typing import List, Union
-
-from typing_extensions import TypeAlias
-
+# isort: off
+# the submodules import names from the package, so they're imported after
+# the modules they depend on
+from .snowflake import *
+from .user import *
+from .team import *
 from .appinfo import *
-from .connection import *
-from .emoji import *
-from .guild import *
 from .i18n import *
 from .integration import *
-from .payloads import *
+from .connection import *
+from .emoji import *
 from .role import *
 from .sticker import *
-from .team import *
-from .user import *
+from .guild import *
 from .channel import *
+from .payloads import *
 
-Snowflake: TypeAlias = Union[str, int]
-SnowflakeList: TypeAlias = Union[List[str], List[int]]
+# isort: on
@@ -0,0 +1,8 @@
+from typing import List, Tuple, Union
+
+from typing_extensions import TypeAlias
+
+__all__: Tuple[str, ...] = ("Snowflake", "SnowflakeList")
+
+Snowflake: TypeAlias = Union[str, int]
+SnowflakeList: TypeAlias = Union[List[str], List[int]]
@@ -1,28 +1,33 @@
 from __future__ import annotations
 
-import base64
-from typing import TYPE_CHECKING, AsyncIterator, List, Optional
+import datetime
+from typing import TYPE_CHECKING, Any, AsyncIterator, List, Optional, Set, Union
 
 import attrs
 
-from oauth2.asset import Asset
+from oauth2.asset import Asset, AssetOwner, cached_asset
 from oauth2.connection import (
     ApplicationRoleConnection,
     ApplicationRoleConnectionMetadata,
     Connection,
 )
-from oauth2.guild import PartialGuild
+from oauth2.file import is_data_uri
+from oauth2.guild import GuildMembership, PartialGuild
+from oauth2.lazy import LazyField, LazyModel
+from oauth2.mixins import Hashable, Updatable
+from oauth2.scopes import OAuthScopes
+from oauth2.snowflake import snowflake_time
+from oauth2.utils import requires_scopes
 
 if TYPE_CHECKING:
     from oauth2._http import HTTPClient
     from oauth2.file import File
     from oauth2.session import OAuth2Session
-    from oauth2.types import User as UserData
-    from oauth2.types import PartialDMUser
+    from oauth2.types import PartialDMUser, User as UserData
 
 
-@attrs.define(slots=True, repr=True)
-class User:
+@attrs.define(slots=True, repr=True, eq=False)
+class User(Hashable, Updatable, AssetOwner):
     _http: HTTPClient
     id: int
     username: str
@@ -41,6 +46,9 @@ class User:
     _avatar: Optional[str] = None
     _banner: Optional[str] = None
     _accent_colour: Optional[str] = None
+    _payload: Optional[Any] = attrs.field(
+        default=None, init=False, repr=False, eq=False
+    )
 
     @classmethod
     def from_data(
@@ -49,68 +57,107 @@ class User:
         http: HTTPClient,
         session: Optional[OAuth2Session] = None,
     ) -> User:
-        return cls(
-            _http=http,
-            id=data["id"],  # type: ignore
+        if cls is User and http.lazy_models:
+            return LazyUser.from_data(data, http, session)
+        user = cls(
+            http=http,  # type: ignore
+            id=int(data["id"]),
             username=data["username"],
             discriminator=data["discriminator"],
             bot=data.get("bot", False),
             system=data.get("system", False),
             mfa_enabled=data.get("mfa_enabled", False),
-            _session=session,
+            session=session,  # type: ignore
             locale=data.get("locale"),
             verified=data.get("verified", False),
-            _public_flags=data.get("public_flags", 0),
+            public_flags=data.get("public_flags", 0),  # type: ignore
             premium_type=data.get("premium_type", 0),
-            _avatar=data.get("avatar"),
-            _banner=data.get("banner"),
-            _accent_colour=data.get("accent_colour"),
+            email=data.get("email"),
+            global_name=data.get("global_name"),
+            avatar=data.get("avatar"),  # type: ignore
+            banner=data.get("banner"),  # type: ignore
+            accent_colour=data.get("accent_colour"),  # type: ignore
+        )
+        user._payload = data
+        return user
+
+    def update_from(self, data: UserData | PartialDMUser) -> Set[str]:
+        """Update this object in place from a new payload.
+
+        If the payload is exactly the same as the one this object was built or
+        last updated from, nothing is built or compared.
+
+        Returns
+        -------
+        Set[:class:`str`]
+            The names of the fields that changed, empty if nothing changed.
+        """
+        return self._update_from(
+            data, lambda: User.from_data(data, self._http, self._session)
         )
 
     @property
-    def default_avatar(self) -> Asset:
-        if self.discriminator == "0":
+    def created_at(self) -> datetime.datetime:
+        """:class:`datetime.datetime`: When this user was created, in UTC."""
+        return snowflake_time(self.id)
+
+    @cached_asset("discriminator")
+    def default_avatar(self, discriminator: str) -> Asset:
+        if discriminator == "0":
             index = (self.id >> 22) % 6
         else:
             # legacy behavior
-            index = int(self.discriminator) % 5
+            index = int(discriminator) % 5
         return Asset._from_default_avatar(self._http, index)
 
-    @property
-    def avatar(self) -> Optional[Asset]:
-        if self._avatar:
-            return Asset._from_avatar(self._http, self.id, self._avatar)
+    @cached_asset("_avatar")
+    def avatar(self, avatar: str) -> Asset:
+        return Asset._from_avatar(self._http, self.id, avatar)
 
-    @property
-    def banner(self) -> Optional[Asset]:
-        if self._banner:
-            return Asset._from_banner(self._http, self.id, self._banner)
+    @cached_asset("_banner")
+    def banner(self, banner: str) -> Asset:
+        return Asset._from_banner(self._http, self.id, banner)
 
-    @property
-    def avatar_decoration(self) -> Optional[Asset]:
-        if self._avatar_decoration:
-            return Asset._from_avatar_decoration(
-                self._http, self.id, self._avatar_decoration
-            )
+    @cached_asset("_avatar_decoration")
+    def avatar_decoration(self, avatar_decoration: str) -> Asset:
+        return Asset._from_avatar_decoration(self._http, self.id, avatar_decoration)
 
     @property
     def session(self) -> Optional[OAuth2Session]:
         if self._session:
             return self._session
 
-    async def _avatar_helper(self, file: Optional[File] = None) -> Optional[str]:
+    async def _avatar_helper(
+        self, file: Optional[Union[File, str]] = None
+    ) -> Optional[str]:
         if not file:
-            return
-
-        data = self._http.loop.run_in_executor(None, file.fp.read)
-        await data
-        encoded_bytes = base64.b64encode(data.result())
-
-        return f"data:{file.file_type};base64,{encoded_bytes}"
+            return None
+        if isinstance(file, str):
+            if not is_data_uri(file):
+                raise ValueError(
+                    "avatar must be a File or a base64 data URI of an image"
+                )
+            return file
+        return await file.to_data_uri()
 
     async def edit(
-        self, username: Optional[str] = None, avatar: Optional[File] = None
+        self, username: Optional[str] = None, avatar: Optional[Union[File, str]] = None
     ) -> User:
+        """Edit the user.
+
+        Parameters
+        ----------
+        username: Optional[:class:`str`]
+            The new username.
+        avatar: Optional[Union[:class:`File`, :class:`str`]]
+            The new avatar, either a :class:`File` or a data URI returned by
+            :meth:`File.to_data_uri`, which is sent without encoding it again.
+
+        Raises
+        ------
+        ValueError
+            The avatar is too large or not a PNG, JPEG or GIF image.
+        """
         if not self._session:
             raise AttributeError(
                 "This user object can't be edited because it doesn't have a `session` linked."
@@ -122,6 +169,7 @@ class User:
         )
         return User.from_data(data, self._http, self._session)
 
+    @requires_scopes(OAuthScopes.guilds)
     async def guilds(
         self,
         *,
@@ -129,7 +177,7 @@ class User:
         after: Optional[int] = None,
         limit: int = 200,
         with_counts: bool = False,
-    ) -> AsyncIterator[PartialGuild]:
+    ) -> AsyncIterator[Union[PartialGuild, GuildMembership]]:
         if not self._session:
             raise AttributeError(
                 "This user object can't be edited because it doesn't have a `session` linked."
@@ -138,9 +186,18 @@ class User:
         data = await self._http._get_user_guids(
             before, after, limit, with_counts, self._session.access_token
         )
-        for i in data:
-            yield PartialGuild.from_data(i, self._http)
+        guilds: List[Union[PartialGuild, GuildMembership]]
+        if (guild_map := self._http.guild_map) is not None:
+            guilds = [guild_map.membership(i, self._http) for i in data]
+        else:
+            guilds = [PartialGuild.from_data(i, self._http) for i in data]
 
+        if (prefetcher := self._http.prefetcher) is not None:
+            prefetcher.prefetch_guilds(self.id, guilds)
+        for guild in guilds:
+            yield guild
+
+    @requires_scopes(OAuthScopes.connections)
     async def fetch_user_connections(self) -> List[Connection]:
         if not self._session:
             raise AttributeError(
@@ -152,6 +209,7 @@ class User:
         )
         return [Connection.from_data(i) for i in data]
 
+    @requires_scopes(OAuthScopes.role_connections_write)
     async def fetch_user_application_role_connection(
         self, application_id: int
     ) -> ApplicationRoleConnection:
@@ -165,6 +223,7 @@ class User:
         )
         return ApplicationRoleConnection.from_data(data)
 
+    @requires_scopes(OAuthScopes.role_connections_write)
     async def update_user_application_role_connection(
         self,
         application_id: int,
@@ -185,3 +244,40 @@ class User:
             access_token=self._session.access_token,
         )
         return ApplicationRoleConnection.from_data(data)
+
+
+class LazyUser(LazyModel, User):
+    """A :class:`User` that decodes its fields from the payload on first access."""
+
+    __slots__ = ("_data", "__dict__")
+
+    id = LazyField("id", int)
+    username = LazyField("username")
+    discriminator = LazyField("discriminator")
+    bot = LazyField("bot", default=False)
+    system = LazyField("system", default=False)
+    mfa_enabled = LazyField("mfa_enabled", default=False)
+    verified = LazyField("verified", default=False)
+    _public_flags = LazyField("public_flags", default=0)
+    premium_type = LazyField("premium_type", default=0)
+    locale = LazyField("locale", default=None)
+    email = LazyField("email", default=None)
+    global_name = LazyField("global_name", default=None)
+    _avatar = LazyField("avatar", default=None)
+    _banner = LazyField("banner", default=None)
+    _accent_colour = LazyField("accent_colour", default=None)
+
+    @classmethod
+    def from_data(
+        cls,
+        data: UserData | PartialDMUser,
+        http: HTTPClient,
+        session: Optional[OAuth2Session] = None,
+    ) -> LazyUser:
+        return cls._from_raw(
+            data,
+            _http=http,
+            _session=session,
+            _avatar_decoration=None,
+            _payload=None,
+        )
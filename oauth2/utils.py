@@ -1,17 +1,17 @@
 from __future__ import annotations
 
 import datetime
+import functools
+import inspect
 import json
 from enum import Enum
-from typing import TYPE_CHECKING, Any, List, Optional
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
 from urllib.parse import urlencode
 
-if TYPE_CHECKING:
-    from oauth2.appinfo import InstallParams
-    from oauth2.scopes import OAuthScopes
-    from oauth2.types import InstallParams as InstallParamsPayload
+from oauth2.scopes import OAuthScopes
 
 BASE_OAUTH_AUTHORIZE_URL = "https://discord.com/oauth2/authorize?"
+F = TypeVar("F", bound=Callable[..., Any])
 
 
 class ResponseType(Enum):
@@ -28,7 +28,27 @@ def _to_json(obj: Any) -> str:
     return json.dumps(obj, separators=(",", ":"), ensure_ascii=True)
 
 
-def get_oauth2_url(
+@functools.lru_cache(maxsize=64)
+def _oauth2_url_template(
+    client_id: int,
+    scopes: OAuthScopes,
+    redirect_uri: str,
+    response_type: ResponseType,
+    prompt: PromptType,
+) -> Tuple[str, str, str]:
+    # the parts of the authorize url that don't change between links,
+    # the optional parameters are spliced between them
+    head = f"https://discord.com/oauth2/authorize?client_id={client_id}"
+    if scopes:
+        head += f"&scope={scopes.as_url_param()}"
+    middle = f"&response_type={response_type.value}&" + urlencode(
+        {"redirect_uri": redirect_uri}
+    )
+    tail = f"&prompt={prompt.value}"
+    return head, middle, tail
+
+
+def _oauth2_url_prefix(
     client_id: int,
     scopes: OAuthScopes,
     redirect_uri: str,
@@ -36,59 +56,89 @@ def get_oauth2_url(
     guild_id: Optional[int] = None,
     disable_guild_select: bool = False,
     response_type: ResponseType = ResponseType.code,
-    state: Optional[str] = None,
     prompt: PromptType = PromptType.consent,
-) -> str:
-    url = f"https://discord.com/oauth2/authorize?client_id={client_id}"
-    if scopes:
-        url += f"&scope={scopes.as_url_param()}"
+) -> Tuple[str, str]:
+    # returns the url up to the state value and the part after it
+    head, middle, tail = _oauth2_url_template(
+        client_id, scopes, redirect_uri, response_type, prompt
+    )
+    url = head
     if permissions is not None:
         url += f"&permissions={permissions}"
     if guild_id is not None:
         url += f"&guild_id={guild_id}"
-    url += f"&response_type={response_type.value}&" + urlencode(
-        {"redirect_uri": redirect_uri}
-    )
+    url += middle
     if disable_guild_select:
         url += "&disable_guild_select=true"
+    return url, tail
+
+
+def get_oauth2_url(
+    client_id: int,
+    scopes: OAuthScopes,
+    redirect_uri: str,
+    permissions: Optional[int] = None,
+    guild_id: Optional[int] = None,
+    disable_guild_select: bool = False,
+    response_type: ResponseType = ResponseType.code,
+    state: Optional[str] = None,
+    prompt: PromptType = PromptType.consent,
+) -> str:
+    url, tail = _oauth2_url_prefix(
+        client_id,
+        scopes,
+        redirect_uri,
+        permissions,
+        guild_id,
+        disable_guild_select,
+        response_type,
+        prompt,
+    )
     if state:
         url += f"&state={state}"
-    url += f"&prompt={prompt.value}"
-    return url
+    return url + tail
 
 
 def _to_oauth2_scopes(_v: List[str]) -> OAuthScopes:
-    from oauth2.scopes import OAuthScopes
-
-    for i in _v:
-        if i.startswith(("role_connections", "dm_channels")):
-            _name_chars = list(i)
-            under = i.rfind("_")
-            _name_chars[under] = "."
-            old_idx = _v.index(i)
-            _v[old_idx] = "".join(_name_chars)
-        else:
-            i_ = i.replace(".", "_")
-            old_idx = _v.index(i)
-            _v[old_idx] = i_
-
-    members = iter(_v)
-    first_s = next(members)
-    scopes = OAuthScopes[first_s]
-
-    for scope in members:
-        scopes |= OAuthScopes[scope]
-    return scopes
-
-
-def _to_install_params(_v: Optional[InstallParamsPayload]) -> Optional[InstallParams]:
-    if _v is None:
-        return
+    return OAuthScopes.from_api_names(_v)
+
+
+def _parse_scopes(_v: str) -> OAuthScopes:
+    # parses the space separated ``scope`` string sent by discord,
+    # unknown scopes are ignored
+    return OAuthScopes.parse(_v)
+
+
+def requires_scopes(scopes: OAuthScopes) -> Callable[[F], F]:
+    """Mark an endpoint wrapper as requiring ``scopes``. The call fails with
+    :class:`MissingScopes` before sending any request if the session linked to
+    the object doesn't have them.
+    """
+
+    def _check(obj: Any) -> None:
+        session = getattr(obj, "_session", obj)
+        if session is not None:
+            session._check_scopes(scopes)
+
+    def decorator(func: F) -> F:
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def gen_wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+                _check(self)
+                async for item in func(self, *args, **kwargs):
+                    yield item
+
+            return gen_wrapper  # type: ignore
+
+        @functools.wraps(func)
+        async def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            _check(self)
+            return await func(self, *args, **kwargs)
 
-    from oauth2.appinfo import InstallParams
+        return wrapper  # type: ignore
 
-    scopes = _to_oauth2_scopes(_v["scopes"]) or OAuthScopes.none()
-    return InstallParams(scopes, int(_v["permissions"]))
+    return decorator
 
 
 def to_datetime(_v: str) -> datetime.datetime:
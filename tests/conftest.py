@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from typing import Any, AsyncIterator, Callable, Dict, Iterator
+
+import pytest
+from aiohttp import web
+
+from oauth2 import Client
+from oauth2._http import HTTPClient, Route
+from oauth2.scopes import OAuthScopes
+from oauth2.session import OAuth2Session
+
+
+@pytest.fixture
+def serve(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Callable[[web.Application], contextlib.AbstractAsyncContextManager[str]]:
+    """Serve ``app`` on a free local port and point the API routes to it."""
+
+    @contextlib.asynccontextmanager
+    async def serve(app: web.Application) -> AsyncIterator[str]:
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = runner.addresses[0][1]
+        base = f"http://127.0.0.1:{port}"
+        monkeypatch.setattr(Route, "BASE", base)
+        try:
+            yield base
+        finally:
+            await runner.cleanup()
+
+    return serve
+
+
+@pytest.fixture
+def make_client() -> Callable[..., Client]:
+    """Build a :class:`Client`, must be called inside the running loop."""
+
+    def make_client(**kwargs) -> Client:
+        kwargs.setdefault("scopes", OAuthScopes.identify)
+        kwargs.setdefault("client_secret", "secret")
+        kwargs.setdefault("redirect_uri", "http://localhost/callback")
+        return Client(1, **kwargs)
+
+    return make_client
+
+
+@pytest.fixture
+def make_session() -> Callable[..., OAuth2Session]:
+    def make_session(
+        client: Client, token: str, scope: str = "identify"
+    ) -> OAuth2Session:
+        return OAuth2Session(token, "Bearer", 604800, scope, client)
+
+    return make_session
+
+
+@pytest.fixture
+def make_http() -> Iterator[Callable[..., HTTPClient]]:
+    """Build an :class:`HTTPClient` for model tests, no request is sent."""
+    loop = asyncio.new_event_loop()
+
+    def make_http(**kwargs) -> HTTPClient:
+        return HTTPClient(
+            None, loop, client_id=1, client_secret="secret", bot_token=None, **kwargs
+        )
+
+    yield make_http
+    loop.close()
+
+
+def user_payload(id: int = 80351110224678912, **fields: Any) -> Dict[str, Any]:
+    data = {
+        "id": str(id),
+        "username": "nelly",
+        "discriminator": "0",
+        "global_name": "Nelly",
+        "avatar": "8342729096ea3675442027381ff50dfe",
+        "verified": True,
+        "email": "nelly@discord.com",
+        "flags": 64,
+        "banner": "06c16474723fe537c283b8efa61a30c8",
+        "accent_color": 16711680,
+        "premium_type": 1,
+        "public_flags": 64,
+        "locale": "en-US",
+        "mfa_enabled": True,
+    }
+    data.update(fields)
+    return data
+
+
+def guild_payload(id: int = 197038439483310086, **fields: Any) -> Dict[str, Any]:
+    data = {
+        "id": str(id),
+        "name": "Discord Testers",
+        "icon": "f64c482b807da4f539cff778d174971c",
+        "owner": False,
+        "permissions": "246997699",
+        "features": ["COMMUNITY", "NEWS", "VERIFIED", "VANITY_URL", "BANNER"],
+        "approximate_member_count": 3268,
+        "approximate_presence_count": 784,
+    }
+    data.update(fields)
+    return data
+
+
+def app_payload(id: int = 172150183260323840, **fields: Any) -> Dict[str, Any]:
+    data = {
+        "id": str(id),
+        "name": "Baba O-Riley",
+        "icon": None,
+        "description": "Test",
+        "bot_public": True,
+        "bot_require_code_grant": False,
+        "verify_key": "1e0a356058d627ca38a5c8c9648818061d49e49bd9da9e3ab17d98ad4d6bg2u8",
+        "guild_id": "290926798626357260",
+        "primary_sku_id": "172150183260323840",
+        "slug": "test",
+        "tags": ["moderation"],
+        "install_params": {
+            "scopes": ["bot", "applications.commands"],
+            "permissions": "8",
+        },
+        "owner": user_payload(),
+        "team": {
+            "id": "531992624043786253",
+            "name": "Team",
+            "icon": None,
+            "owner_user_id": "511972282709709995",
+            "members": [
+                {
+                    "membership_state": 2,
+                    "permissions": ["*"],
+                    "team_id": "531992624043786253",
+                    "user": user_payload(511972282709709995, username="Mr Owner"),
+                }
+            ],
+        },
+    }
+    data.update(fields)
+    return data
+
+
+@pytest.fixture
+def payloads() -> Any:
+    """The payload builders, as ``payloads.user(...)`` etc."""
+
+    class payloads:
+        user = staticmethod(user_payload)
+        guild = staticmethod(guild_payload)
+        app = staticmethod(app_payload)
+
+    return payloads
@@ -0,0 +1,338 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import threading
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from oauth2._http import HTTPClient
+from oauth2.asset import Asset, _variant_url
+from oauth2.cache import CDNResponse, DiskAssetCache, MemoryAssetCache
+from oauth2.errors import AssetTooLarge
+from oauth2.user import User
+
+DATA = bytes(range(256)) * 40
+
+
+def _http(**kwargs) -> HTTPClient:
+    # built inside the running loop, the CDN session needs it
+    loop = asyncio.get_running_loop()
+    return HTTPClient(
+        None, loop, client_id=1, client_secret="secret", bot_token=None, **kwargs
+    )
+
+
+def _asset(http: HTTPClient, url: str) -> Asset:
+    return Asset(url=url, key="a", animated=False, http=http)  # type: ignore
+
+
+def test_stream_chunks_outlive_the_stream(tmp_path):
+    async def main():
+        http = _http(asset_cache=DiskAssetCache(tmp_path))
+        asset = _asset(http, "https://cdn.discordapp.com/avatars/1/a.png")
+        http.asset_cache.put(asset.url, DATA)
+        try:
+            whole = [chunk async for chunk in await asset.stream(chunk_size=1000)]
+            part = [chunk async for chunk in await asset.stream(byte_range=(10, 2999))]
+        finally:
+            await http.close()
+        return whole, part
+
+    whole, part = asyncio.run(main())
+    # copied out of the mapping, which is closed by now
+    assert all(isinstance(chunk, bytes) for chunk in whole + part)
+    assert len(whole) == 11
+    assert b"".join(whole) == DATA
+    assert b"".join(part) == DATA[10:3000]
+
+
+def test_stream_memory_cached_assets_without_copying():
+    async def main():
+        cache = MemoryAssetCache()
+        http = _http(asset_memory_cache=cache)
+        asset = _asset(http, "https://cdn.discordapp.com/avatars/1/a.png")
+        cache.put(asset.url, CDNResponse(DATA))
+        cached = cache.get(asset.url)
+        try:
+            whole = [chunk async for chunk in await asset.stream(chunk_size=1000)]
+            part = [chunk async for chunk in await asset.stream(byte_range=(10, 2999))]
+            written = io.BytesIO()
+            await asset.save(written, chunk_size=1000)
+        finally:
+            await http.close()
+        cache.clear()
+        return cached, whole, part, written.getvalue()
+
+    cached, whole, part, written = asyncio.run(main())
+    # views of the cached bytes, which they keep alive
+    assert all(isinstance(chunk, memoryview) for chunk in whole + part)
+    assert all(chunk.obj is cached for chunk in whole + part)
+    assert len(whole) == 11
+    assert b"".join(whole) == DATA
+    assert b"".join(part) == DATA[10:3000]
+    assert written == DATA
+
+
+def test_aclose_before_iterating_releases_the_mapping(tmp_path):
+    async def main():
+        cache = DiskAssetCache(tmp_path)
+        http = _http(asset_cache=cache)
+        asset = _asset(http, "https://cdn.discordapp.com/avatars/1/a.png")
+        cache.put(asset.url, DATA)
+        mapped = []
+        map_file = cache._map
+
+        def spy(key):
+            mapped.append((threading.get_ident(), map_file(key)))
+            return mapped[-1][1]
+
+        cache._map = spy  # type: ignore
+        stream = await asset.stream()
+        await stream.aclose()
+        await http.close()
+        return threading.get_ident(), mapped
+
+    loop_thread, mapped = asyncio.run(main())
+    assert len(mapped) == 1
+    thread, mapping = mapped[0]
+    # mapped from the executor, closed with the stream
+    assert thread != loop_thread
+    assert mapping.closed
+
+
+def test_aclose_before_iterating_releases_the_connection(serve):
+    async def handler(request: web.Request) -> web.StreamResponse:
+        # still sending when the stream is closed
+        resp = web.StreamResponse()
+        resp.content_type = "image/png"
+        await resp.prepare(request)
+        for _ in range(50):
+            await resp.write(DATA)
+            await asyncio.sleep(0.01)
+        return resp
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/a.png", handler)
+        async with serve(app) as base:
+            http = _http()
+            stream = await _asset(http, f"{base}/a.png").stream()
+            try:
+                await stream.aclose()
+                connector = http.cdn._get_session().connector
+                in_use = len(connector._acquired)
+            finally:
+                await http.close()
+        return stream.status, in_use
+
+    assert asyncio.run(main()) == (200, 0)
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_cached_asset_is_rebuilt_when_the_hash_changes(make_http, payloads, lazy):
+    user = User.from_data(payloads.user(), make_http(lazy_models=lazy))
+    avatar = user.avatar
+    assert user.avatar is avatar
+
+    user.update_from(payloads.user(username="renamed"))
+    assert user.avatar is avatar
+
+    user.update_from(payloads.user(avatar="a_0123456789abcdef0123456789abcdef"))
+    assert user.avatar is not avatar
+    assert user.avatar.key == "a_0123456789abcdef0123456789abcdef"
+    assert user.avatar.animated
+
+    user.update_from(payloads.user(avatar=None))
+    assert user.avatar is None
+
+
+def test_save_renames_the_part_file_on_success(tmp_path):
+    target = tmp_path / "out" / "a.png"
+    target.parent.mkdir()
+
+    async def main():
+        cache = DiskAssetCache(tmp_path / "cache")
+        http = _http(asset_cache=cache)
+        asset = _asset(http, "https://cdn.discordapp.com/avatars/1/a.png")
+        cache.put(asset.url, DATA)
+        checksum = hashlib.sha256()
+        try:
+            return (
+                await asset.save(target, chunk_size=1000, checksum=checksum),
+                checksum,
+            )
+        finally:
+            await http.close()
+
+    written, checksum = asyncio.run(main())
+    assert written == len(DATA)
+    assert target.read_bytes() == DATA
+    assert checksum.hexdigest() == hashlib.sha256(DATA).hexdigest()
+    assert [p.name for p in target.parent.iterdir()] == ["a.png"]
+
+
+def test_save_removes_the_part_file_when_too_large(tmp_path):
+    target = tmp_path / "a.png"
+    target.write_bytes(b"previous")
+
+    async def main():
+        http = _http(asset_cache=DiskAssetCache(tmp_path / "cache"))
+        asset = _asset(http, "https://cdn.discordapp.com/avatars/1/a.png")
+        http.asset_cache.put(asset.url, DATA)
+        try:
+            with pytest.raises(AssetTooLarge):
+                await asset.save(target, max_size=len(DATA) - 1)
+        finally:
+            await http.close()
+
+    asyncio.run(main())
+    # the previous file is only replaced by a complete download
+    assert target.read_bytes() == b"previous"
+    assert not (tmp_path / "a.png.part").exists()
+
+
+def test_save_removes_the_part_file_on_error(tmp_path, serve):
+    async def handler(request: web.Request) -> web.StreamResponse:
+        response = web.StreamResponse(headers={"Content-Length": str(len(DATA))})
+        await response.prepare(request)
+        await response.write(DATA[:1000])
+        # the connection drops before the whole body was sent
+        request.transport.close()
+        return response
+
+    app = web.Application()
+    app.router.add_get("/a.png", handler)
+    target = tmp_path / "a.png"
+
+    async def main():
+        async with serve(app) as base:
+            http = _http()
+            try:
+                with pytest.raises(aiohttp.ClientPayloadError):
+                    await _asset(http, f"{base}/a.png").save(target, chunk_size=100)
+            finally:
+                await http.close()
+
+    asyncio.run(main())
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_save_checksum_detects_a_corrupted_copy(tmp_path):
+    async def main():
+        cache = DiskAssetCache(tmp_path / "cache")
+        http = _http(asset_cache=cache)
+        asset = _asset(http, "https://cdn.discordapp.com/avatars/1/a.png")
+        cache.put(asset.url, DATA[:-1] + b"\x00")
+        checksum = hashlib.sha256()
+        try:
+            await asset.save(tmp_path / "a.png", checksum=checksum)
+        finally:
+            await http.close()
+        return checksum
+
+    # the checksum covers the bytes written, not the bytes expected
+    assert asyncio.run(main()).digest() != hashlib.sha256(DATA).digest()
+
+
+@pytest.mark.parametrize("seek_begin", [True, False])
+def test_save_to_a_file_object_seeks_back(tmp_path, seek_begin):
+    async def main(fp):
+        http = _http(asset_cache=DiskAssetCache(tmp_path / "cache"))
+        asset = _asset(http, "https://cdn.discordapp.com/avatars/1/a.png")
+        http.asset_cache.put(asset.url, DATA)
+        try:
+            if seek_begin:
+                # the default
+                return await asset.save(fp)
+            return await asset.save(fp, seek_begin=False)
+        finally:
+            await http.close()
+
+    memory = io.BytesIO()
+    assert asyncio.run(main(memory)) == len(DATA)
+    with open(tmp_path / "a.png", "w+b") as f:
+        assert asyncio.run(main(f)) == len(DATA)
+        on_disk = f.tell()
+    expected = 0 if seek_begin else len(DATA)
+    assert memory.tell() == on_disk == expected
+    assert memory.getvalue() == DATA
+
+
+AVATAR_URL = "https://cdn.discordapp.com/avatars/1/a_abc.gif"
+STATIC_URL = "https://cdn.discordapp.com/avatars/1/abc.png"
+
+
+def _keyed(make_http, url: str) -> Asset:
+    key = url.rpartition("/")[2].partition(".")[0]
+    return Asset(url=url, key=key, animated=key.startswith("a_"), http=make_http())  # type: ignore
+
+
+@pytest.mark.parametrize("size", [16, 32, 64, 128, 256, 512, 1024, 2048, 4096])
+def test_with_size(make_http, size):
+    asset = _keyed(make_http, STATIC_URL).with_size(size)
+    assert asset.url == f"{STATIC_URL}?size={size}"
+    assert asset.with_size(size) is asset
+
+
+@pytest.mark.parametrize("size", [0, 8, 15, 100, 8192, -16])
+def test_with_size_rejects_invalid_sizes(make_http, size):
+    with pytest.raises(ValueError, match="power of 2"):
+        _keyed(make_http, STATIC_URL).with_size(size)
+
+
+@pytest.mark.parametrize(
+    ("url", "format", "expected", "animated"),
+    [
+        (STATIC_URL, "webp", "https://cdn.discordapp.com/avatars/1/abc.webp", False),
+        (STATIC_URL, "jpg", "https://cdn.discordapp.com/avatars/1/abc.jpeg", False),
+        (STATIC_URL, "JPEG", "https://cdn.discordapp.com/avatars/1/abc.jpeg", False),
+        (STATIC_URL, "png", STATIC_URL, False),
+        (AVATAR_URL, "gif", AVATAR_URL, True),
+        (AVATAR_URL, "png", "https://cdn.discordapp.com/avatars/1/a_abc.png", False),
+    ],
+)
+def test_with_format(make_http, url, format, expected, animated):
+    asset = _keyed(make_http, url).with_format(format)
+    assert asset.url == expected
+    assert asset.animated is animated
+
+
+@pytest.mark.parametrize(("url", "format"), [(STATIC_URL, "gif"), (AVATAR_URL, "bmp")])
+def test_with_format_rejects_invalid_formats(make_http, url, format):
+    with pytest.raises(ValueError, match="format must be one of"):
+        _keyed(make_http, url).with_format(format)
+
+
+@pytest.mark.parametrize("format", ["png", "jpg", "webp"])
+def test_with_static_format_of_an_animated_asset(make_http, format):
+    asset = _keyed(make_http, AVATAR_URL).with_static_format(format)
+    assert not asset.animated
+    assert asset.key == "a_abc"
+    assert asset.url.endswith("/a_abc." + ("jpeg" if format == "jpg" else format))
+    with pytest.raises(ValueError, match="format must be one of"):
+        _keyed(make_http, AVATAR_URL).with_static_format("gif")
+
+
+@pytest.mark.parametrize(
+    ("url", "format", "size", "expected"),
+    [
+        ("https://cdn/a.png?size=64", None, 128, "https://cdn/a.png?size=128"),
+        ("https://cdn/a.png?size=64", "webp", None, "https://cdn/a.webp?size=64"),
+        (
+            "https://cdn/a.png?quality=lossless&size=64",
+            "webp",
+            256,
+            "https://cdn/a.webp?quality=lossless&size=256",
+        ),
+        ("https://cdn/a.png?", None, 16, "https://cdn/a.png?size=16"),
+        ("https://cdn/a.png", None, None, "https://cdn/a.png"),
+    ],
+)
+def test_variant_url_keeps_the_query_string(url, format, size, expected):
+    assert _variant_url(url, format, size) == expected
+    # cached, the same variant is the same string
+    assert _variant_url(url, format, size) is _variant_url(url, format, size)
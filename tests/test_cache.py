@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+
+from aiohttp import web
+
+from oauth2._http import HTTPClient
+from oauth2.asset import Asset
+from oauth2.cache import CDNResponse, DiskAssetCache, MemoryAssetCache
+
+AVATAR = b"\x89PNG default avatar"
+ETAG = '"avatar-v1"'
+LAST_MODIFIED = "Wed, 21 Oct 2015 07:28:00 GMT"
+
+
+def test_disk_cache_fetch_reads_off_the_loop(tmp_path):
+    cache = DiskAssetCache(tmp_path)
+    cache.put("https://cdn/a.png", b"cached")
+    threads = []
+    read = cache._read
+
+    def spy(key):
+        threads.append(threading.get_ident())
+        return read(key)
+
+    cache._read = spy  # type: ignore
+
+    async def download(url):
+        return b"downloaded"
+
+    async def main():
+        assert await cache.fetch("https://cdn/a.png", download) == b"cached"
+        assert await cache.fetch("https://cdn/b.png", download) == b"downloaded"
+        assert await cache.fetch("https://cdn/b.png", download) == b"downloaded"
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(main())
+    assert len(threads) == 3
+    assert loop_thread not in threads
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+
+def test_memory_cache_revalidates_default_avatars(serve, monkeypatch):
+    requests = []
+
+    async def avatar(request):
+        requests.append(dict(request.headers))
+        if request.headers.get("If-None-Match") == ETAG:
+            return web.Response(status=304)
+        return web.Response(
+            body=AVATAR, headers={"ETag": ETAG, "Last-Modified": LAST_MODIFIED}
+        )
+
+    app = web.Application()
+    app.router.add_get("/embed/avatars/{index}", avatar)
+
+    async def main():
+        async with serve(app) as base:
+            monkeypatch.setattr(Asset, "_DEFAULT_AVATARS", f"{base}/embed/avatars/")
+            cache = MemoryAssetCache(revalidate_after=0)
+            http = HTTPClient(
+                None,
+                asyncio.get_running_loop(),
+                client_id=1,
+                client_secret="secret",
+                bot_token=None,
+                asset_memory_cache=cache,
+            )
+            url = f"{base}/embed/avatars/1.png"
+            try:
+                first = await http.get_from_cdn(url)
+                second = await http.get_from_cdn(url)
+            finally:
+                await http.close()
+            return cache, first, second
+
+    cache, first, second = asyncio.run(main())
+    assert first == AVATAR
+    # the 304 has no body, the cached one is reused as is
+    assert second is first
+    assert "If-None-Match" not in requests[0]
+    assert requests[1]["If-None-Match"] == ETAG
+    assert requests[1]["If-Modified-Since"] == LAST_MODIFIED
+    stats = cache.stats
+    assert (stats.misses, stats.hits, stats.not_modified) == (1, 1, 1)
+
+
+def test_memory_cache_serves_stale_data_when_revalidation_fails():
+    url = f"{Asset._DEFAULT_AVATARS}0.png"
+    calls = []
+
+    async def download(url, etag, last_modified):
+        calls.append((etag, last_modified))
+        if len(calls) > 1:
+            raise OSError("CDN unreachable")
+        return CDNResponse(AVATAR, ETAG, LAST_MODIFIED)
+
+    async def main():
+        cache = MemoryAssetCache(revalidate_after=0)
+        first = await cache.fetch(url, download)
+        stale = await cache.fetch(url, download)
+        return cache, first, stale
+
+    cache, first, stale = asyncio.run(main())
+    assert stale is first
+    assert calls == [(None, None), (ETAG, LAST_MODIFIED)]
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+    assert cache.get(url) == AVATAR
+
+
+def test_memory_cache_pins_default_avatars():
+    cache = MemoryAssetCache(max_size=10)
+    avatar = f"{Asset._DEFAULT_AVATARS}2.png"
+    cache.put(avatar, CDNResponse(b"x" * 100, ETAG))
+    for i in range(5):
+        cache.put(
+            f"https://cdn.discordapp.com/avatars/1/{i}.png", CDNResponse(b"y" * 4)
+        )
+
+    assert MemoryAssetCache.is_mutable(avatar)
+    assert not MemoryAssetCache.is_mutable("https://cdn.discordapp.com/avatars/1/0.png")
+    # pinned outside of the size cap, the hashed assets are evicted oldest first
+    assert cache.get(avatar) == b"x" * 100
+    assert cache.size == 8
+    assert cache.stats.evicted == 3
+    assert "https://cdn.discordapp.com/avatars/1/0.png" not in cache
+    assert "https://cdn.discordapp.com/avatars/1/4.png" in cache
+    assert len(cache) == 3
+
+    cache.clear()
+    assert avatar not in cache
+
+
+def test_memory_cache_hit_rate():
+    async def download(url, etag, last_modified):
+        return CDNResponse(url.encode())
+
+    async def main():
+        cache = MemoryAssetCache()
+        assert cache.stats.hit_rate == 0.0
+        for url in ("https://cdn/a.png", "https://cdn/b.png") * 4:
+            assert await cache.fetch(url, download) == url.encode()
+        return cache
+
+    stats = asyncio.run(main()).stats
+    assert (stats.hits, stats.misses) == (6, 2)
+    assert stats.hit_rate == 0.75
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from aiohttp import web
+
+from oauth2.asset import Asset
+from oauth2.cache import MemoryAssetCache
+from oauth2.cdn import AssetPrefetcher, CDNDownloader
+
+
+class FakeAsset:
+    started = 0
+
+    def __init__(self, i: int) -> None:
+        self.i = i
+
+    async def read(self) -> bytes:
+        FakeAsset.started += 1
+        if self.i == 3:
+            raise ValueError(self.i)
+        return str(self.i).encode()
+
+
+def test_fetch_many_is_bounded():
+    async def main():
+        downloader = CDNDownloader()
+        results = downloader.fetch_many(
+            (FakeAsset(i) for i in range(1000)), concurrency=4
+        )
+        first = await results.__anext__()
+        await asyncio.sleep(0.05)
+        paused_at = FakeAsset.started
+        rest = [result async for result in results]
+        return first, paused_at, rest
+
+    first, paused_at, rest = asyncio.run(main())
+    assert paused_at < 50
+    downloads = [first, *rest]
+    assert len(downloads) == 1000
+    failed = [d for d in downloads if d.error is not None]
+    assert len(failed) == 1
+    assert isinstance(failed[0].error, ValueError)
+
+
+def test_stream_outlives_the_timeout():
+    async def slow(request: web.Request) -> web.StreamResponse:
+        resp = web.StreamResponse()
+        await resp.prepare(request)
+        for _ in range(5):
+            await resp.write(b"x" * 10)
+            await asyncio.sleep(0.1)
+        return resp
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/slow", slow)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"http://127.0.0.1:{runner.addresses[0][1]}/slow"
+        downloader = CDNDownloader(timeout=0.3)
+        try:
+            return b"".join([chunk async for chunk in downloader.stream(url)])
+        finally:
+            await downloader.close()
+            await runner.cleanup()
+
+    assert asyncio.run(main()) == b"x" * 50
+
+
+def test_prefetch_budget_resets_for_a_later_login(make_http):
+    http = make_http(asset_memory_cache=MemoryAssetCache())
+
+    def avatars(start):
+        return [
+            Asset._from_avatar(http, 1, f"{i:032x}") for i in range(start, start + 3)
+        ]
+
+    async def main():
+        prefetcher = AssetPrefetcher(max_per_user=4, budget_window=0.2)
+        try:
+            first = prefetcher.prefetch(1, avatars(0))
+            same_login = prefetcher.prefetch(1, avatars(10))
+            other_user = prefetcher.prefetch(2, avatars(20))
+            time.sleep(0.25)
+            second_login = prefetcher.prefetch(1, avatars(30))
+        finally:
+            await prefetcher.close()
+        return first, same_login, other_user, second_login
+
+    assert asyncio.run(main()) == (3, 1, 3, 3)
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Dict
+
+import pytest
+from aiohttp import web
+
+
+def token_app(state: Dict[str, Any]) -> web.Application:
+    """A token endpoint counting its calls, ``state`` controls the answers."""
+
+    async def token(request: web.Request) -> web.Response:
+        await request.post()
+        state["calls"] += 1
+        await asyncio.sleep(state.get("delay", 0))
+        if state["calls"] in state.get("fail", ()):
+            return web.json_response({}, status=500)
+        return web.json_response(
+            {
+                "access_token": f"token-{state['calls']}",
+                "token_type": "Bearer",
+                "expires_in": state.get("expires_in", 604800),
+                "scope": "identify",
+            }
+        )
+
+    async def revoke(request: web.Request) -> web.Response:
+        await request.post()
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post("/oauth2/token", token)
+    app.router.add_post("/oauth2/token/revoke", revoke)
+    return app
+
+
+def test_concurrent_gets_send_a_single_request(serve, make_client):
+    state = {"calls": 0, "delay": 0.05}
+
+    async def main():
+        async with serve(token_app(state)):
+            client = make_client()
+            sessions = await asyncio.gather(
+                *(client.fetch_client_credentials_token() for _ in range(10))
+            )
+            cached = await client.fetch_client_credentials_token()
+            await client.close()
+        return sessions, cached
+
+    sessions, cached = asyncio.run(main())
+    assert state["calls"] == 1
+    assert all(session is sessions[0] for session in sessions)
+    assert cached is sessions[0]
+
+
+def test_timer_renews_before_the_margin(serve, make_client):
+    # renewed 2 - 1.8 = 0.2 seconds after each fetch
+    state = {"calls": 0, "expires_in": 2}
+
+    async def main():
+        async with serve(token_app(state)):
+            client = make_client(credentials_renewal_margin=1.8)
+            first = await client.fetch_client_credentials_token()
+            await asyncio.sleep(0.3)
+            renewed = client.client_credentials
+            await client.close()
+        return first, renewed
+
+    first, renewed = asyncio.run(main())
+    assert state["calls"] == 2
+    assert first.access_token == "token-1"
+    assert renewed is not None
+    assert renewed.access_token == "token-2"
+
+
+def test_failed_renewal_is_retried(serve, make_client):
+    # the timer fires after 0.1 seconds and fails, the retry is 0.9 seconds later
+    state = {"calls": 0, "expires_in": 1, "fail": {2}}
+
+    async def main():
+        async with serve(token_app(state)):
+            client = make_client(credentials_renewal_margin=0.9)
+            await client.fetch_client_credentials_token()
+            await asyncio.sleep(0.3)
+            calls_after_failure = state["calls"]
+            await asyncio.sleep(1.0)
+            renewed = client.client_credentials
+            await client.close()
+        return calls_after_failure, renewed
+
+    calls_after_failure, renewed = asyncio.run(main())
+    assert calls_after_failure == 2
+    assert state["calls"] >= 3
+    # renewed by the retry, and by the timer again since this token is short lived
+    assert renewed is not None
+    assert renewed.access_token not in ("token-1", "token-2")
+
+
+def test_revoke_invalidates_the_cached_token(serve, make_client):
+    state = {"calls": 0}
+
+    async def main():
+        async with serve(token_app(state)):
+            client = make_client()
+            session = await client.fetch_client_credentials_token()
+            await session.revoke()
+            cached = client.client_credentials
+            timer = client._credentials._renew_handle
+            again = await client.fetch_client_credentials_token()
+            await client.close()
+        return cached, timer, again
+
+    cached, timer, again = asyncio.run(main())
+    assert cached is None
+    assert timer is None
+    assert again.access_token == "token-2"
+
+
+def test_close_cancels_the_timer_and_the_renewal(serve, make_client):
+    state = {"calls": 0}
+
+    async def main():
+        async with serve(token_app(state)):
+            client = make_client()
+            await client.fetch_client_credentials_token()
+            credentials = client._credentials
+            timer = credentials._renew_handle
+            state["delay"] = 1.0
+            pending = asyncio.ensure_future(credentials.get(force=True))
+            await asyncio.sleep(0.05)
+            inflight = credentials._inflight
+            credentials.close()
+            with pytest.raises(asyncio.CancelledError):
+                await pending
+            await asyncio.sleep(0)
+            result = timer, inflight, credentials._renew_handle, credentials._inflight
+            await client.close()
+        return result
+
+    timer, inflight, handle, current = asyncio.run(main())
+    assert timer.cancelled()
+    assert inflight.cancelled()
+    assert handle is None
+    assert current is None
@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import asyncio
+import base64
+import io
+import threading
+
+import pytest
+
+from oauth2.file import File
+
+PNG = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 4000
+
+
+def test_to_data_uri_encodes_in_the_default_executor(tmp_path):
+    path = tmp_path / "avatar.png"
+    path.write_bytes(PNG)
+    threads = set()
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        run_in_executor = loop.run_in_executor
+
+        def spy(executor, func, *args):
+            threads.add(executor)
+            return run_in_executor(executor, func, *args)
+
+        loop.run_in_executor = spy  # type: ignore
+        return (
+            await File(str(path)).to_data_uri(),
+            await File(io.BytesIO(PNG)).to_data_uri(),
+        )
+
+    from_path, from_bytes = asyncio.run(main())
+    assert (
+        from_path
+        == from_bytes
+        == "data:image/png;base64," + base64.b64encode(PNG).decode()
+    )
+    assert threads == {None}
+    assert not [t for t in threading.enumerate() if t.name.startswith("oauth2-encode")]
+
+
+def test_to_data_uri_checks_the_size():
+    with pytest.raises(ValueError, match="the maximum is 1024"):
+        asyncio.run(File(io.BytesIO(PNG)).to_data_uri(max_size=1024))
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import asyncio
+import gc
+import weakref
+
+from oauth2.appinfo import AppInfo
+
+TOKEN = {
+    "access_token": "token",
+    "token_type": "Bearer",
+    "expires_in": 604800,
+    "scope": "identify",
+}
+
+
+def test_team_is_freed_without_the_cyclic_collector(make_http, payloads):
+    app = AppInfo.from_data(payloads.app(), make_http())
+    team = app.team
+    member = team.members[0]
+    assert member.team is team
+    assert member.team_id == team.id
+
+    gc.disable()
+    try:
+        ref = weakref.ref(team)
+        del app, team
+        assert ref() is None
+    finally:
+        gc.enable()
+    assert member.team is None
+
+
+def test_freeze_gc_after_logins(make_client, monkeypatch):
+    frozen = []
+    monkeypatch.setattr(gc, "freeze", lambda: frozen.append(True))
+
+    async def exchange_token(**kwargs):
+        return TOKEN
+
+    async def main():
+        client = make_client(freeze_gc_after=3)
+        monkeypatch.setattr(client.http, "_exchange_token", exchange_token)
+        try:
+            for _ in range(5):
+                await client.exchange_code("code")
+        finally:
+            await client.close()
+
+    asyncio.run(main())
+    assert frozen == [True]
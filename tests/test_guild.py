@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import gc
+import pickle
+from typing import get_args
+
+import pytest
+
+from oauth2.guild import (
+    _GUILD_FEATURE_NAMES,
+    GuildFeatures,
+    GuildIdentityMap,
+    GuildMembership,
+    PartialGuild,
+)
+from oauth2.types import GuildFeature
+
+
+def test_identity_map_shares_guild_data(make_http, payloads):
+    http = make_http()
+    guilds = GuildIdentityMap()
+    first = guilds.membership(payloads.guild(owner=True), http)
+    second = guilds.membership(payloads.guild(permissions="8"), http)
+    assert first.guild is second.guild
+    assert first.owner is True
+    assert second.owner is False
+    assert second.permissions == 8
+    assert first.name == second.name == "Discord Testers"
+    assert len(guilds) == 1
+
+
+def test_identity_map_updates_in_place(make_http, payloads):
+    http = make_http()
+    guilds = GuildIdentityMap()
+    membership = guilds.membership(payloads.guild(), http)
+    features = membership.features
+    guilds.membership(payloads.guild(name="Renamed"), http)
+    assert membership.name == "Renamed"
+    # unchanged values keep their shared objects
+    assert membership.features is features
+
+
+def test_identity_map_drops_unreferenced_guilds(make_http, payloads):
+    guilds = GuildIdentityMap()
+    membership = guilds.membership(payloads.guild(), make_http())
+    guild_id = membership.id
+    del membership
+    gc.collect()
+    assert guilds.get(guild_id) is None
+
+
+def test_membership_is_hashable(make_http, payloads):
+    http = make_http()
+    guilds = GuildIdentityMap()
+    a = guilds.membership(payloads.guild(), http)
+    b = guilds.membership(payloads.guild(), http)
+    other = guilds.membership(payloads.guild(id=197038439483310087), http)
+    assert a == b
+    assert hash(a) == hash(b)
+    assert {a, b, other} == {a, other}
+    assert {a: 1}[b] == 1
+
+
+def test_membership_behaves_like_partial_guild(make_http, payloads):
+    http = make_http()
+    data = payloads.guild()
+    membership = GuildIdentityMap().membership(data, http)
+    guild = PartialGuild.from_data(data, http)
+    assert isinstance(membership, GuildMembership)
+    for field in ("id", "name", "features", "owner", "permissions", "created_at"):
+        assert getattr(membership, field) == getattr(guild, field), field
+    assert membership.icon.url == guild.icon.url
+
+
+def test_guild_features_names_follow_the_literal():
+    assert _GUILD_FEATURE_NAMES == get_args(GuildFeature)
+    for name in _GUILD_FEATURE_NAMES:
+        assert name in getattr(GuildFeatures, name)
+
+
+def test_guild_features_shared_instances_are_immutable():
+    a = GuildFeatures.from_list(["COMMUNITY", "NEWS"])
+    b = GuildFeatures.from_list(["NEWS", "COMMUNITY"])
+    assert a is b
+    with pytest.raises(AttributeError):
+        a.value = 0  # type: ignore
+    assert b.to_list() == ["COMMUNITY", "NEWS"]
+    assert pickle.loads(pickle.dumps(a)) == a  # noqa: S301
+
+
+def test_guild_features_operators():
+    features = GuildFeatures.from_list(["COMMUNITY", "NEWS", "SOMETHING_NEW"])
+    both = GuildFeatures.COMMUNITY | GuildFeatures.NEWS  # type: ignore
+    assert both in features
+    assert "SOMETHING_NEW" in features
+    assert (features & both) == both
+    assert features == ["NEWS", "COMMUNITY", "SOMETHING_NEW"]
+    with pytest.raises(TypeError):
+        features | 1  # type: ignore
+    with pytest.raises(TypeError):
+        features & {"NEWS"}  # type: ignore
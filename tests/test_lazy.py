@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+import pytest
+
+from oauth2.appinfo import AppInfo, LazyAppInfo
+from oauth2.guild import LazyPartialGuild, PartialGuild
+from oauth2.user import LazyUser, User
+
+USER_FIELDS = (
+    "id",
+    "username",
+    "discriminator",
+    "global_name",
+    "email",
+    "verified",
+    "premium_type",
+    "locale",
+    "mfa_enabled",
+    "bot",
+    "system",
+)
+GUILD_FIELDS = (
+    "id",
+    "name",
+    "features",
+    "owner",
+    "permissions",
+    "approximate_member_count",
+    "approximate_presence_count",
+)
+
+
+def test_lazy_models_are_opt_in(make_http, payloads):
+    http = make_http()
+    assert type(User.from_data(payloads.user(), http)) is User
+    assert type(PartialGuild.from_data(payloads.guild(), http)) is PartialGuild
+    assert type(AppInfo.from_data(payloads.app(), http)) is AppInfo
+
+
+@pytest.mark.parametrize(
+    ("model", "lazy", "payload", "fields", "asset"),
+    [
+        (User, LazyUser, "user", USER_FIELDS, "avatar"),
+        (PartialGuild, LazyPartialGuild, "guild", GUILD_FIELDS, "icon"),
+    ],
+)
+def test_lazy_matches_eager(make_http, payloads, model, lazy, payload, fields, asset):
+    data = getattr(payloads, payload)()
+    eager = model.from_data(data, make_http())
+    lazy_obj = model.from_data(data, make_http(lazy_models=True))
+    assert type(lazy_obj) is lazy
+    assert isinstance(lazy_obj, model)
+    for field in fields:
+        assert getattr(lazy_obj, field) == getattr(eager, field), field
+    assert getattr(lazy_obj, asset).url == getattr(eager, asset).url
+
+
+def test_lazy_fields_decode_on_first_access(make_http, payloads):
+    user = User.from_data(payloads.user(), make_http(lazy_models=True))
+    assert "id" not in user.__dict__
+    assert user.id == 80351110224678912
+    assert isinstance(user.id, int)
+    assert user.__dict__["id"] == user.id
+    assert "username" not in user.__dict__
+
+
+def test_lazy_app_info_nested_models(make_http, payloads):
+    data = payloads.app()
+    eager = AppInfo.from_data(data, make_http())
+    app = AppInfo.from_data(data, make_http(lazy_models=True))
+    assert type(app) is LazyAppInfo
+    assert "owner" not in app.__dict__
+    assert "team" not in app.__dict__
+
+    assert app.id == eager.id == 172150183260323840
+    assert app.guild_id == eager.guild_id == 290926798626357260
+    assert app.install_params == eager.install_params
+    assert app.owner.id == eager.owner.id
+    assert app.team is not None
+    assert eager.team is not None
+    assert [m.id for m in app.team.members] == [m.id for m in eager.team.members]
+    # decoded once, then cached
+    assert app.owner is app.owner
+
+
+def test_lazy_defaults_for_missing_keys(make_http, payloads):
+    data = payloads.guild()
+    del data["approximate_member_count"]
+    guild = PartialGuild.from_data(data, make_http(lazy_models=True))
+    assert guild.approximate_member_count is None
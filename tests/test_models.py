@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import pytest
+
+from oauth2.guild import PartialGuild
+from oauth2.user import User
+
+
+def _fail() -> None:
+    raise AssertionError("an identical payload must not be rebuilt")
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_update_from_skips_the_construction_payload(make_http, payloads, lazy):
+    data = payloads.user()
+    user = User.from_data(data, make_http(lazy_models=lazy))
+    # construction keeps a reference to the payload, it never copies or hashes it
+    assert getattr(user, "_data", user._payload) is data
+    assert user._update_from(dict(data), _fail) == set()
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_update_from_reports_changed_fields(make_http, payloads, lazy):
+    http = make_http(lazy_models=lazy)
+    guild = PartialGuild.from_data(payloads.guild(), http)
+    assert guild.update_from(payloads.guild(name="renamed")) == {"name"}
+    assert guild.name == "renamed"
+    assert guild.update_from(payloads.guild(name="renamed")) == set()
+    assert guild.update_from(payloads.guild()) == {"name"}
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_snowflake_models_hash_by_id(make_http, payloads, lazy):
+    http = make_http(lazy_models=lazy)
+    # the same millisecond, only the worker, process and increment bits differ
+    base = 80351110224678912 & ~(2**22 - 1)
+    users = [User.from_data(payloads.user(base + i), http) for i in range(1000)]
+    guilds = [
+        PartialGuild.from_data(payloads.guild(base + i), http) for i in range(1000)
+    ]
+    assert len({hash(user) for user in users}) == 1000
+    assert len(set(users)) == len(set(guilds)) == 1000
+
+    again = User.from_data(payloads.user(base, username="renamed"), http)
+    assert again == users[0]
+    assert again in set(users)
+    assert {guilds[0]: 1}[PartialGuild.from_data(payloads.guild(base), http)] == 1
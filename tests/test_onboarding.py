@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from aiohttp import web
+
+from oauth2.user import User
+
+LIMIT_HEADERS = {"X-RateLimit-Remaining": "1000", "X-RateLimit-Reset-After": "1.0"}
+
+
+def guild_app(members: set, me_429: set, put_429: list) -> web.Application:
+    async def put(request: web.Request) -> web.Response:
+        body = await request.json()
+        assert body["roles"] == [5]
+        assert request.headers["Authorization"] == "Bot bot-token"
+        if put_429:
+            return web.json_response(
+                {}, status=429, headers={"Retry-After": put_429.pop()}
+            )
+        user_id = int(request.match_info["user_id"])
+        if user_id in members:
+            return web.Response(status=204, headers=LIMIT_HEADERS)
+        members.add(user_id)
+        return web.json_response(
+            {"user": {"id": str(user_id)}}, status=201, headers=LIMIT_HEADERS
+        )
+
+    async def me(request: web.Request) -> web.Response:
+        token = request.headers["Authorization"].split()[-1]
+        if token in me_429:
+            me_429.discard(token)
+            return web.json_response({}, status=429, headers={"Retry-After": "0.5"})
+        return web.json_response({"id": token}, headers=LIMIT_HEADERS)
+
+    app = web.Application()
+    app.router.add_put("/guilds/1/members/{user_id}", put)
+    app.router.add_get("/users/@me", me)
+    return app
+
+
+def test_add_guild_members(serve, make_client, make_session, payloads):
+    members = {0, 3}
+
+    async def main():
+        async with serve(guild_app(members, set(), ["0.05"])):
+            client = make_client(bot_token="bot-token")
+            scope = "identify guilds.join"
+            source = [make_session(client, str(i), scope) for i in range(4)]
+            source.append(User.from_data(payloads.user(10), client.http, source[0]))
+            source.append(make_session(client, "20", "identify"))
+            run = client.add_guild_members(1, source, roles=[5], concurrency=4)
+            results = [result async for result in run]
+            await client.close()
+        return run, results
+
+    run, results = asyncio.run(main())
+    assert len(results) == 6
+    assert (run.stats.added, run.stats.already_members, run.stats.failed) == (3, 2, 1)
+    assert run.stats.rate_limited == 1
+    assert members == {0, 1, 2, 3, 10}
+    by_user = {result.user_id: result for result in results}
+    assert by_user[0].already_member
+    assert by_user[None].error is not None
+
+
+def test_users_me_429_only_holds_its_token(serve, make_client, make_session):
+    async def main():
+        async with serve(guild_app(set(), {"0"}, [])):
+            client = make_client(bot_token="bot-token")
+            scope = "identify guilds.join"
+            source = [make_session(client, str(i), scope) for i in range(30)]
+            run = client.add_guild_members(1, source, roles=[5], concurrency=4)
+            started = time.monotonic()
+            done = [
+                (result.user_id, time.monotonic() - started) async for result in run
+            ]
+            buckets = list(run._limiter._buckets)
+            await client.close()
+        return run, done, buckets
+
+    run, done, buckets = asyncio.run(main())
+    assert len(done) == 30
+    assert run.stats.added == 30
+    assert run.stats.rate_limited == 1
+    # everyone else went through while token 0 waited for its Retry-After
+    assert done[-1][0] == 0
+    assert all(elapsed < 0.4 for _, elapsed in done[:-1])
+    # per token buckets are keyed on a digest, the limiter never holds a token
+    me_buckets = [key.rpartition(" ")[2] for key in buckets if key.startswith("GET")]
+    assert len(me_buckets) == 30
+    assert all(len(key) == 16 for key in me_buckets)
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+from aiohttp import web
+
+from oauth2._bulk import RateLimiter, bulk_map
+
+
+def rate_limited_app(limit: int, window: float, stats: dict) -> web.Application:
+    """A revoke endpoint allowing ``limit`` requests per ``window`` seconds."""
+    state = {"reset_at": 0.0, "used": 0}
+
+    async def revoke(request: web.Request) -> web.Response:
+        await request.post()
+        now = time.monotonic()
+        if now >= state["reset_at"]:
+            state["reset_at"] = now + window
+            state["used"] = 0
+        reset_after = f"{state['reset_at'] - now:.3f}"
+        if state["used"] >= limit:
+            stats["429"] += 1
+            return web.json_response(
+                {"retry_after": reset_after},
+                status=429,
+                headers={"Retry-After": reset_after},
+            )
+        state["used"] += 1
+        stats["ok"] += 1
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(limit - state["used"]),
+            "X-RateLimit-Reset-After": reset_after,
+        }
+        return web.json_response({}, headers=headers)
+
+    app = web.Application()
+    app.router.add_post("/oauth2/token/revoke", revoke)
+    return app
+
+
+def test_revoke_many_throttles_before_429(serve, make_client):
+    stats = {"ok": 0, "429": 0}
+
+    async def main():
+        async with serve(rate_limited_app(10, 0.1, stats)):
+            client = make_client()
+            run = client.revoke_many([f"token-{i}" for i in range(60)], concurrency=8)
+            results = [result async for result in run]
+            await client.close()
+        return run, results
+
+    run, results = asyncio.run(main())
+    assert len(results) == 60
+    assert all(result.success for result in results)
+    assert run.stats.revoked == 60
+    assert stats == {"ok": 60, "429": 0}
+    assert run.stats.rate_limited == 0
+
+
+def test_revoke_many_retries_after_429(serve, make_client):
+    calls = {"n": 0}
+
+    async def revoke(request: web.Request) -> web.Response:
+        calls["n"] += 1
+        if calls["n"] == 1:
+            return web.json_response({}, status=429, headers={"Retry-After": "0.05"})
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_post("/oauth2/token/revoke", revoke)
+
+    async def main():
+        async with serve(app):
+            client = make_client()
+            run = client.revoke_many(["a", "b", "c"], concurrency=1)
+            results = [result async for result in run]
+            await client.close()
+        return run, results
+
+    run, results = asyncio.run(main())
+    assert [result.success for result in results] == [True, True, True]
+    assert run.stats.rate_limited == 1
+    assert sum(result.attempts for result in results) == 4
+
+
+def test_rate_limiter_waits_for_reset():
+    async def main():
+        limiter = RateLimiter()
+        limiter.update(
+            "bucket",
+            200,
+            {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.05"},
+        )
+        start = time.monotonic()
+        await limiter.acquire("bucket")
+        waited = time.monotonic() - start
+        await limiter.acquire("other")
+        return waited, len(limiter)
+
+    waited, buckets = asyncio.run(main())
+    assert waited >= 0.04
+    # expired buckets are dropped
+    assert buckets == 0
+
+
+def test_rate_limiter_global_429_blocks_every_bucket():
+    async def main():
+        limiter = RateLimiter()
+        limiter.update("a", 429, {"Retry-After": "0.05", "X-RateLimit-Global": "true"})
+        start = time.monotonic()
+        await limiter.acquire("b")
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 0.04
+
+
+def test_bulk_map_is_bounded_and_cancellable():
+    produced = []
+
+    async def source():
+        for i in range(10_000):
+            produced.append(i)
+            yield i
+
+    async def work(i: int) -> int:
+        await asyncio.sleep(0)
+        return i
+
+    async def main():
+        results = bulk_map(source(), work, 4)
+        seen = [await results.__anext__() for _ in range(5)]
+        await asyncio.sleep(0.01)
+        # a slow consumer pauses the source instead of buffering everything
+        assert len(produced) < 100
+        await asyncio.wait_for(results.aclose(), 1)
+        return seen
+
+    assert len(asyncio.run(main())) == 5
+
+
+def test_bulk_map_surfaces_source_errors():
+    async def source():
+        yield 1
+        raise RuntimeError("boom")
+
+    async def work(i: int) -> int:
+        return i
+
+    async def main():
+        return [result async for result in bulk_map(source(), work, 2)]
+
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(main())
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from oauth2 import scopes as scopes_mod
+from oauth2.errors import MissingScopes
+from oauth2.scopes import OAuthScopes
+from oauth2.user import User
+
+
+@pytest.fixture
+def no_requests(monkeypatch):
+    """Make any HTTP request fail the test."""
+
+    async def request(*args, **kwargs):
+        raise AssertionError("no request must be sent")
+
+    monkeypatch.setattr("oauth2._http.HTTPClient.request", request)
+
+
+def test_missing_scope_raises_before_the_request(
+    make_client, make_session, payloads, no_requests
+):
+    async def main():
+        client = make_client()
+        session = make_session(client, "token", "identify guilds")
+        user = User.from_data(payloads.user(), client.http, session)
+        try:
+            with pytest.raises(MissingScopes) as info:
+                await user.fetch_user_connections()
+            with pytest.raises(MissingScopes):
+                await make_session(client, "token", "guilds").fetch_current_user()
+            return info.value
+        finally:
+            await client.close()
+
+    error = asyncio.run(main())
+    assert error.missing == OAuthScopes.connections
+    assert "connections" in str(error)
+
+
+def test_missing_scope_raises_before_iterating(
+    make_client, make_session, payloads, no_requests
+):
+    async def main():
+        client = make_client()
+        user = User.from_data(
+            payloads.user(), client.http, make_session(client, "token")
+        )
+        try:
+            with pytest.raises(MissingScopes):
+                async for _ in user.guilds():
+                    pass
+        finally:
+            await client.close()
+
+    asyncio.run(main())
+
+
+def test_has_scopes_with_composite_scopes(make_client, make_session):
+    async def main():
+        client = make_client()
+        session = make_session(client, "token", "identify guilds guilds.join")
+        await client.close()
+        return session
+
+    session = asyncio.run(main())
+    assert session.has_scopes(OAuthScopes.identify | OAuthScopes.guilds)
+    assert session.has_scopes(OAuthScopes.guilds_join)
+    assert session.has_scopes(OAuthScopes.none())
+    assert not session.has_scopes(OAuthScopes.identify | OAuthScopes.email)
+    with pytest.raises(MissingScopes) as info:
+        session._check_scopes(
+            OAuthScopes.identify | OAuthScopes.email | OAuthScopes.connections
+        )
+    assert info.value.missing == OAuthScopes.email | OAuthScopes.connections
+
+
+def test_parse_ignores_unknown_names():
+    scopes = OAuthScopes.parse("identify  guilds.join unknown.scope email")
+    assert scopes == OAuthScopes.identify | OAuthScopes.guilds_join | OAuthScopes.email
+    assert OAuthScopes.parse("") == OAuthScopes.none()
+
+
+def test_from_api_names():
+    names = ["dm_channels.read", "applications.commands.update", "nope"]
+    assert OAuthScopes.from_api_names(names) == (
+        OAuthScopes.dm_channels_read | OAuthScopes.applications_commands_update
+    )
+    assert OAuthScopes.from_api_names([]) == OAuthScopes.none()
+    assert (
+        OAuthScopes.from_api_names(scope.api_name for scope in OAuthScopes.all())
+        == OAuthScopes.all()
+    )
+
+
+def test_role_connections_write_round_trip():
+    scope = OAuthScopes.role_connections_write
+    assert scope.api_name == "role_connections.write"
+    assert OAuthScopes.parse(scope.as_client_credentials()) == scope
+    assert OAuthScopes.parse("identify role_connections.write") == (
+        OAuthScopes.identify | scope
+    )
+
+
+def test_serialization_is_cached():
+    scopes = OAuthScopes.identify | OAuthScopes.guilds | OAuthScopes.email
+    scopes_mod._split.cache_clear()
+    scopes_mod._serialize.cache_clear()
+
+    assert scopes.as_url_param() == "email%20guilds%20identify"
+    assert scopes.as_url_param() == "email%20guilds%20identify"
+    assert scopes.as_client_credentials() == "email guilds identify"
+    assert list(scopes) == list(scopes)
+
+    serialize = scopes_mod._serialize.cache_info()
+    assert (serialize.hits, serialize.misses) == (1, 2)
+    # the first serialization split the flag, the later calls reuse it
+    split = scopes_mod._split.cache_info()
+    assert (split.hits, split.misses) == (3, 1)
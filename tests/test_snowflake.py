@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import datetime
+import random
+
+import pytest
+
+from oauth2 import snowflake
+from oauth2.snowflake import SnowflakeIndex, snowflake_time, time_snowflake
+
+UTC = datetime.timezone.utc
+# the increment, process and worker bits
+LOW_BITS = 2**22 - 1
+
+
+class Item:
+    def __init__(self, id: int, name: str = "") -> None:
+        self.id = id
+        self.name = name
+
+
+def _at(ms: int, low: int = 0) -> int:
+    return (ms << 22) | low
+
+
+def _is_sorted(index: SnowflakeIndex) -> bool:
+    ids = list(index.ids)
+    return ids == sorted(ids) and ids == [item.id for item in index]
+
+
+def test_snowflake_time_round_trip():
+    dt = datetime.datetime(2021, 6, 1, 12, 30, 15, 123000, tzinfo=UTC)
+    low = time_snowflake(dt)
+    high = time_snowflake(dt, high=True)
+    assert high - low == LOW_BITS
+    assert snowflake_time(low) == snowflake_time(high) == dt
+    # the example from the discord docs
+    assert snowflake_time(175928847299117063) == datetime.datetime(
+        2016, 4, 30, 11, 18, 25, 796000, tzinfo=UTC
+    )
+
+
+def test_index_stays_sorted():
+    rng = random.Random(0)
+    ids = rng.sample(range(1, 2**63), 200)
+    index = SnowflakeIndex(Item(id) for id in ids[:100])
+    assert index.ids.typecode == "Q"
+    assert _is_sorted(index)
+
+    for id in ids[100:150]:
+        index.add(Item(id))
+    index.update(Item(id) for id in ids[150:])
+    assert len(index) == 200
+    assert _is_sorted(index)
+
+    for id in rng.sample(ids[1:], 50):
+        assert index.remove(id).id == id
+    index.discard(ids[0])
+    index.discard(1)
+    assert len(index) == 149
+    assert _is_sorted(index)
+    with pytest.raises(KeyError):
+        index.remove(1)
+
+
+def test_index_replaces_items_with_the_same_id():
+    index = SnowflakeIndex([Item(3, "a"), Item(1), Item(3, "b")])
+    assert list(index.ids) == [1, 3]
+    assert index.get(3).name == "b"
+
+    index.add(Item(3, "c"))
+    index.update([Item(1, "d"), Item(2)])
+    assert list(index.ids) == [1, 2, 3]
+    assert [item.name for item in index] == ["d", "", "c"]
+    assert 2 in index
+    assert Item(2) in index
+    assert 4 not in index
+
+
+def test_created_between_bounds():
+    base = 1_000_000
+    index = SnowflakeIndex(
+        Item(_at(ms, low)) for ms in range(base, base + 5) for low in (0, LOW_BITS)
+    )
+
+    def at(ms: int) -> datetime.datetime:
+        return snowflake_time(_at(ms))
+
+    # after is inclusive, before is exclusive, on every id of the millisecond
+    found = index.created_between(at(base + 1), at(base + 3))
+    assert [item.id for item in found] == [
+        _at(base + 1),
+        _at(base + 1, LOW_BITS),
+        _at(base + 2),
+        _at(base + 2, LOW_BITS),
+    ]
+    assert index.count_between(at(base + 1), at(base + 3)) == 4
+    assert index.count_between(after=at(base + 4)) == 2
+    assert index.count_between(before=at(base + 1)) == 2
+    assert index.count_between() == len(index) == 10
+    assert index.count_between(at(base + 3), at(base + 3)) == 0
+    # an inverted range is empty, not negative
+    assert index.count_between(at(base + 4), at(base)) == 0
+    assert index.created_between(at(base + 4), at(base)) == []
+
+
+def test_to_numpy():
+    np = pytest.importorskip("numpy")
+    index = SnowflakeIndex(Item(id) for id in (2**63 + 5, 3, 1))
+    ids = index.to_numpy()
+    assert ids.dtype == np.uint64
+    assert ids.tolist() == [1, 3, 2**63 + 5]
+
+    # a copy, the index can still grow
+    index.add(Item(2))
+    assert ids.tolist() == [1, 3, 2**63 + 5]
+
+    times = snowflake.snowflake_times_numpy(index.ids)
+    assert times.dtype == np.dtype("datetime64[ms]")
+    assert times[0] == np.datetime64(snowflake_time(1).replace(tzinfo=None))
+
+
+def test_to_numpy_requires_numpy(monkeypatch):
+    monkeypatch.setattr(snowflake, "numpy", None)
+    with pytest.raises(RuntimeError, match="numpy is required"):
+        SnowflakeIndex([Item(1)]).to_numpy()
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import re
+import time
+
+import pytest
+
+from oauth2.state import MemoryStateStore, SignedStateStore, StatePool, StateStore
+
+STATE = re.compile(r"^[A-Za-z0-9_-]{44}$")
+
+
+def test_state_pool_refills_in_batches():
+    pool = StatePool(batch_size=8)
+    assert len(pool) == 0
+    states = [pool.pop() for _ in range(20)]
+    # 3 batches of 8 were generated, 4 states are left
+    assert len(pool) == 4
+    assert len(set(states)) == 20
+    assert all(STATE.match(state) for state in states)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_state_pool_is_cleared_after_fork():
+    pool = StatePool(batch_size=8)
+    pool.refill()
+    read, write = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read)
+        os.write(write, str(len(pool)).encode())
+        os._exit(0)
+
+    os.close(write)
+    with os.fdopen(read) as pipe:
+        in_child = pipe.read()
+    os.waitpid(pid, 0)
+    assert in_child == "0"
+    assert len(pool) == 8
+
+
+def test_generate_state_link_adds_the_state(make_client):
+    async def main():
+        client = make_client()
+        link = await client.generate_state_link()
+        state = link.split("&state=")[1].split("&")[0]
+        assert STATE.match(state)
+        assert client.states == (state,)
+        assert await client.state_store.consume(state)
+        # a state can be used only once
+        assert not await client.state_store.consume(state)
+        await client.close()
+
+    asyncio.run(main())
+
+
+def test_generate_state_link_nowait_matches_async(make_client):
+    async def main():
+        client = make_client()
+        sync_link = client.generate_state_link_nowait()
+        async_link = await client.generate_state_link()
+        await client.close()
+        return sync_link, async_link
+
+    sync_link, async_link = asyncio.run(main())
+    strip = re.compile(r"&state=[^&]+")
+    assert strip.sub("", sync_link) == strip.sub("", async_link)
+    assert sync_link != async_link
+
+
+def test_generate_state_links_in_bulk(make_client):
+    async def main():
+        client = make_client(state_store=MemoryStateStore(100))
+        links = list(client.generate_state_links(50))
+        await client.close()
+        return client, links
+
+    client, links = asyncio.run(main())
+    assert len(links) == 50
+    assert len(set(client.states)) == 50
+
+
+def test_signed_state_payload_round_trip(make_client):
+    async def main():
+        store = SignedStateStore(b"k" * 32)
+        client = make_client(state_store=store)
+        link = await client.generate_state_link(state_payload="/dashboard")
+        state = link.split("&state=")[1].split("&")[0]
+        signed = store.unpack(state)
+        assert signed is not None
+        assert signed.payload == "/dashboard"
+        assert await store.consume(state)
+        assert not await store.consume(state)
+        await client.close()
+
+    asyncio.run(main())
+
+
+def test_payload_requires_signed_store(make_client):
+    async def main():
+        client = make_client()
+        try:
+            with pytest.raises(ValueError, match="SignedStateStore"):
+                await client.generate_state_link(state_payload="x")
+        finally:
+            await client.close()
+
+    asyncio.run(main())
+
+
+def test_state_store_is_abstract():
+    with pytest.raises(TypeError):
+        StateStore()  # type: ignore
+
+    class AsyncOnly(StateStore):
+        async def add(self, state, ttl):
+            pass
+
+        async def consume(self, state):
+            return False
+
+    # add_nowait is optional
+    with pytest.raises(NotImplementedError):
+        AsyncOnly().add_nowait("state", 1)
+
+
+def test_memory_store_expires_states():
+    store = MemoryStateStore()
+    store.add_nowait("short", 0.01)
+    store.add_nowait("long", 60)
+    time.sleep(0.02)
+    assert "short" not in store
+    assert "long" in store
+    assert not store.consume_nowait("short")
+    assert store.consume_nowait("long")
+    assert not store.consume_nowait("long")
+    assert not store.consume_nowait("unknown")
+    stats = store.stats
+    assert (stats.added, stats.hits, stats.misses, stats.expired, stats.evicted) == (
+        2,
+        1,
+        2,
+        1,
+        0,
+    )
+
+
+def test_memory_store_evicts_the_states_closest_to_expiring():
+    store = MemoryStateStore(max_size=3)
+    store.add_nowait("expired", 0.01)
+    store.add_nowait("b", 10)
+    store.add_nowait("c", 20)
+    time.sleep(0.02)
+    # the expired state is purged first, nothing is evicted
+    store.add_nowait("a", 30)
+    assert store.stats.evicted == 0
+    assert set(store) == {"a", "b", "c"}
+
+    store.add_nowait("d", 40)
+    assert set(store) == {"a", "c", "d"}
+    store.add_nowait("e", 50)
+    assert set(store) == {"a", "d", "e"}
+    assert store.stats.evicted == 2
+    assert len(store) == 3
+
+
+def test_memory_store_compacts_its_heap():
+    store = MemoryStateStore(max_size=4)
+    for i in range(100):
+        # re-adding a state leaves its old heap entry behind
+        store.add_nowait("state", 60 + i)
+    assert len(store._expiry) <= 2 * store.max_size
+    assert len(store) == 1
+    assert store.consume_nowait("state")
+    assert store.stats.added == 100
+
+
+def _tamper(part: str) -> str:
+    # flip the first character, keeping a valid base64 alphabet
+    return ("B" if part[0] == "A" else "A") + part[1:]
+
+
+def test_signed_store_rejects_tampered_states():
+    store = SignedStateStore(b"k" * 32)
+    state = store.create(60, "/dashboard")
+    body, _, signature = state.partition(".")
+
+    async def main():
+        return [
+            await store.consume(f"{_tamper(body)}.{signature}"),
+            await store.consume(f"{body}.{_tamper(signature)}"),
+            await store.consume(body),
+            await store.consume("not a state"),
+        ]
+
+    assert asyncio.run(main()) == [False, False, False, False]
+    assert store.unpack(f"{body}.{_tamper(signature)}") is None
+    assert store.stats.misses == 4
+    assert store.stats.hits == 0
+
+
+def test_signed_store_counts_expired_states():
+    store = SignedStateStore(b"k" * 32)
+    expired = store.create(-1)
+    valid = store.create(60)
+
+    async def main():
+        return await store.consume(expired), await store.consume(valid)
+
+    assert store.unpack(expired) is None
+    assert asyncio.run(main()) == (False, True)
+    stats = store.stats
+    assert (stats.hits, stats.misses, stats.expired) == (1, 0, 1)
+
+
+def test_signed_store_accepts_rotated_keys():
+    old = SignedStateStore(b"old" * 11)
+    state = old.create(60)
+    rotated = SignedStateStore([b"new" * 11, b"old" * 11])
+    only_new = SignedStateStore(b"new" * 11)
+
+    async def main():
+        return await only_new.consume(state), await rotated.consume(state)
+
+    assert asyncio.run(main()) == (False, True)
+    # new states are signed with the first key only
+    assert old.unpack(rotated.create(60)) is None
+    assert only_new.unpack(rotated.create(60)) is not None